@@ -82,6 +82,7 @@ import keyframeeditcanvas
 import kftoolmode
 import medialog
 import mediaplugin
+import mediaprobecache
 import mltenv
 import mltfilters
 import mltplayer
@@ -101,6 +102,7 @@ import projectdatavaultgui
 import projectinfogui
 import propertyeditorbuilder
 import proxyediting
+import proxycache
 import render
 import renderconsumer
 import rendergputest
@@ -133,6 +135,8 @@ instance_autosave_id_str = None
 PID_FILE = "flowbladepidfile"
 BATCH_DIR = "batchrender/"
 autosave_timeout_id = -1
+autosave_thread = None
+autosave_change_state = None
 disk_cache_timeout_id = -1
 loaded_autosave_file = None
 recovery_in_progress = False
@@ -443,6 +447,9 @@ def monkeypatch_callbacks():
     # Media log 
     medialog.do_multiple_clip_insert_func = editevent.do_multiple_clip_insert
 
+    # Media icons
+    projectdata.icons_decoded_listener = updater.media_icons_decoded
+
     editevent.display_clip_menu_pop_up = clipmenuaction.display_clip_menu
     editevent.compositor_menu_item_activated = clipmenuaction.compositor_menu_item_activated
     editevent.set_compositor_data = clipmenuaction.set_compositor_data
@@ -737,6 +744,7 @@ def change_current_sequence(index):
     edit.do_gui_update = False  # This should not be necessary but we are doing this signal intention that GUI updates are disabled
     
     stop_autosave()
+    persistance.build_deferred_sequence(editorstate.project.sequences[index])
     editorstate.project.c_seq = editorstate.project.sequences[index]
 
     # Inits widgets with current sequence data
@@ -842,8 +850,7 @@ def start_autosave():
     if autosave_delay_millis > 0:
         print("Autosave started...")
         autosave_timeout_id = GLib.timeout_add(autosave_delay_millis, do_autosave)
-        autosave_file = userfolders.get_cache_dir() + get_instance_autosave_file()
-        persistance.save_project(editorstate.PROJECT(), autosave_file)
+        _launch_autosave()
     else:
         print("Autosave disabled...")
         stop_autosave()
@@ -853,6 +860,10 @@ def get_autosave_files():
     return os.listdir(autosave_dir)
 
 def stop_autosave():
+    # Autosave file may be deleted or replaced after this, so any write in progress needs to complete.
+    if autosave_thread != None:
+        autosave_thread.join()
+
     global autosave_timeout_id
     if autosave_timeout_id == -1:
         return
@@ -860,10 +871,64 @@ def stop_autosave():
     autosave_timeout_id = -1
 
 def do_autosave():
-    autosave_file = userfolders.get_cache_dir() + get_instance_autosave_file()
-    persistance.save_project(editorstate.PROJECT(), autosave_file)
+    # Nothing to do if project has not changed since last autosave.
+    if _get_autosave_change_state() == autosave_change_state:
+        return True
+
+    # Previous autosave still being written, try again on next timeout.
+    if autosave_thread != None and autosave_thread.is_alive():
+        return True
+
+    _launch_autosave()
     return True
 
+def _launch_autosave():
+    global autosave_thread, autosave_change_state
+    autosave_change_state = _get_autosave_change_state()
+    
+    # Snapshot is created here on GTK thread, pickling and writing out is done on worker thread.
+    s_proj = persistance.get_pickleable_project(editorstate.PROJECT())
+    autosave_file = userfolders.get_cache_dir() + get_instance_autosave_file()
+    autosave_thread = AutosaveThread(s_proj, autosave_file)
+    autosave_thread.start()
+
+def _get_autosave_change_state():
+    """
+    Returns a value that changes when project is edited.
+    """
+    project = editorstate.PROJECT()
+    if undo.index > 0:
+        top_edit = undo.undo_stack[undo.index - 1]
+    else:
+        top_edit = None
+    
+    # Filter and compositor property edits are not registered anywhere,
+    # so we need to save if those may have been edited.
+    if clipeffectseditor._filter_stack != None or compositeeditor.compositor != None:
+        return object()
+
+    return (id(project), undo.index, top_edit, project.next_media_file_id,
+            len(project.media_files), len(project.bins), sum(len(b.file_ids) for b in project.bins),
+            len(project.media_log), len(project.media_log_groups), len(project.sequences),
+            project.c_seq, project.last_save_path, project.name)
+
+
+class AutosaveThread(threading.Thread):
+    
+    def __init__(self, s_proj, autosave_file):
+        threading.Thread.__init__(self)
+        self.s_proj = s_proj
+        self.autosave_file = autosave_file
+        
+    def run(self):
+        try:
+            persistance.write_pickleable_project(self.s_proj, self.autosave_file)
+        except Exception as e:
+            print("Autosave FAILED:", e)
+            # Force save on next autosave timeout.
+            global autosave_change_state
+            autosave_change_state = None
+
 # ------------------------------------------------- splash screen
 def show_splash_screen():
     global splash_screen
@@ -892,6 +957,8 @@ def check_disk_cache_size():
     if recovery_in_progress == False:
         diskcachemanagement.check_disk_cache_size()
         projectdatavaultgui.check_vaults_sizes()
+        proxycache.delete_stale_render_files()
+        diskcachemanagement.start_cache_eviction()
 
 # ------------------------------------------------------- userfolders dialogs
 def show_user_folders_init_error_dialog(error_msg):
@@ -1051,6 +1118,7 @@ def _shutdown_dialog_callback(dialog, response_id, no_dialog_shutdown=False):
             pass
         elif response_id ==  Gtk.ResponseType.YES:# "Save"
             if editorstate.PROJECT().last_save_path != None:
+                projectaction.wait_for_save_to_complete()
                 persistance.save_project(editorstate.PROJECT(), editorstate.PROJECT().last_save_path)
                 projectdatavault.project_saved(editorstate.PROJECT().last_save_path)
             else:
@@ -1077,6 +1145,9 @@ def _shutdown_dialog_callback(dialog, response_id, no_dialog_shutdown=False):
     # No more auto saving
     stop_autosave()
     
+    # Save may still be writing out, let it complete before exit.
+    projectaction.wait_for_save_to_complete()
+    
     # Save window dimensions on exit
     alloc = gui.editor_window.window.get_allocation()
     x, y, w, h = alloc.x, alloc.y, alloc.width, alloc.height 
@@ -1095,6 +1166,7 @@ def _shutdown_dialog_callback(dialog, response_id, no_dialog_shutdown=False):
     except: 
         pass
     editorpersistance.save()
+    mediaprobecache.save()
 
     # Block reconnecting consumer before setting window not visible
     updater.player_refresh_enabled = False
@@ -171,6 +171,7 @@ CC_PREVIEW_RENDER_DIR = "/preview_frames"
 USER_SHORTCUTS_DIR =  "user_shortcuts/"
 SCRIP_TOOL_DIR = "scripttool"
 TEMP_RENDER_DIR = "temprender/"
+RENDER_SEGMENTS_DIR = "render_segments"
 
 # Luma bands
 SHADOWS = 0
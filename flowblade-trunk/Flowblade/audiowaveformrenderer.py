@@ -90,6 +90,7 @@ def get_waveform_data(clip):
         if os.path.getsize(levels_file_path) == 0:
              print( "Size zero Audio levels file, this is error!", levels_file_path)
         waveform = utils.unpickle(levels_file_path)
+        utils.touch_cache_file(levels_file_path)
         _waveforms[clip.path] = waveform
         return waveform
     else:
@@ -0,0 +1,334 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module handles chunked parallel rendering of timeline.
+
+Render range is split into chunks at fixed timeline positions that fall on GOP boundaries,
+each chunk is rendered from saved project by its own headless process, see
+tools/chunkrenderheadless.py, and chunk files are concatenated into rendered file
+without re-encoding.
+
+Audio is not rendered in chunks. Encoder priming and padding at every chunk boundary
+would cause gaps and clicks and growing A/V drift, so chunks are rendered video only
+and audio for the whole render range is rendered by one more process and muxed with
+joined video.
+
+Rendered chunks are kept in segment cache, see segmentcache.py, and chunks with
+unchanged contents are not rendered again when timeline is re-exported.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+
+import ccrutils
+import respaths
+import segmentcache
+import userfolders
+import utils
+
+CHUNKS_DIR = "chunks/"
+RENDER_ARGS_FILE = "chunk_render_args"
+
+CORES_PER_CHUNK = 4 # Encoders are multithreaded, one process per core would only add memory use.
+MAX_CHUNKS = 16 # Max number of chunk render processes running at the same time.
+SEGMENT_SECONDS = 30
+
+# Containers that ffmpeg concat demuxer can join with stream copy.
+CHUNKABLE_EXTENSIONS = [".mp4", ".m4v", ".mov", ".mkv", ".webm", ".avi", ".ts", ".mpg", ".mpeg", ".mxf"]
+
+FRAME_SEQUENCE_CODECS = ["png","bmp","dpx","ppm","targa","tiff"]
+
+
+# ------------------------------------------------------------- interface
+def can_render_chunked(render_path, args_vals_list):
+    ext = os.path.splitext(render_path)[1].lower()
+    if ext not in CHUNKABLE_EXTENSIONS:
+        return False
+    if _get_arg_value(args_vals_list, "vcodec") in FRAME_SEQUENCE_CODECS:
+        return False
+    if shutil.which("ffmpeg") == None:
+        return False
+    return True
+
+def get_chunk_ranges(start_frame, end_frame, fps, args_vals_list):
+    """
+    Returns list of (range_in, range_out) inclusive frame ranges or None if
+    range is too short to gain from chunked render.
+    """
+    # Chunk boundaries are at multiples of segment length counted from timeline start,
+    # not from range start, so that the same timeline content falls into the same cached
+    # segments on every export. Segment length is a multiple of GOP length to keep keyframe
+    # cadence of a single render. Without GOP length arg chunks are aligned to seconds.
+    try:
+        gop = int(_get_arg_value(args_vals_list, "g"))
+    except (TypeError, ValueError):
+        gop = max(1, int(round(fps)))
+    if gop < 1:
+        gop = max(1, int(round(fps)))
+
+    segment_length = max(1, int(round((SEGMENT_SECONDS * fps) / gop))) * gop
+
+    chunk_ranges = []
+    range_in = start_frame
+    while range_in <= end_frame:
+        range_out = min((range_in // segment_length + 1) * segment_length - 1, end_frame)
+        chunk_ranges.append((range_in, range_out))
+        range_in = range_out + 1
+
+    if len(chunk_ranges) < 2:
+        return None
+
+    return chunk_ranges
+
+
+class ChunkedRender:
+    """
+    Launches chunk render processes, follows their progress and joins chunk files.
+    Chunks found in segment cache are used as is.
+    Methods are called from a single thread.
+
+    If cache_paths are given they are used as chunk segment cache paths instead of hashing
+    saved project, see previewrender.py.
+
+    If separate_audio is False chunks are rendered with audio. Such chunks can be played
+    one by one but should not be joined.
+    """
+    def __init__(self, project_path, render_path, args_vals_list, profile_desc, chunk_ranges, cache_paths=None, separate_audio=True):
+        self.project_path = project_path
+        self.render_path = render_path
+        self.args_vals_list = args_vals_list
+        self.profile_desc = profile_desc
+        self.parent_folder = userfolders.get_temp_render_dir()
+        self.chunks = []
+        self.max_running = min(MAX_CHUNKS, max(1, multiprocessing.cpu_count() // CORES_PER_CHUNK))
+        self.cache_paths = cache_paths
+
+        render_id = hashlib.md5(os.urandom(16)).hexdigest()
+        self.chunks_folder = self.parent_folder + CHUNKS_DIR + render_id + "/"
+        self.ext = os.path.splitext(render_path)[1]
+        ext = self.ext
+        for i in range(0, len(chunk_ranges)):
+            range_in, range_out = chunk_ranges[i]
+            session_id = render_id + "_" + str(i)
+            chunk_path = self.chunks_folder + "chunk_" + str(i).zfill(3) + ext
+            self.chunks.append(RenderChunk(session_id, chunk_path, range_in, range_out))
+
+        has_audio = (_get_arg_value(args_vals_list, "acodec") != None and _get_arg_value(args_vals_list, "an") == None)
+        self.audio_chunk = None
+        self.chunk_args_vals_list = args_vals_list
+        if separate_audio == True and has_audio == True:
+            self.chunk_args_vals_list = args_vals_list + [("an", "1")]
+            audio_path = self.chunks_folder + "audio" + ext
+            self.audio_chunk = RenderChunk(render_id + "_audio", audio_path, chunk_ranges[0][0], chunk_ranges[-1][1])
+            self.audio_chunk.args_vals_list = args_vals_list + [("vn", "1")]
+        for chunk in self.chunks:
+            chunk.args_vals_list = self.chunk_args_vals_list
+
+    def start(self):
+        os.makedirs(self.chunks_folder, exist_ok=True)
+
+        if self.cache_paths == None:
+            chunk_ranges = [(chunk.range_in, chunk.range_out) for chunk in self.chunks]
+            segment_hashes = segmentcache.get_segment_hashes(self.project_path, chunk_ranges, self.chunk_args_vals_list,
+                                                             self.profile_desc, self.ext)
+            if segment_hashes != None:
+                self.cache_paths = [segmentcache.get_segment_path(segment_hash, self.ext) for segment_hash in segment_hashes]
+
+        for i in range(0, len(self.chunks)):
+            chunk = self.chunks[i]
+            if self.cache_paths == None:
+                continue
+            chunk.cache_path = self.cache_paths[i]
+            if os.path.isfile(chunk.cache_path):
+                utils.touch_cache_file(chunk.cache_path)
+                chunk.chunk_path = chunk.cache_path
+                chunk.completed = True
+                chunk.fraction = 1.0
+
+        # Audio render is light compared to video chunks, it is not counted in running chunks limit.
+        if self.audio_chunk != None:
+            self.audio_chunk.process = self._launch_chunk_process(self.audio_chunk)
+
+        self._launch_pending_chunks()
+
+    def update(self):
+        """
+        Updates chunk states, returns True when all chunks have been rendered.
+        Raises ChunkRenderError if a render process has exited without completing.
+        """
+        all_completed = True
+        for chunk in self._get_all_chunks():
+            if chunk.completed == True:
+                continue
+            if chunk.process == None:
+                all_completed = False
+                continue
+            if ccrutils.session_render_complete(self.parent_folder, chunk.session_id) == True:
+                self._chunk_completed(chunk)
+                continue
+
+            all_completed = False
+            msg = ccrutils.get_session_status_message(self.parent_folder, chunk.session_id)
+            if msg != None:
+                try:
+                    fraction, elapsed = msg.split(" ")
+                    chunk.fraction = float(fraction)
+                except ValueError:
+                    pass
+            if chunk.process.poll() != None:
+                # Completed message may have been written just before exit.
+                if ccrutils.session_render_complete(self.parent_folder, chunk.session_id) == True:
+                    self._chunk_completed(chunk)
+                    continue
+                raise ChunkRenderError("Chunk render process for frames " + str(chunk.range_in) + "-" + str(chunk.range_out) + " exited with code " + str(chunk.process.returncode))
+
+        if all_completed == False:
+            self._launch_pending_chunks()
+
+        return all_completed
+
+    def get_render_fraction(self):
+        total_length = 0
+        rendered = 0.0
+        for chunk in self.chunks:
+            chunk_length = chunk.range_out - chunk.range_in + 1
+            total_length += chunk_length
+            rendered += chunk.fraction * chunk_length
+        return rendered / total_length
+
+    def join_chunks(self):
+        """
+        Concatenates chunk files and muxes separately rendered audio into render file
+        without re-encoding, returns True on success.
+        """
+        list_path = self.chunks_folder + "chunks.txt"
+        with open(list_path, "w") as f:
+            for chunk in self.chunks:
+                f.write("file '" + chunk.chunk_path.replace("'", "'\\''") + "'\n")
+
+        command_list = ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path]
+        if self.audio_chunk != None:
+            command_list += ["-i", self.audio_chunk.chunk_path, "-map", "0:v", "-map", "1:a"]
+        else:
+            command_list += ["-map", "0"]
+        command_list += ["-c", "copy", self.render_path]
+        try:
+            result = subprocess.run(command_list)
+            return (result.returncode == 0)
+        except OSError as e:
+            print("ChunkedRender.join_chunks:", e)
+            return False
+
+    def abort(self):
+        for chunk in self._get_all_chunks():
+            if chunk.completed == False and chunk.process != None:
+                ccrutils.abort_render(self.parent_folder, chunk.session_id)
+        for chunk in self._get_all_chunks():
+            if chunk.process != None:
+                try:
+                    chunk.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    chunk.process.kill()
+
+    def _launch_pending_chunks(self):
+        running = len([chunk for chunk in self.chunks if chunk.process != None and chunk.completed == False])
+        for chunk in self.chunks:
+            if running >= self.max_running:
+                return
+            if chunk.completed == True or chunk.process != None:
+                continue
+            chunk.process = self._launch_chunk_process(chunk)
+            running += 1
+
+    def _launch_chunk_process(self, chunk):
+        os.makedirs(ccrutils.get_session_folder(self.parent_folder, chunk.session_id), exist_ok=True)
+        ccrutils.write_misc_session_data(self.parent_folder, chunk.session_id, RENDER_ARGS_FILE, chunk.args_vals_list)
+        return self._launch_chunk_render(chunk)
+
+    def _get_all_chunks(self):
+        if self.audio_chunk != None:
+            return self.chunks + [self.audio_chunk]
+        return self.chunks
+
+    def _chunk_completed(self, chunk):
+        chunk.completed = True
+        chunk.fraction = 1.0
+        if chunk.cache_path == None:
+            return
+        try:
+            os.replace(chunk.chunk_path, chunk.cache_path)
+            chunk.chunk_path = chunk.cache_path
+        except OSError as e:
+            print("Moving rendered chunk to segment cache failed:", e)
+
+    def cleanup(self):
+        for chunk in self._get_all_chunks():
+            session_folder = ccrutils.get_session_folder(self.parent_folder, chunk.session_id)
+            shutil.rmtree(session_folder, ignore_errors=True)
+        shutil.rmtree(self.chunks_folder, ignore_errors=True)
+
+    def _launch_chunk_render(self, chunk):
+        command_list = [sys.executable]
+        command_list.append(respaths.LAUNCH_DIR + "flowbladechunkrenderheadless")
+        command_list.append("session_id:" + str(chunk.session_id))
+        command_list.append("parent_folder:" + str(self.parent_folder))
+        command_list.append("project_path:" + str(self.project_path))
+        command_list.append("chunk_path:" + str(chunk.chunk_path))
+        command_list.append("range_in:" + str(chunk.range_in))
+        command_list.append("range_out:" + str(chunk.range_out))
+        command_list.append("profile_desc:" + str(self.profile_desc).replace(" ", "_"))
+
+        return subprocess.Popen(command_list)
+
+
+class RenderChunk:
+
+    def __init__(self, session_id, chunk_path, range_in, range_out):
+        self.session_id = session_id
+        self.chunk_path = chunk_path
+        self.range_in = range_in
+        self.range_out = range_out
+        self.fraction = 0.0
+        self.completed = False
+        self.process = None
+        self.cache_path = None
+        self.args_vals_list = None
+
+
+class ChunkRenderError(Exception):
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
+
+
+# ------------------------------------------------------------- module functions
+def _get_arg_value(args_vals_list, arg_key):
+    for arg, val in args_vals_list:
+        if arg == arg_key:
+            return val
+    return None
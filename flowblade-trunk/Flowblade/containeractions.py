@@ -34,7 +34,6 @@ import subprocess
 import shutil
 import sys
 import threading
-import time
 
 import appconsts
 import atomicfile
@@ -770,7 +769,7 @@ class FluxityContainerActions(AbstractContainerActionObject):
         set_plugin_to_be_edited_func(clip, self)
 
     def abort_render(self):
-        fluxityheadless.abort_render(self.get_container_program_id())
+        fluxityheadless.abort_render(self.parent_folder, self.get_container_program_id())
 
     def create_icon(self):
         if self.container_data.data_slots["icon_file"] == None:
@@ -976,8 +975,7 @@ class UnrenderedCreationThread(threading.Thread):
 
         GLib.idle_add(self._show_progress_window,  clip_renderer)
     
-        while clip_renderer.stopped == False:       
-            time.sleep(0.5)
+        clip_renderer.wait_for_stop()
 
         GLib.idle_add(self._do_write_callback, write_file)
 
@@ -28,16 +28,31 @@ import threading
 import appconsts
 import dialogutils
 import editorpersistance
+from editorstate import PROJECT
 import gui
 import guiutils
+import projectdatavault
+import proxycache
 import userfolders
+import utils
 
 NO_WARNING = 0
 RECREATE_WARNING = 1
 PROJECT_DATA_WARNING = 2
 
+# Disk cache budget values in MB, 0 means no budget, see preferenceswindow.py
+DISK_CACHE_BUDGETS = [0, 1000, 2000, 5000, 10000]
+
+# When budget is exceeded, cache is evicted down to this fraction of budget.
+EVICTION_TARGET = 0.8
+
+# Seconds between budget enforcement runs.
+EVICTION_INTERVAL = 30 * 60
+
 _panels = None
 _legacy_disk_data_exists = True
+_eviction_thread = None
+_eviction_timeout_id = None
 
 
 def legacy_disk_data_exists():
@@ -217,6 +232,166 @@ def _check_cache_size():
 
     return False
 
+# ------------------------------------------------------------- budgeted LRU eviction
+def start_cache_eviction():
+    """
+    Starts enforcing disk cache budget now and periodically after this.
+    Called again when disk cache budget preference changes.
+    """
+    global _eviction_timeout_id
+    if _eviction_timeout_id != None:
+        GLib.source_remove(_eviction_timeout_id)
+        _eviction_timeout_id = None
+
+    if DISK_CACHE_BUDGETS[editorpersistance.prefs.disk_cache_budget] == 0:
+        return
+
+    _launch_cache_eviction()
+    _eviction_timeout_id = GLib.timeout_add_seconds(EVICTION_INTERVAL, _launch_cache_eviction)
+
+def _launch_cache_eviction():
+    global _eviction_thread, _eviction_timeout_id
+    budget = DISK_CACHE_BUDGETS[editorpersistance.prefs.disk_cache_budget] * 1000000
+    if budget == 0:
+        _eviction_timeout_id = None
+        return False # Budget was turned off, stop periodic runs.
+    
+    if _eviction_thread != None and _eviction_thread.is_alive():
+        return True
+
+    # Protected paths are collected here in GUI thread because project data is not thread safe.
+    protected_paths, protected_folders = _get_open_project_cache_data()
+
+    _eviction_thread = CacheEvictionThread(budget, _get_evictable_folders(), protected_paths, protected_folders)
+    _eviction_thread.start()
+
+    return True
+
+def _get_evictable_folders():
+    # These hold data that is recreated when needed: thumbnails, audio levels, trim view frames, render segments
+    # and shared proxies. Rendered clips, project proxies and container clips are project media and are never evicted automatically.
+    folders = [ userfolders.get_cache_dir() + appconsts.THUMBNAILS_DIR,
+                userfolders.get_cache_dir() + appconsts.AUDIO_LEVELS_DIR,
+                userfolders.get_cache_dir() + appconsts.TRIM_VIEW_DIR,
+                userfolders.get_cache_dir() + appconsts.RENDER_SEGMENTS_DIR]
+
+    vault_paths = [projectdatavault.get_default_vault_folder()]
+    for vault_data in projectdatavault.get_vaults_object().user_vaults_data:
+        vault_paths.append(vault_data["vault_path"])
+
+    for vault_path in vault_paths:
+        if not os.path.isdir(vault_path):
+            continue
+        for data_id in listdir(vault_path):
+            if data_id == projectdatavault.SHARED_PROXIES_FOLDER:
+                folders.append(join(vault_path, data_id))
+                continue
+            data_folder = join(vault_path, data_id)
+            folders.append(join(data_folder, projectdatavault.THUMBNAILS_FOLDER))
+            folders.append(join(data_folder, projectdatavault.AUDIO_LEVELS_FOLDER))
+
+    return folders
+
+def _get_open_project_cache_data():
+    protected_paths = set()
+    protected_folders = []
+    
+    project = PROJECT()
+    if project == None:
+        return (protected_paths, protected_folders)
+        
+    if projectdatavault.vault_data_exists_for_project() == True:
+        protected_folders.append(os.path.realpath(projectdatavault.get_project_data_folder()) + os.sep)
+
+    levels_dir = userfolders.get_audio_levels_dir()
+    for media_file in project.media_files.values():
+        icon_path = getattr(media_file, "icon_path", None)
+        if icon_path != None:
+            protected_paths.add(os.path.realpath(icon_path))
+        path = getattr(media_file, "path", None)
+        if path != None and os.path.isfile(path):
+            levels_file = levels_dir + utils.get_unique_name_for_audio_levels_file(path, project.profile)
+            protected_paths.add(os.path.realpath(levels_file))
+        # Proxy file is in 'path' or 'second_file_path' depending on proxy mode.
+        if getattr(media_file, "has_proxy_file", False) == True or getattr(media_file, "is_proxy_file", False) == True:
+            for proxy_path in [path, getattr(media_file, "second_file_path", None)]:
+                if proxy_path != None:
+                    protected_paths.add(os.path.realpath(proxy_path))
+
+    return (protected_paths, protected_folders)
+
+
+class CacheEvictionThread(threading.Thread):
+    """
+    Deletes least recently used cache files until disk cache size is below budget.
+
+    File modification times are used as last access times, cache users update them 
+    with utils.touch_cache_file() when reading cache files.
+    """
+    def __init__(self, budget, folders, protected_paths, protected_folders):
+        threading.Thread.__init__(self)
+        self.budget = budget
+        self.folders = folders
+        self.protected_paths = protected_paths
+        self.protected_folders = protected_folders
+
+    def run(self):
+        cache_files = []
+        total_size = 0
+        for folder in self.folders:
+            for entry_path, size, mtime in self._get_files(folder):
+                cache_files.append((mtime, entry_path, size))
+                total_size += size
+
+        if total_size <= self.budget:
+            return
+
+        target_size = self.budget * EVICTION_TARGET
+        evicted_count = 0
+        evicted_size = 0
+        cache_files.sort()
+        for mtime, file_path, size in cache_files:
+            if total_size <= target_size:
+                break
+            if self._is_protected(file_path):
+                continue
+            try:
+                os.remove(file_path)
+                total_size -= size
+                evicted_count += 1
+                evicted_size += size
+            except OSError:
+                pass
+
+        print("Disk cache budget exceeded, evicted", evicted_count, "files,", utils.get_disk_size_str(evicted_size))
+
+    def _get_files(self, folder):
+        files = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            files.append((entry.path, stat.st_size, stat.st_mtime))
+                    except OSError:
+                        pass
+        except OSError:
+            pass # Folder does not exist.
+        return files
+
+    def _is_protected(self, file_path):
+        if proxycache.is_render_file(file_path):
+            return True # Proxy is being rendered, stale render files are deleted by proxycache.
+        real_path = os.path.realpath(file_path)
+        if real_path in self.protected_paths:
+            return True
+        for folder in self.protected_folders:
+            if real_path.startswith(folder):
+                return True
+        return False
+
+
 def _show_warning(size_str):
     primary_txt = _("Disk Cache Size Exceeds Current Warning Level!")
     secondary_txt = _("Flowblade currently uses ") + size_str + _(" of disk space.") + "\n\n" + \
@@ -233,6 +408,7 @@ def _get_disk_dir_panels():
     panels.append(DiskFolderManagementPanel(userfolders.get_render_dir(True), "/" + appconsts.PROXIES_DIR, _("Proxy Files"), PROJECT_DATA_WARNING))
     panels.append(DiskFolderManagementPanel(userfolders.get_data_dir(), appconsts.CONTAINER_CLIPS_DIR, _("Container Clips"), PROJECT_DATA_WARNING, True))
     panels.append(DiskFolderManagementPanel(userfolders.get_cache_dir(), appconsts.THUMBNAILS_DIR, _("Thumbnails"), RECREATE_WARNING))
+    panels.append(DiskFolderManagementPanel(userfolders.get_cache_dir(), appconsts.RENDER_SEGMENTS_DIR, _("Render Segments"), RECREATE_WARNING))
     # This is too small amount of data to make deletable.
     #panels.append(DiskFolderManagementPanel(userfolders.get_data_dir(), appconsts.USER_PROFILES_DIR_NO_SLASH, _("User Created Custom Profiles"), PROJECT_DATA_WARNING))
 
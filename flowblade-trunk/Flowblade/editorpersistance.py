@@ -179,7 +179,7 @@ def update_prefs_from_widgets(widgets_tuples_tuple):
 
     # Aug-2019 - SvdB - AS - added autosave_combo
     default_profile_combo, open_in_last_opened_check, open_in_last_rendered_check, undo_max_spin, load_order_combo, \
-        autosave_combo, render_folder_select, disk_cache_warning_combo = gen_opts_widgets
+        autosave_combo, render_folder_select, disk_cache_warning_combo, disk_cache_budget_combo = gen_opts_widgets
 
     # Jul-2016 - SvdB - Added play_pause_button
     # Apr-2017 - SvdB - Added ffwd / rev values
@@ -193,7 +193,7 @@ def update_prefs_from_widgets(widgets_tuples_tuple):
     top_row_layout, layout_monitor = view_prefs_widgets
 
     # Jan-2017 - SvdB
-    perf_render_threads, perf_drop_frames = performance_widgets
+    perf_render_threads, perf_drop_frames, jobs_concurrency_combo = performance_widgets
 
     global prefs
     prefs.open_in_last_opended_media_dir = open_in_last_opened_check.get_active()
@@ -229,6 +229,7 @@ def update_prefs_from_widgets(widgets_tuples_tuple):
     # Jan-2017 - SvdB
     prefs.perf_render_threads = int(perf_render_threads.get_adjustment().get_value())
     prefs.perf_drop_frames = perf_drop_frames.get_active()
+    prefs.jobs_concurrency_limit = jobs_concurrency_combo.get_active()
     # Feb-2017 - SvdB - for full file names
     prefs.show_full_file_names = full_names.get_active()
     prefs.center_on_arrow_move = auto_center_on_updown.get_active()
@@ -241,6 +242,7 @@ def update_prefs_from_widgets(widgets_tuples_tuple):
     if len(render_folder_select.get_filenames()) != 0:
         prefs.default_render_directory = render_folder_select.get_filename()
     prefs.disk_space_warning = disk_cache_warning_combo.get_active()
+    prefs.disk_cache_budget = disk_cache_budget_combo.get_active()
     prefs.auto_render_media_plugins = auto_render_plugins.get_active()
     prefs.dnd_action = dnd_action.get_active()
     
@@ -347,7 +349,7 @@ class EditorPreferences:
         self.tline_render_encoding = 0 # index of available proxy encodings, timeline rendering uses same encodings.
         self.tline_render_size = appconsts.PROXY_SIZE_FULL
         self.open_jobs_panel_on_add = True
-        self.render_jobs_sequentially = True
+        self.render_jobs_sequentially = True # DEPRECATED, jobs.py schedules jobs using 'jobs_concurrency_limit'.
         self.disk_space_warning = 1 #  [off, 500MB,1GB, 2GB], see preferenceswindow.py
         # Toolbar preferences panel for free elements and order
         self.groups_tools =  [  appconsts.WORKFLOW_LAUNCH, appconsts.TOOL_SELECT, appconsts.BUTTON_GROUP_ZOOM, \
@@ -365,3 +367,6 @@ class EditorPreferences:
         self.quick_effects = None
         self.auto_render_media_plugins = True
         self.zoom_to_playhead = True
+        self.jobs_concurrency_limit = 0 # 0 == number of CPU cores, see jobs.get_concurrency_limit()
+        self.disk_cache_budget = 0 # index to diskcachemanagement.DISK_CACHE_BUDGETS, [off, 1GB, 2GB, 5GB, 10GB], see preferenceswindow.py
+        self.batch_render_parallel_limit = 0 # index to batchrendering.PARALLEL_RENDERS_LIMITS, 0 == from CPU count
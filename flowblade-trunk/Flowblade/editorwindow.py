@@ -69,11 +69,13 @@ import panels
 import patternproducer
 from positionbar import PositionBar
 import preferenceswindow
+import previewrender
 import projectaction
 import projectaddmediafolder
 import projectdatavaultgui
 import projectinfogui
 import proxyediting
+import renderstats
 import scripttool
 import shortcuts
 import singletracktransition
@@ -841,6 +843,10 @@ class EditorWindow:
             ('DeleteAudioTrack', None, _('Delete Audio Track'), None, None, lambda a:projectaction.delete_audio_track()),
             ('ChangeSequenceTracks', None, _('Change Sequence Tracks Count...'), None, None, lambda a:projectaction.change_sequence_track_count()),
             ('Watermark', None, _('Watermark...'), None, None, lambda a:menuactions.edit_watermark()),
+            ('PreviewRenderMarked', None, _('Preview Render Marked Range'), None, None, lambda a:previewrender.render_marked_range_preview()),
+            ('PreviewRenderHeavy', None, _('Preview Render Heavy Ranges'), None, None, lambda a:previewrender.render_heavy_ranges_preview()),
+            ('PreviewRenderClear', None, _('Clear Preview Renders'), None, None, lambda a:previewrender.clear_preview_renders()),
+            ('RenderStats', None, _('Render Statistics...'), None, None, lambda a:renderstats.show_render_stats_dialog()),
             ('ProfilesManager', None, _('Profiles Manager'), None, None, lambda a:menuactions.profiles_manager()),
             ('Preferences', None, _('Preferences'), None, None, lambda a:preferenceswindow.preferences_dialog()),
             ('ViewMenu', None, _('View')),
@@ -1023,6 +1029,12 @@ class EditorWindow:
                     <separator/>
                     <menuitem action='ReRenderTransitionsFades'/>
                     <separator/>
+                    <menuitem action='PreviewRenderMarked'/>
+                    <menuitem action='PreviewRenderHeavy'/>
+                    <menuitem action='PreviewRenderClear'/>
+                    <separator/>
+                    <menuitem action='RenderStats'/>
+                    <separator/>
                     <menuitem action='Render'/>
                 </menu>
                 <menu action='ToolsMenu'>
@@ -26,7 +26,6 @@ try:
     import mlt7 as mlt
 except:
     import mlt
-import time
 import hashlib
 import re
 import shutil
@@ -434,11 +433,8 @@ def render_screen_shot(frame, render_path, vcodec):
     renderer.consumer_pos_stop_add = 2
     renderer.start()
 
-    while renderer.has_started_running == False:
-        time.sleep(0.05)
-
-    while renderer.stopped == False:
-        time.sleep(0.05)
+    renderer.wait_for_start()
+    renderer.wait_for_stop()
 
 def export_screenshot_dialog(callback, frame, parent_window, project_name):
     cancel_str = _("Cancel")
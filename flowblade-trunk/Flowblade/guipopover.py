@@ -568,7 +568,7 @@ def media_file_popover_show(media_file, widget, x, y, callback):
     rect = create_rect(x, y)
     _media_file_popover = new_mouse_popover(widget, _media_file_menu, rect)
 
-def jobs_menu_popover_show(launcher, widget, callback):
+def jobs_menu_popover_show(launcher, widget, callback, queue_paused):
     global _jobs_popover, _jobs_menu
 
     _jobs_menu = menu_clear_or_create(_jobs_menu)
@@ -578,6 +578,10 @@ def jobs_menu_popover_show(launcher, widget, callback):
     add_menu_action(cancel_section, _("Cancel All Renders"), "jobspanel.cancelall",  "cancel_all", callback)
     _jobs_menu.append_section(None, cancel_section)
 
+    queue_section = Gio.Menu.new()
+    add_menu_action_check(queue_section, _("Pause Starting Queued Renders"), "jobspanel.pausequeue", queue_paused, "pause_queue", callback)
+    _jobs_menu.append_section(None, queue_section)
+
     options_section = Gio.Menu.new()
     add_menu_action_check(options_section, _("Show Jobs Panel on Adding New Job"), "jobspanel.showonadd", editorpersistance.prefs.open_jobs_panel_on_add, "open_on_add", callback)
     _jobs_menu.append_section(None, options_section)
@@ -22,7 +22,6 @@
 Module contains utility methods for creating GUI objects.
 """
 import cairo
-import time
 import threading
 
 from gi.repository import Gtk, Gdk, GLib
@@ -530,8 +529,8 @@ class ProgressWindowThread(threading.Thread):
             if self.clip_renderer.stopped == True:
                 self.running = False
                 GLib.idle_add(self._render_complete)
-
-            time.sleep(0.33)
+            else:
+                self.clip_renderer.wait_for_stop(0.33)
     
     def _update_progress_bar(self):
         render_fraction = self.clip_renderer.get_render_fraction()
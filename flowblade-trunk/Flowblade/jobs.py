@@ -23,7 +23,9 @@ from gi.repository import Gtk, GLib, Gdk, GdkPixbuf
 from gi.repository import GObject
 from gi.repository import Pango
 
+import multiprocessing
 import os
+import shutil
 import subprocess
 import sys
 import time
@@ -34,6 +36,7 @@ except:
     import mlt
 
 import appconsts
+import ccrutils
 import editorlayout
 import editorpersistance
 from editorstate import PROJECT
@@ -43,6 +46,7 @@ import guipopover
 import guiutils
 import motionheadless
 import persistance
+import proxycache
 import proxyheadless
 import renderconsumer
 import respaths
@@ -53,6 +57,7 @@ QUEUED = 0
 RENDERING = 1
 COMPLETED = 2
 CANCELLED = 3
+FAILED = 4
 
 NOT_SET_YET = 0
 CONTAINER_CLIP_RENDER_GMIC = 1
@@ -62,6 +67,32 @@ MOTION_MEDIA_ITEM_RENDER = 4
 PROXY_RENDER = 5
 CONTAINER_CLIP_RENDER_FLUXITY = 6
 
+# Scheduling cost of job types as number of CPU cores used. Queued jobs are started 
+# while total cost of running jobs stays within concurrency limit.
+JOB_COSTS = {   CONTAINER_CLIP_RENDER_GMIC: 1,
+                CONTAINER_CLIP_RENDER_MLT_XML: 2,
+                CONTAINER_CLIP_RENDER_BLENDER: 2,
+                MOTION_MEDIA_ITEM_RENDER: 2,
+                PROXY_RENDER: 2,
+                CONTAINER_CLIP_RENDER_FLUXITY: 1}
+
+# Queued jobs with smaller priority value are started first, jobs with same priority in order of adding.
+# Container clip renders are started first because user is waiting to see them in timeline.
+JOB_PRIORITIES = {  CONTAINER_CLIP_RENDER_GMIC: 0,
+                    CONTAINER_CLIP_RENDER_MLT_XML: 0,
+                    CONTAINER_CLIP_RENDER_BLENDER: 0,
+                    CONTAINER_CLIP_RENDER_FLUXITY: 0,
+                    MOTION_MEDIA_ITEM_RENDER: 1,
+                    PROXY_RENDER: 2}
+
+# Long proxy renders are split into segments rendered in parallel when capacity is available.
+PROXY_SEGMENT_MIN_LENGTH = 300 # seconds
+PROXY_MAX_SEGMENTS = 16
+
+# Session channel messages can be dropped when receive queue is full, jobs with channel
+# are also polled with this interval so completed message files are always noticed.
+CHANNEL_FALLBACK_POLL_INTERVAL = 3.0 # seconds
+
 FFMPEG_ATTR_SOURCEFILE = "%SOURCEFILE"
 FFMPEG_ATTR_SCREENSIZE = "%SCREENSIZE"
 FFMPEG_ATTR_SCREENSIZE_2 = "%SCREEN%SIZE%TWO%"
@@ -71,6 +102,9 @@ open_media_file_callback = None
 
 _status_polling_thread = None
 
+_channel_watches = {} # session_id -> GLib source id for render process session channel
+_pending_channel_updates = set()
+
 _jobs_list_view = None
 
 _jobs = [] # proxy objects that represent background renders and provide info on render status.
@@ -78,6 +112,8 @@ _remove_list = [] # objects are removed from GUI with delay to give user time to
 
 _jobs_render_progress_window = None
 
+_queue_paused = False
+
 
 class JobProxy: # This object represents job in job queue. 
 
@@ -89,6 +125,13 @@ class JobProxy: # This object represents job in job queue.
         self.progress = 0.0 # 0.0. - 1.0
         self.text = ""
         self.elapsed = 0.0 # in fractional seconds
+        
+        # Jobs get status pushed by render process through session channel, 
+        # jobs that have no render process with channel are set to be polled.
+        self.status_polled = False
+        
+        # Number of render processes job uses, scheduling cost is multiplied by this.
+        self.parallel_parts = 1
 
         # callback_object have to implement interface:
         #     start_render()
@@ -124,6 +167,10 @@ class JobProxy: # This object represents job in job queue.
     def abort_render(self):
         self.callback_object.abort_render()
 
+    def get_session_ids(self):
+        # Sessions of render processes pushing status through session channels.
+        return [self.proxy_uid]
+
 
 class JobQueueMessage:  # Jobs communicate with job queue by sending these objects.
     
@@ -144,12 +191,7 @@ def add_job(job_proxy):
     if editorpersistance.prefs.open_jobs_panel_on_add == True:
         editorlayout.show_panel(appconsts.PANEL_JOBS)
     
-    if editorpersistance.prefs.render_jobs_sequentially == False: # Feature not active for first release 2.6.
-        job_proxy.start_render()
-    else:
-         running = _get_jobs_with_status(RENDERING)
-         if len(running) == 0:
-             job_proxy.start_render()
+    _start_queued_jobs()
 
     # Get polling going if needed.
     global _status_polling_thread
@@ -180,14 +222,21 @@ def update_job_queue(job_msg): # We're using JobProxy objects as messages to upd
     _jobs[row].progress = job_msg.progress
 
     if job_msg.status == COMPLETED:
+        _close_job_channel(_jobs[row])
         _jobs[row].status = COMPLETED
         _jobs[row].text = _("Completed")
         _jobs[row].progress = 1.0
         _remove_list.append(_jobs[row])
         GLib.timeout_add(4000, _remove_jobs)
-        waiting_jobs = _get_jobs_with_status(QUEUED)
-        if len(waiting_jobs) > 0:
-            waiting_jobs[0].start_render()
+        _start_queued_jobs()
+    elif job_msg.status == FAILED:
+        # Failed jobs are displayed longer so that user can read the error.
+        _close_job_channel(_jobs[row])
+        _jobs[row].status = FAILED
+        _jobs[row].progress = -1.0
+        _remove_list.append(_jobs[row])
+        GLib.timeout_add(10000, _remove_jobs)
+        _start_queued_jobs()
     else:
         _jobs[row].status = job_msg.status
 
@@ -207,6 +256,7 @@ def _cancel_all_jobs():
     for job in _jobs:
         if job.status == RENDERING:
             job.abort_render()
+            _close_job_channel(job)
         job.progress = -1.0
         job.text = _("Cancelled")
         job.status = CANCELLED
@@ -219,8 +269,8 @@ def _cancel_all_jobs():
 def get_jobs_of_type(job_type):
     jobs_of_type = []
     for job in _jobs:
-        job.type = job_type
-        jobs_of_type.append(job)
+        if job.type == job_type:
+            jobs_of_type.append(job)
     
     return jobs_of_type
 
@@ -256,11 +306,105 @@ def get_jobs_panel():
 def get_active_jobs_count():
     return len(_jobs)
 
+def get_concurrency_limit():
+    """
+    Returns max. total cost of concurrently running jobs, see JOB_COSTS.
+    """
+    if editorpersistance.prefs.jobs_concurrency_limit == 0: # 0 == from CPU count
+        return multiprocessing.cpu_count()
+    return editorpersistance.prefs.jobs_concurrency_limit
+
+def pause_queue():
+    """
+    Queued jobs are not started until resume_queue() is called, running jobs are not affected.
+    """
+    global _queue_paused
+    _queue_paused = True
+    
+def resume_queue():
+    global _queue_paused
+    _queue_paused = False
+    _start_queued_jobs()
+
+def queue_paused():
+    return _queue_paused
+
 
 
 # ------------------------------------------------------------- module functions
+def _start_queued_jobs():
+    if _queue_paused == True:
+        return
+
+    running_cost = 0
+    for job in _get_jobs_with_status(RENDERING):
+        running_cost += _get_job_cost(job)
+
+    limit = get_concurrency_limit()
+    queued = sorted(_get_jobs_with_status(QUEUED), key=lambda job: JOB_PRIORITIES.get(job.type, 0))
+    for job in queued:
+        cost = _get_job_cost(job)
+        # Job more expensive than limit is run alone. Later jobs are not started before
+        # earlier ones to keep priority order and to not starve expensive jobs.
+        if running_cost > 0 and running_cost + cost > limit:
+            break
+
+        if job.type == PROXY_RENDER:
+            # Long proxy renders use capacity left over from other jobs.
+            job.set_parallel_parts(cost, limit - running_cost - cost)
+            cost = _get_job_cost(job)
+
+        job.status = RENDERING
+        _open_job_channel(job)
+        job.start_render()
+        running_cost += cost
+
+def _get_job_cost(job):
+    return JOB_COSTS.get(job.type, 1) * job.parallel_parts
+
+def _open_job_channel(job):
+    # Channels are opened before render processes are launched so no messages are lost.
+    for session_id in job.get_session_ids():
+        channel = ccrutils.open_session_channel(session_id)
+        if channel == None:
+            job.status_polled = True
+            continue
+
+        watch_id = GLib.io_add_watch(channel.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, _job_channel_readable, job, session_id)
+        _channel_watches[session_id] = watch_id
+
+def _job_channel_readable(fd, condition, job, session_id):
+    channel = ccrutils.get_session_channel(session_id)
+    if channel == None:
+        _channel_watches.pop(session_id, None)
+        return False
+
+    channel.receive_messages()
+    _request_job_update(job)
+
+    return True
+
+def _request_job_update(job):
+    # Messages and polls arriving before update is done are handled by same update. 
+    # Idles run in order so job is not completed twice.
+    if not(job.proxy_uid in _pending_channel_updates):
+        _pending_channel_updates.add(job.proxy_uid)
+        GLib.idle_add(_update_job_from_channel, job)
+
+def _update_job_from_channel(job):
+    _pending_channel_updates.discard(job.proxy_uid)
+    if job.status == RENDERING:
+        job.callback_object.update_render_status()
+
+def _close_job_channel(job):
+    for session_id in job.get_session_ids():
+        watch_id = _channel_watches.pop(session_id, None)
+        if watch_id != None:
+            GLib.source_remove(watch_id)
+        ccrutils.close_session_channel(session_id)
+
 def _menu_action_pressed(launcher, widget, event, data):
-    guipopover.jobs_menu_popover_show(launcher, widget, _hamburger_item_activated)
+    guipopover.jobs_menu_popover_show(launcher, widget, _hamburger_item_activated, _queue_paused)
     
 def _hamburger_item_activated(action, variant, msg=None):
     print(msg)
@@ -275,6 +419,7 @@ def _hamburger_item_activated(action, variant, msg=None):
         
         job = _jobs[jobs_list_index]
         job.abort_render()
+        _close_job_channel(job)
         job.progress = -1.0
         job.text = _("Cancelled")
         job.status = CANCELLED
@@ -283,7 +428,16 @@ def _hamburger_item_activated(action, variant, msg=None):
         _jobs_list_view.fill_data_model()
         _jobs_list_view.scroll.queue_draw()
         GLib.timeout_add(4000, _remove_jobs)
+        _start_queued_jobs()
         
+    elif msg == "pause_queue":
+        new_state = not(action.get_state().get_boolean())
+        if new_state == True:
+            pause_queue()
+        else:
+            resume_queue()
+        action.set_state(GLib.Variant.new_boolean(new_state))
+
     elif msg == "open_on_add":
         new_state = not(action.get_state().get_boolean())
         editorpersistance.prefs.open_jobs_panel_on_add = new_state
@@ -306,11 +460,7 @@ def _remove_jobs():
         else:
             pass
 
-    running = _get_jobs_with_status(RENDERING)
-    if len(running) == 0:
-        in_queue = _get_jobs_with_status(QUEUED)
-        if len(in_queue) > 0:
-            in_queue[0].start_render()
+    _start_queued_jobs()
 
     _jobs_list_view.fill_data_model()
     _jobs_list_view.scroll.queue_draw()
@@ -454,6 +604,13 @@ class AbstractJobQueueObject(JobProxy):
         job_queue_message.text = "dummy" # this will be overwritten with completion message
         return job_queue_message
 
+    def get_failed_job_message(self, error_text):
+        job_queue_message = self.get_job_queue_message()
+        job_queue_message.status = FAILED
+        job_queue_message.progress = -1.0
+        job_queue_message.text = _("Failed") + " - " + self.get_job_name() + ": " + error_text
+        return job_queue_message
+
 
 
 class MotionRenderJobQueueObject(AbstractJobQueueObject):
@@ -538,11 +695,60 @@ class ProxyRenderJobQueueObject(AbstractJobQueueObject):
         
         self.render_data = render_data # 'render_data' is proxyediting.ProxyRenderItemData
         self.parent_folder = userfolders.get_temp_render_dir()
+        self.segments = None # list of ProxySegment objects when source is rendered in parallel segments
+        self.join_thread = None
 
     def get_job_name(self):
         folder, file_name = os.path.split(self.render_data.media_file_path)
         return file_name
-        
+
+    def get_session_ids(self):
+        if self.segments != None:
+            return [segment.session_id for segment in self.segments]
+        return [self.session_id]
+
+    def set_parallel_parts(self, part_cost, free_cost):
+        # Called by scheduler before start_render() with capacity not used by other jobs.
+        self.parallel_parts = 1
+        self.segments = None
+
+        enc_opt = renderconsumer.proxy_encodings[self.render_data.enc_index]
+        if enc_opt.ffmpeggpuenc != None or self.render_data.lookup_path != None:
+            return # only MLT video renders are split
+        if self.render_data.media_length <= 0 or shutil.which("ffmpeg") == None:
+            return # segments are joined using ffmpeg
+
+        fps = PROJECT().profile.fps()
+        max_by_length = int(self.render_data.media_length / (fps * PROXY_SEGMENT_MIN_LENGTH))
+        parts = min(max_by_length, 1 + max(0, free_cost) // part_cost, PROXY_MAX_SEGMENTS)
+        if parts < 2:
+            return
+
+        # Separately encoded audio segments would have encoder priming and padding at every
+        # segment boundary, so segments are video only and audio is rendered once for whole source
+        # and muxed at join, like in chunkrender.ChunkedRender.
+        separate_audio = (enc_opt.acodec != None)
+        video_streams = None
+        if separate_audio == True:
+            video_streams = "video"
+
+        path_start, file_extension = os.path.splitext(self.render_data.proxy_file_path)
+        segment_length = self.render_data.media_length // parts
+        self.segments = []
+        for i in range(0, parts):
+            range_in = i * segment_length
+            range_out = range_in + segment_length - 1
+            if i == parts - 1:
+                range_out = self.render_data.media_length - 1
+            segment_path = path_start + "_segment_" + str(i) + file_extension
+            self.segments.append(ProxySegment(self.session_id + "_" + str(i), segment_path, range_in, range_out, video_streams))
+
+        if separate_audio == True:
+            audio_path = path_start + "_audio" + file_extension
+            self.segments.append(ProxySegment(self.session_id + "_audio", audio_path, 0, self.render_data.media_length - 1, "audio"))
+
+        self.parallel_parts = parts
+
     def start_render(self):
         job_msg = self.get_job_queue_message()
         job_msg.text = _("Render Starting...")
@@ -550,34 +756,18 @@ class ProxyRenderJobQueueObject(AbstractJobQueueObject):
         update_job_queue(job_msg)
         
         enc_opt = renderconsumer.proxy_encodings[self.render_data.enc_index]
-        args = self.render_data.get_data_as_args_tuple()
         if enc_opt.ffmpeggpuenc == None:
             # MLT proxy rendering
             self.is_mlt_render = True
-            
-            # Create command list and launch process.
-            command_list = [sys.executable]
-            command_list.append(respaths.LAUNCH_DIR + "flowbladeproxyheadless")
-
-
-            # Info print, try to remove later.
-            proxy_profile_path = userfolders.get_cache_dir() + "temp_proxy_profile"
-            proxy_profile = mlt.Profile(proxy_profile_path)
-            enc_index = int(utils.get_headless_arg_value(args, "enc_index"))
-
-            for arg in args:
-                command_list.append(arg)
-                
-            session_arg = "session_id:" + str(self.session_id)
-            command_list.append(session_arg)
-
-            parent_folder_arg = "parent_folder:" + str(self.parent_folder)
-            command_list.append(parent_folder_arg)
-
-            subprocess.Popen(command_list)
+            if self.segments == None:
+                self._launch_mlt_render(self.session_id, self.render_data.proxy_file_path)
+            else:
+                for segment in self.segments:
+                    segment.process = self._launch_mlt_render(segment.session_id, segment.file_path, segment.range_in, segment.range_out, segment.streams)
         else:
             # FFMPEG CLI proxy rendering.
             self.is_mlt_render = False
+            self.status_polled = True # no render process to push status
             
             # Build ffmpeg CLI string.
             proxy_attr_str = enc_opt.attr_string
@@ -601,13 +791,34 @@ class ProxyRenderJobQueueObject(AbstractJobQueueObject):
             self.ffmpeg_remnder_thread = FFmpegRenderThread(ffmpeg_command)
             self.ffmpeg_remnder_thread.start()
 
+    def _launch_mlt_render(self, session_id, proxy_file_path, range_in=None, range_out=None, streams=None):
+        # Create command list and launch process.
+        command_list = [sys.executable]
+        command_list.append(respaths.LAUNCH_DIR + "flowbladeproxyheadless")
+
+        args = self.render_data.get_data_as_args_tuple(proxy_file_path)
+        for arg in args:
+            command_list.append(arg)
+            
+        command_list.append("session_id:" + str(session_id))
+        command_list.append("parent_folder:" + str(self.parent_folder))
+        if range_in != None:
+            command_list.append("range_in:" + str(range_in))
+            command_list.append("range_out:" + str(range_out))
+        if streams != None:
+            command_list.append("streams:" + streams)
+
+        return subprocess.Popen(command_list)
+
     def update_render_status(self):
 
         GLib.idle_add(self._update_from_gui_thread)
             
     def _update_from_gui_thread(self):
         
-        if self.is_mlt_render == True:
+        if self.segments != None:
+            self._update_segmented_render()
+        elif self.is_mlt_render == True:
             if proxyheadless.session_render_complete(self.parent_folder, self.get_session_id()) == True:
                 
                 job_msg = self.get_completed_job_message()
@@ -653,34 +864,180 @@ class ProxyRenderJobQueueObject(AbstractJobQueueObject):
                 job_msg = self.get_job_queue_message()
                 update_job_queue(job_msg)
                     
+    def _update_segmented_render(self):
+        if self.join_thread != None:
+            return # Segments are being joined, job is completed when done.
+
+        fractions = []
+        elapsed = 0.0
+        for segment in self.segments:
+            if segment.completed == False and proxyheadless.session_render_complete(self.parent_folder, segment.session_id) == True:
+                segment.completed = True
+                proxyheadless.delete_session_folders(self.parent_folder, segment.session_id)
+            elif segment.completed == False and segment.process != None and segment.process.poll() != None:
+                # Process may have written completed message just before exiting.
+                if proxyheadless.session_render_complete(self.parent_folder, segment.session_id) == False:
+                    self._segment_render_failed(segment)
+                    return
+                segment.completed = True
+                proxyheadless.delete_session_folders(self.parent_folder, segment.session_id)
+            if segment.completed == True:
+                fractions.append(1.0)
+                continue
+
+            status = proxyheadless.get_session_status(self.parent_folder, segment.session_id)
+            if status != None:
+                fraction, segment_elapsed = status
+                fractions.append(min(float(fraction), 1.0))
+                elapsed = max(elapsed, float(segment_elapsed))
+            else:
+                fractions.append(0.0)
+
+        if len([segment for segment in self.segments if segment.completed == False]) == 0:
+            self.text = _("Joining Segments") + " - " + self.get_job_name()
+            self.join_thread = ProxySegmentsJoinThread(self)
+            self.join_thread.start()
+        else:
+            self.text = self.get_job_name() + " - " + str(self.parallel_parts) + " " + _("Segments")
+            self.progress = sum(fractions) / len(fractions)
+            self.elapsed = elapsed
+
+        job_msg = self.get_job_queue_message()
+        update_job_queue(job_msg)
+
+    def _segment_render_failed(self, failed_segment):
+        print("Proxy segment render process exited without completing for", self.render_data.media_file_path, 
+              "exit code", failed_segment.process.returncode)
+        for segment in self.segments:
+            if segment.completed == False and segment.process != None and segment.process.poll() == None:
+                motionheadless.abort_render(self.parent_folder, segment.session_id)
+        self._delete_segment_files(True)
+
+        update_job_queue(self.get_failed_job_message(_("segment render process crashed")))
+
+    def segments_joined(self, success, error_text):
+        # Segments are not needed after join attempt, partial proxy file from failed or aborted join is removed too.
+        self._delete_segment_files(success == False)
+
+        if self.status == CANCELLED:
+            return
+
+        if success == True:
+            job_msg = self.get_completed_job_message()
+            update_job_queue(job_msg)
+            self.proxy_render_complete()
+        else:
+            print("Joining proxy segments failed for", self.render_data.media_file_path, error_text)
+            update_job_queue(self.get_failed_job_message(_("joining segments failed")))
+
+    def _delete_segment_files(self, delete_proxy_file):
+        paths = [segment.file_path for segment in self.segments]
+        if delete_proxy_file == True:
+            paths.append(self.render_data.proxy_file_path)
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
     def abort_render(self):
         if self.is_mlt_render == True:
             # remove_as_status_polling_object(self)
-            motionheadless.abort_render(self.parent_folder, self.get_session_id())
+            for session_id in self.get_session_ids():
+                motionheadless.abort_render(self.parent_folder, session_id)
+        if self.join_thread != None:
+            self.join_thread.abort() # Files are deleted in segments_joined().
+        elif self.segments != None:
+            self._delete_segment_files(True)
+        elif self.render_data.cache_proxy_path != None:
+            proxycache.delete_render_file(self.render_data.proxy_file_path)
         
         # NOTE: ffmpeg cli render not abortable currently.
         
     def proxy_render_complete(self):
+        # Shared proxy is made available to other projects even if media file has been deleted.
+        proxy_file_path = self.render_data.proxy_file_path
+        if self.render_data.cache_proxy_path != None:
+            proxy_file_path = proxycache.proxy_render_complete(proxy_file_path, self.render_data.cache_proxy_path)
+
         try:
             media_file = PROJECT().media_files[self.render_data.media_file_id]
         except:
             # User has deleted media file before proxy render complete
             return
 
-        media_file.add_proxy_file(self.render_data.proxy_file_path)
+        media_file.add_proxy_file(proxy_file_path)
 
         if PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA: # When proxy mode is USE_PROXY_MEDIA all proxy files are used all the time
             media_file.set_as_proxy_media_file()
         
             # if the rendered proxy file was the last proxy file being rendered,
-            # auto re-convert to update proxy clips.
-            proxy_jobs = get_jobs_of_type(PROXY_RENDER)
-            if len(proxy_jobs) == 0:
-                self.render_data.do_auto_re_convert_func()
-            elif len(proxy_jobs) == 1:
+            # auto re-convert to update proxy clips. Completed jobs stay in jobs list
+            # for a while and several proxy renders may be running at the same time,
+            # so we count only jobs not yet completed.
+            unfinished_proxy_jobs = [job for job in get_jobs_of_type(PROXY_RENDER) if job.status == QUEUED or job.status == RENDERING]
+            if len(unfinished_proxy_jobs) == 0:
                 self.render_data.do_auto_re_convert_func()
 
 
+class ProxySegment:
+    
+    def __init__(self, session_id, file_path, range_in, range_out, streams=None):
+        self.session_id = session_id
+        self.file_path = file_path
+        self.range_in = range_in
+        self.range_out = range_out
+        self.streams = streams # None for video and audio, "video" or "audio" for one of them
+        self.completed = False
+        self.process = None
+
+
+class ProxySegmentsJoinThread(threading.Thread):
+    """
+    Joins video segment files into proxy file and muxes whole source audio into it
+    without re-encoding. Every segment starts with a keyframe because they were encoded separately.
+    """
+    def __init__(self, job):
+        self.job = job
+        self.process = None
+        self.aborted = False
+
+        threading.Thread.__init__(self)
+
+    def run(self):
+        list_path = self.job.parent_folder + self.job.session_id + "_segments.txt"
+        audio_segments = [segment for segment in self.job.segments if segment.streams == "audio"]
+        with open(list_path, "w") as f:
+            for segment in self.job.segments:
+                if segment.streams != "audio":
+                    f.write("file '" + segment.file_path.replace("'", "'\\''") + "'\n")
+
+        command_list = ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path]
+        if len(audio_segments) > 0:
+            command_list += ["-i", audio_segments[0].file_path, "-map", "0:v", "-map", "1:a"]
+        command_list += ["-c", "copy", self.job.render_data.proxy_file_path]
+        error_text = ""
+        try:
+            self.process = subprocess.Popen(command_list, stderr=subprocess.PIPE)
+            if self.aborted == True:
+                self.process.terminate()
+            stderr_data = self.process.communicate()[1]
+            success = (self.process.returncode == 0 and self.aborted == False)
+            error_text = stderr_data.decode("utf-8", "replace").strip()
+        except OSError as e:
+            success = False
+            error_text = str(e)
+
+        os.remove(list_path)
+
+        GLib.idle_add(self.job.segments_joined, success, error_text)
+
+    def abort(self):
+        self.aborted = True
+        if self.process != None:
+            self.process.terminate()
+
+
 class FFmpegRenderThread(threading.Thread):
     
     def __init__(self, ffmpeg_command):
@@ -705,11 +1062,21 @@ class ContainerStatusPollingThread(threading.Thread):
         threading.Thread.__init__(self)
 
     def run(self):
+        last_channel_poll = time.monotonic()
 
         while self.abort == False:
-            for job in _jobs:
-                if job.status == RENDERING:
+            # Render processes push their status through session channels, 
+            # jobs with channel are polled only with slow fallback interval.
+            channel_poll = (time.monotonic() - last_channel_poll > CHANNEL_FALLBACK_POLL_INTERVAL)
+            if channel_poll == True:
+                last_channel_poll = time.monotonic()
+            for job in list(_jobs):
+                if job.status != RENDERING:
+                    continue
+                if job.status_polled == True:
                     job.callback_object.update_render_status() # Make sure these methods enter/exit Gtk threads.
+                elif channel_poll == True:
+                    _request_job_update(job)
 
             # Handling post-app-close jobs rendering.
             if _jobs_render_progress_window != None and len(_jobs) != 0:
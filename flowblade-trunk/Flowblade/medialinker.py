@@ -55,6 +55,7 @@ import mltinit
 import patternproducer
 import persistance
 import processutils
+import projectfile
 import projectdata
 import propertyparse
 import respaths
@@ -66,6 +67,7 @@ import utils
 _app = None
 linker_window = None
 target_project = None
+target_project_path = None
 last_media_dir = None
 media_assets = []
 
@@ -85,10 +87,12 @@ class ProjectLoadThread(threading.Thread):
 
     def run(self):
         persistance.show_messages = False
-        project = persistance.load_project(self.filename, False, True)
+        # Media log and events are only needed when relinked project is saved.
+        project = persistance.load_project_sections(self.filename, [projectfile.MEDIA_FILES, projectfile.SEQUENCE])
         
-        global target_project
+        global target_project, target_project_path
         target_project = project
+        target_project_path = self.filename
         target_project.c_seq = project.sequences[target_project.c_seq_index]
         _update_media_assets()
 
@@ -606,7 +610,8 @@ def _save_as_dialog_callback(dialog, response_id):
 
         # Relink and save
         _relink_project_media_paths()
-            
+        _load_unloaded_sections()
+
         persistance.save_project(target_project, target_project.last_save_path)
 
         dialogutils.info_message(_("Relinked version of the Project saved!"), 
@@ -615,6 +620,15 @@ def _save_as_dialog_callback(dialog, response_id):
     else:
         dialog.destroy()
 
+def _load_unloaded_sections():
+    if hasattr(target_project, "events"):
+        return
+
+    sections_project = persistance.load_project_sections(target_project_path, [projectfile.MEDIA_LOG, projectfile.EVENTS])
+    target_project.media_log = sections_project.media_log
+    target_project.media_log_groups = sections_project.media_log_groups
+    target_project.events = sections_project.events
+
 def _relink_project_media_paths():
     # Collect relink paths
     relinked_paths = {}
@@ -0,0 +1,129 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module keeps a persistent cache of media file probe results shared by all projects.
+
+Entries are keyed by file path, size, modification time, MLT version,
+profile description and profile frame rate, so edited files or MLT upgrades
+are probed again. Lengths are in profile frames and thumbnails depend on profile,
+that is why profile is part of the key.
+
+When cache is full, least recently used entries are dropped. Cache is written
+to disk after media imports and on app exit.
+
+Cache is accessed from media import worker threads.
+"""
+
+import os
+import pickle
+import threading
+
+import atomicfile
+import editorstate
+import userfolders
+
+CACHE_FILE = "media_probe_cache"
+MAX_ENTRIES = 20000
+
+_cache = None
+_cache_changed = False
+_lock = threading.Lock()
+
+
+# ------------------------------------------------------ interface
+def get_probe_data(file_path, profile):
+    """
+    Returns cached dict with keys "length", "info" and "thumbnail_path" or None.
+    """
+    key = _get_key(file_path, profile)
+    if key == None:
+        return None
+
+    global _cache_changed
+    with _lock:
+        _load()
+        probe_data = _cache.pop(key, None)
+        if probe_data != None:
+            # Move to end as most recently used.
+            _cache[key] = probe_data
+            _cache_changed = True
+        return probe_data
+
+def set_probe_data(file_path, profile, length, info, thumbnail_path):
+    global _cache_changed
+    key = _get_key(file_path, profile)
+    if key == None:
+        return
+
+    with _lock:
+        _load()
+        _cache.pop(key, None)
+        _cache[key] = {"length": length, "info": info, "thumbnail_path": thumbnail_path}
+        # Drop least recently used entries, dict keeps insertion order.
+        while len(_cache) > MAX_ENTRIES:
+            del _cache[next(iter(_cache))]
+        _cache_changed = True
+
+def save():
+    """
+    Writes cache to disk if it has changed since last save.
+    """
+    global _cache_changed
+    with _lock:
+        if _cache_changed == False:
+            return
+        cache_copy = dict(_cache)
+        _cache_changed = False
+
+    try:
+        with atomicfile.AtomicFileWriter(_get_cache_file_path(), "wb") as afw:
+            write_file = afw.get_file()
+            pickle.dump(cache_copy, write_file)
+    except Exception as e:
+        print("Media probe cache save failed:", e)
+
+
+# ------------------------------------------------------ module functions
+def _get_key(file_path, profile):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    return (file_path, stat.st_size, stat.st_mtime_ns, editorstate.mlt_version, profile.description(), profile.frame_rate_num(), profile.frame_rate_den())
+
+def _get_cache_file_path():
+    return userfolders.get_data_dir() + CACHE_FILE
+
+def _load():
+    # Called with _lock held.
+    global _cache
+    if _cache != None:
+        return
+
+    _cache = {}
+    try:
+        with open(_get_cache_file_path(), "rb") as f:
+            _cache = pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print("Media probe cache load failed, starting with empty cache:", e)
@@ -40,6 +40,7 @@ import editorstate
 import gui
 import guicomponents
 import guipopover
+import mediaprobecache
 import projectdata
 import patternproducer
 import profilesmanager
@@ -86,7 +87,7 @@ class RecreateIconsThread(threading.Thread):
                         icon_path = respaths.IMAGE_PATH + "audio_file.png"
                         media_file.info = None
                     else:
-                        (icon_path, length, info) = projectdata.thumbnailer.write_image(media_file.path)
+                        (icon_path, length, info) = projectdata.thumbnailer.write_image(media_file.path, use_cache=False)
                         media_file.info = info
                     media_file.icon_path = icon_path
                     media_file.create_icon()
@@ -95,6 +96,7 @@ class RecreateIconsThread(threading.Thread):
 
             GLib.idle_add(self._progress_window_update_fraction, loaded)
 
+        mediaprobecache.save()
         GLib.idle_add(self._progress_window_destroy)
 
         GLib.idle_add(self._exit_update)
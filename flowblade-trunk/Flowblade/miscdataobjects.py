@@ -29,6 +29,17 @@ class ProjectProxyEditingData:
     
     def __init__(self):
         self.proxy_mode = appconsts.USE_ORIGINAL_MEDIA
-        self.create_rules = None # not impl.
+        self.create_rules = ProxyCreateRules() # None in projects saved before rules were implemented.
         self.encoding = 0 # default is first found encoding
         self.size = 1 # default is half project size
+
+
+class ProxyCreateRules:
+    """
+    Rules for creating proxy files automatically when media is added to project.
+    Proxy is created if source is wider than 'min_width' OR uses a long-GOP codec.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.min_width = 1920 # -1 for no size rule
+        self.long_gop_codecs = True
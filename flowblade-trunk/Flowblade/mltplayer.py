@@ -35,6 +35,7 @@ import time
 import gui
 from editorstate import timeline_visible
 import editorpersistance
+import previewrender
 import utilsgtk
 import updater
 
@@ -173,6 +174,7 @@ class Player:
         """
         Starts playback from current producer
         """        
+        self._maybe_display_preview_producer()
         self.producer.set_speed(1)
         self.stop_ticker()
         self.start_ticker()
@@ -195,8 +197,32 @@ class Player:
 
         self.stop_ticker()
         self.producer.set_speed(0)
+        self._maybe_display_tractor_producer()
         updater.update_frame_displayers(self.producer.frame())
 
+    def _maybe_display_preview_producer(self):
+        # Timeline playback uses preview rendered segments when available, see previewrender.py.
+        if timeline_visible() == False or self.producer is not self.tracktor_producer:
+            return
+        preview_producer = previewrender.get_playback_producer()
+        if preview_producer == None:
+            return
+        self._swap_producer(preview_producer)
+
+    def _maybe_display_tractor_producer(self):
+        if previewrender.is_playback_producer(self.producer) == False:
+            return
+        self._swap_producer(self.tracktor_producer)
+
+    def _swap_producer(self, producer):
+        frame = self.producer.frame()
+        # Marks may be set during playback.
+        producer.mark_in = getattr(self.producer, "mark_in", -1)
+        producer.mark_out = getattr(self.producer, "mark_out", -1)
+        self.producer = producer
+        self.connect_and_start()
+        self.producer.seek(frame)
+
     def start_loop_playback(self, cut_frame, loop_half_length, track_length):
         self.loop_start = cut_frame - loop_half_length
         self.loop_end = cut_frame + loop_half_length
@@ -317,6 +343,7 @@ class Player:
         # Stop ticker if playback has stopped.
         if (self.consumer.is_stopped() or self.producer.get_speed() == 0):
             self.stop_ticker()
+            self._maybe_display_tractor_producer()
 
         # If we're out of active range seek end.
         if current_frame >= self.get_active_length():
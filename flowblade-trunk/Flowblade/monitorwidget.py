@@ -25,7 +25,6 @@ try:
     import mlt7 as mlt
 except:
     import mlt
-import numpy as np
 import os
 import threading
 import time
@@ -560,16 +559,6 @@ class MonitorWidget:
         
         return scaled_surface
     
-    def _get_cairo_buf_from_mlt_rgb(self, screen_rgb_data, img_w, img_h ):
-        buf = np.frombuffer(screen_rgb_data, dtype=np.uint8)
-        buf.shape = (img_h, img_w, 4)
-        out = np.copy(buf)
-        r = np.index_exp[:, :, 0]
-        b = np.index_exp[:, :, 2]
-        out[r] = buf[b]
-        out[b] = buf[r]
-        return out
-        
     # ------------------------------------------------------------------ DRAW
     def _draw_match_frame_left(self, event, cr, allocation):
         if self.view == END_TRIM_VIEW or self.view == ROLL_TRIM_LEFT_ACTIVE_VIEW:
@@ -895,10 +884,7 @@ class MatchSurfaceCreator(threading.Thread):
         mlt_rgb = frame.get_image(mlt.mlt_image_rgba, *size) 
    
         # Create cairo surface
-        cairo_buf = _widget._get_cairo_buf_from_mlt_rgb(mlt_rgb, *size)
-        img_w, img_h = size
-        stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_RGB24, img_w)
-        surface = cairo.ImageSurface.create_for_data(cairo_buf, cairo.FORMAT_RGB24, img_w, img_h, stride)
+        surface = utils.get_cairo_surface_from_mlt_rgba(mlt_rgb, *size)
         
         _widget.match_frame_surface = surface
         
@@ -31,8 +31,6 @@ import glob
 import fnmatch
 import hashlib
 import os
-import pickle
-import sys
 import time
 
 from gi.repository import GLib
@@ -45,6 +43,7 @@ import mltprofiles
 import mltfilters
 import mlttransitions
 import persistancecompat
+import projectfile
 import propertyparse
 import resync
 import userfolders
@@ -53,12 +52,12 @@ import utils
 # Unpickleable attributes for all objects
 # These are removed at save and recreated at load.
 PROJECT_REMOVE = ['profile','c_seq']
-SEQUENCE_REMOVE = ['profile','field','multitrack','tractor','monitor_clip','vectorscope','audiowave','rgbparade','outputfilter','watermark_filter']
+SEQUENCE_REMOVE = ['profile','field','multitrack','tractor','monitor_clip','vectorscope','audiowave','rgbparade','outputfilter','watermark_filter','deferred_load_data']
 PLAY_LIST_REMOVE = ['this','sequence','get_name','gain_filter','pan_filter']
 CLIP_REMOVE = ['this','clip_length']
 TRANSITION_REMOVE = ['this']
 FILTER_REMOVE = ['mlt_filter','mlt_filters']
-MEDIA_FILE_REMOVE = ['icon']
+MEDIA_FILE_REMOVE = ['icon', '_icon']
 
 # Used to flag a not found relative path
 NOT_FOUND = "/not_found_not_found/not_found"
@@ -93,6 +92,9 @@ _xml_new_paths_for_profile_change = None
 # MLT removed quite few services for 7.0 and we need to inform users if any of those cannot be loaded.
 dead_compositors = 0
 
+# Set to a dict to collect durations of load phases in seconds, used by tools/projectbenchmark.py.
+load_phase_times = None
+
 
 class FileProducerNotFoundError(Exception):
 
@@ -119,21 +121,38 @@ def _do_show_msg(msg):
 # -------------------------------------------------- SAVE
 def save_project(project, file_path, changed_profile_desc=None):
     """
-    Creates pickleable project object
+    Creates pickleable project object and writes it into file.
     """
     print("Saving project...")# + os.path.basename(file_path))
     
+    s_proj = get_pickleable_project(project, changed_profile_desc)
+    write_pickleable_project(s_proj, file_path)
+
+def get_pickleable_project(project, changed_profile_desc=None):
+    """
+    Creates pickleable snapshot of project.
+    
+    This needs to be done on GTK thread, the returned object can then be written out 
+    on a worker thread using write_pickleable_project().
+
+    Snapshot is made of shallow copies. Media files, bins, sequences, tracks, clips, filters,
+    compositors, markers and media log lists are copied, so these can be edited during save.
+    Objects that are not copied, e.g. media log events, sync data, proxy data and
+    filter property tuples, are shared with the live project and must only be replaced,
+    not edited in place, while save is being written out.
+    """
     # Get shallow copy
     s_proj = copy.copy(project)
     
     # Implements "change profile" functionality
     global _fps_conv_mult, _xml_new_paths_for_profile_change
     _fps_conv_mult = 1.0
+    changed_xml_files = [] # (source path, new path, profile node) tuples, files are written in write_pickleable_project()
     if changed_profile_desc != None:
         _fps_conv_mult = mltprofiles.get_profile(changed_profile_desc).fps() / mltprofiles.get_profile(s_proj.profile_desc).fps()
         s_proj.profile_desc = changed_profile_desc
         _xml_new_paths_for_profile_change = {} # dict acts also as a flag to show that profile change save is happening
-        new_profile = mltprofiles.get_profile(changed_profile_desc)
+        new_profile_node = mltprofiles.get_profile_node(mltprofiles.get_profile(changed_profile_desc))
     else:
         _xml_new_paths_for_profile_change = None # None value acts also as a flag to show that profile change save is _not_ happening
 
@@ -158,7 +177,8 @@ def save_project(project, file_path, changed_profile_desc=None):
         # saving to change profile.
         # Underlying reason: https://github.com/mltframework/mlt/issues/212
         if changed_profile_desc != None and hasattr(s_media_file, "path") and s_media_file.path != None and utils.is_mlt_xml_file(s_media_file.path) == True:
-            new_xml_file_path = _save_changed_xml_file(s_media_file, new_profile)
+            new_xml_file_path = _get_changed_xml_file_path()
+            changed_xml_files.append((s_media_file.path, new_xml_file_path, new_profile_node))
             _xml_new_paths_for_profile_change[s_media_file.path] = new_xml_file_path
             s_media_file.path = new_xml_file_path
 
@@ -193,13 +213,32 @@ def save_project(project, file_path, changed_profile_desc=None):
         sequences.append(get_p_sequence(add_seq))
     s_proj.sequences = sequences
 
+    # Copy lists that may be edited while snapshot is being written out.
+    s_proj.media_log = copy.copy(project.media_log)
+    s_proj.media_log_groups = copy.copy(project.media_log_groups)
+    s_proj.bins = [get_p_bin(b) for b in project.bins]
+    s_proj.c_bin = s_proj.bins[project.bins.index(project.c_bin)]
+    s_proj.events = copy.copy(project.events)
+    s_proj.project_properties = copy.copy(project.project_properties)
+
     # Remove unpickleable attributes
     remove_attrs(s_proj, PROJECT_REMOVE)
 
-    # Write out file.
-    with atomicfile.AtomicFileWriter(file_path, "wb") as afw:
-        outfile = afw.get_file()
-        pickle.dump(s_proj, outfile)
+    # Not pickled, removed in write_pickleable_project().
+    s_proj.changed_xml_files = changed_xml_files
+
+    return s_proj
+
+def write_pickleable_project(s_proj, file_path):
+    """
+    Writes out project snapshot created with get_pickleable_project().
+    Can be called from worker threads.
+    """
+    changed_xml_files = s_proj.__dict__.pop("changed_xml_files", [])
+    for source_path, new_xml_file_path, new_profile_node in changed_xml_files:
+        _save_changed_xml_file(source_path, new_xml_file_path, new_profile_node)
+    
+    projectfile.write_project_file(s_proj, file_path)
 
 def get_p_sequence(sequence):
     """
@@ -218,6 +257,8 @@ def get_p_sequence(sequence):
     s_compositors = get_p_compositors(sequence.compositors)
     s_seq.compositors = s_compositors
 
+    s_seq.markers = copy.copy(sequence.markers)
+
     # Remove unpickleable attributes
     remove_attrs(s_seq, SEQUENCE_REMOVE)
 
@@ -263,6 +304,9 @@ def get_p_clip(clip):
     # This is NOT USED anywhere anymore and should be removed.
     s_clip.type = 'Mlt__Producer'
 
+    if hasattr(clip, "markers"):
+        s_clip.markers = copy.copy(clip.markers)
+
     # Get replace filters
     filters = []
     try: # This fails for blank clips
@@ -316,6 +360,9 @@ def get_p_filter(f):
     Creates pickleable version of MLT Filter object.
     """
     s_filter = copy.copy(f)
+    # Property tuples are replaced, not mutated, when edited, so list copies are enough for snapshot.
+    s_filter.properties = copy.copy(f.properties)
+    s_filter.non_mlt_properties = copy.copy(f.non_mlt_properties)
     remove_attrs(s_filter, FILTER_REMOVE)
     if f.info.multipart_filter == False:
         s_filter.is_multi_filter = False
@@ -324,11 +371,17 @@ def get_p_filter(f):
 
     return s_filter
 
+def get_p_bin(b):
+    s_bin = copy.copy(b)
+    s_bin.file_ids = copy.copy(b.file_ids)
+    return s_bin
+
 def get_p_compositors(compositors):
     s_compositors = []
     for compositor in compositors:
         s_compositor = copy.copy(compositor)
         s_compositor.transition = copy.copy(compositor.transition)
+        s_compositor.transition.properties = copy.copy(compositor.transition.properties)
         s_compositor.transition.mlt_transition = None
         if _fps_conv_mult != 1.0:
             _update_compositor_in_out_for_fps_change(s_compositor)
@@ -364,32 +417,37 @@ def _update_compositor_in_out_for_fps_change(s_compositor):
     s_compositor.clip_out = int(s_compositor.clip_out * _fps_conv_mult)
 
 # Needed for xml files when doing profile change saves
-def _save_changed_xml_file(s_media_file, new_profile):
-    xml_file = open(s_media_file.path)
+def _get_changed_xml_file_path():
+    folder = userfolders.get_render_dir()
+    uuid_str = hashlib.md5(str(os.urandom(32)).encode('utf-8')).hexdigest()
+    return folder + uuid_str + ".xml"
+
+def _save_changed_xml_file(source_path, new_xml_file_path, new_profile_node):
+    xml_file = open(source_path)
     xml_text = xml_file.read()
-        
-    new_profile_node = mltprofiles.get_profile_node(new_profile)
     
     in_index = xml_text.find("<profile")
     out_index = xml_text.find("/>", in_index) + 2
     
     new_xml_text = xml_text[0:in_index] + new_profile_node + xml_text[out_index:len(xml_text)]
 
-    folder = userfolders.get_render_dir()
-    uuid_str = hashlib.md5(str(os.urandom(32)).encode('utf-8')).hexdigest()
-    new_xml_file_path = folder + uuid_str + ".xml"
-
     with atomicfile.AtomicFileWriter(new_xml_file_path, "w") as afw:
         new_xml_file = afw.get_file()
         new_xml_file.write(new_xml_text)
-    
-    return new_xml_file_path
 
 # -------------------------------------------------- LOAD
-def load_project(file_path, icons_and_thumnails=True, relinker_load=False):
+def load_project(file_path, icons_and_thumnails=True, relinker_load=False, current_sequence_only=False):
+    """
+    Loads project and creates MLT objects for it.
+    
+    relinker_load == True returns project with pickleable python data only.
+    current_sequence_only == True loads only current sequence, used e.g. when project is loaded for rendering.
+    """
     _show_msg("Unpickling")
 
-    project = unpickle(file_path)
+    phase_start = time.monotonic()
+    project = projectfile.read_project_sections(file_path, None, current_sequence_only)
+    _record_phase_time("unpickle", phase_start)
 
     # Relinker only operates on pickleable python data 
     if relinker_load:
@@ -417,6 +475,7 @@ def load_project(file_path, icons_and_thumnails=True, relinker_load=False):
     if project.profile == None:
         raise ProjectProfileNotFoundError(project.profile_desc)
 
+    phase_start = time.monotonic()
     for k, media_file in project.media_files.items():
         media_file.current_frame = 0 # this is always reset on load, value is not considered persistent.
 
@@ -459,34 +518,26 @@ def load_project(file_path, icons_and_thumnails=True, relinker_load=False):
 
         _show_msg("Loading Media Item: " + media_file.name)
 
-    # Add MLT objects to sequences.
-    global all_clips, sync_clips
-    seq_count = 1
+    _record_phase_time("media_paths", phase_start)
+
+    # Add MLT objects to current sequence. Other sequences are built 
+    # when first needed, see build_deferred_sequence().
+    c_seq = project.sequences[project.c_seq_index]
     for seq in project.sequences:
-            
         persistancecompat.FIX_MISSING_SEQUENCE_ATTRS(seq)
-
-        _show_msg(_("Building sequence ") + str(seq_count))
-        all_clips = {}
-        sync_clips = []
-                
         seq.profile = project.profile
-        fill_sequence_mlt(seq, project.SAVEFILE_VERSION)
-
-        handle_seq_watermark(seq)
-
-        if not hasattr(seq, "seq_len"):
-            seq.update_edit_tracks_length()
+        if seq != c_seq:
+            seq.deferred_load_data = (_load_file_path, project_proxy_mode, proxy_path_dict, project.SAVEFILE_VERSION)
 
-        seq_count = seq_count + 1
-
-    all_clips = {}
-    sync_clips = []
+    _show_msg(_("Building sequence ") + str(project.c_seq_index + 1))
+    phase_start = time.monotonic()
+    _build_sequence_mlt(c_seq, project.SAVEFILE_VERSION)
+    _record_phase_time("sequence_mlt", phase_start)
 
     if icons_and_thumnails == True:
         _show_msg(_("Loading icons"))
         for k, media_file in project.media_files.items():
-            media_file.create_icon()
+            media_file.create_icon() # Thumbnail files for media files are decoded later when first displayed.
     
     project.c_seq = project.sequences[project.c_seq_index]
     if icons_and_thumnails == True:
@@ -494,6 +545,56 @@ def load_project(file_path, icons_and_thumnails=True, relinker_load=False):
 
     return project
 
+def _record_phase_time(phase, phase_start):
+    if load_phase_times != None:
+        load_phase_times[phase] = load_phase_times.get(phase, 0.0) + time.monotonic() - phase_start
+
+def _build_sequence_mlt(seq, SAVEFILE_VERSION):
+    global all_clips, sync_clips
+    all_clips = {}
+    sync_clips = []
+
+    fill_sequence_mlt(seq, SAVEFILE_VERSION)
+
+    handle_seq_watermark(seq)
+
+    if not hasattr(seq, "seq_len"):
+        seq.update_edit_tracks_length()
+
+    all_clips = {}
+    sync_clips = []
+
+def sequence_mlt_built(seq):
+    return not hasattr(seq, "deferred_load_data")
+
+def build_deferred_sequence(seq):
+    """
+    Creates MLT objects for a loaded sequence that was not built when project was loaded.
+    Must be called before sequence is displayed, rendered or its clips are used in edits.
+    """
+    if sequence_mlt_built(seq):
+        return
+
+    print("Building deferred sequence " + seq.name + "...")
+
+    global _load_file_path, project_proxy_mode, proxy_path_dict, show_messages
+    
+    # Module state used for building may have been changed by saves since project was loaded.
+    saved_state = (_load_file_path, project_proxy_mode, proxy_path_dict, show_messages)
+    _load_file_path, project_proxy_mode, proxy_path_dict, SAVEFILE_VERSION = seq.deferred_load_data
+    show_messages = False
+    del seq.deferred_load_data
+
+    # fill_sequence_mlt() sets built sequence as current sequence.
+    c_seq = editorstate.project.c_seq
+    phase_start = time.monotonic()
+    try:
+        _build_sequence_mlt(seq, SAVEFILE_VERSION)
+        _record_phase_time("deferred_sequence_mlt", phase_start)
+    finally:
+        editorstate.project.c_seq = c_seq
+        _load_file_path, project_proxy_mode, proxy_path_dict, show_messages = saved_state
+
 def fill_sequence_mlt(seq, SAVEFILE_VERSION):
     """
     Replaces sequences py objects with mlt objects
@@ -825,31 +926,11 @@ compositors_index_to_type_id = ["##affine","##opacity_kf","##pict_in_pict", "##r
                                 "##multiply", "##overlay", "##saturation", "##screen", "##softlight",
                                 "##subtract", "##value"]
 
-# ------------------------------------------------------- unpickling with mlt module fixes
-def unpickle(path):
-    try:
-        f = open(path, "rb")
-        return pickle.load(f)
-    except:
-        # Fix for opening projects when mlt available as 'mlt7' but saved with 
-        # mlt available as 'mlt'.
-        #
-        # Because sequence.py does 'import mlt' (and now does 'import mlt7') we still 
-        # import it on pickle.load() even if no MLT objects are pickled.
-        # Once mlt Python bindigs name changed from 'mlt to 'mlt7' the unpickle failed.
-        # We need to do 'sys.modules["mlt"] = mlt' after 'import mlt7 as mlt'
-        # to make module 'mlt' available when doing unpickling.
-        #
-        # NOTE: It may not be possible to remove mlt import from pickle data, but we need to 
-        # make an effort.
-
-        print("Fixing for unpickling doing 'import mlt'...")
-        
-        import mlt7 as mlt
-        sys.modules["mlt"] = mlt
-        try:
-            f = open(path, "rb")
-            return pickle.load(f)
-        except:
-            f = open(path, "rb")
-            return pickle.load(f, encoding='latin1') 
+# ------------------------------------------------------- partial loading
+def load_project_sections(file_path, section_names):
+    """
+    Returns project with pickleable python data for given projectfile module sections only.
+    """
+    project = projectfile.read_project_sections(file_path, section_names)
+    persistancecompat.FIX_MISSING_PROJECT_ATTRS(project)
+    return project
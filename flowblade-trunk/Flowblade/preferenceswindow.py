@@ -24,6 +24,7 @@ from gi.repository import Gtk
 
 import appconsts
 import dialogutils
+import diskcachemanagement
 import editorpersistance
 import gui
 import guiutils
@@ -72,8 +73,11 @@ def preferences_dialog():
 
 def _preferences_dialog_callback(dialog, response_id, all_widgets):
     if response_id == Gtk.ResponseType.ACCEPT:
+        old_disk_cache_budget = editorpersistance.prefs.disk_cache_budget
         editorpersistance.update_prefs_from_widgets(all_widgets)
         editorpersistance.save()
+        if editorpersistance.prefs.disk_cache_budget != old_disk_cache_budget:
+            diskcachemanagement.start_cache_eviction()
         dialog.destroy()
         primary_txt = _("Restart required for some setting changes to take effect.")
         secondary_txt = _("If requested change is not in effect, restart application.")
@@ -132,6 +136,15 @@ def _general_options_panel():
     disk_cache_warning_combo.append_text(_("1 GB"))
     disk_cache_warning_combo.append_text(_("2 GB"))
     disk_cache_warning_combo.set_active(prefs.disk_space_warning)
+
+    disk_cache_budget_combo  = Gtk.ComboBoxText()
+    disk_cache_budget_combo.append_text(_("Off"))
+    disk_cache_budget_combo.append_text(_("1 GB"))
+    disk_cache_budget_combo.append_text(_("2 GB"))
+    disk_cache_budget_combo.append_text(_("5 GB"))
+    disk_cache_budget_combo.append_text(_("10 GB"))
+    disk_cache_budget_combo.set_active(prefs.disk_cache_budget)
+    disk_cache_budget_combo.set_tooltip_text(_("Least recently used thumbnails, audio levels and trim view frames\nare deleted when their total size exceeds this.\nData used by the open project is never deleted."))
     
     # Layout
     row1 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Default Profile:")), default_profile_combo, PREFERENCES_LEFT))
@@ -142,6 +155,7 @@ def _general_options_panel():
     row9 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Media look-up order on load:")), load_order_combo, PREFERENCES_LEFT))
     row10 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Default render directory:")), render_folder_select, PREFERENCES_LEFT))
     row11 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Warning on Disk Cache Size:")), disk_cache_warning_combo, PREFERENCES_LEFT))
+    row12 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Disk Cache Budget:")), disk_cache_budget_combo, PREFERENCES_LEFT))
 
     vbox = Gtk.VBox(False, 2)
     vbox.pack_start(row1, False, False, 0)
@@ -152,13 +166,15 @@ def _general_options_panel():
     vbox.pack_start(row3, False, False, 0)
     vbox.pack_start(row9, False, False, 0)
     vbox.pack_start(row11, False, False, 0)
+    vbox.pack_start(row12, False, False, 0)
     vbox.pack_start(Gtk.Label(), True, True, 0)
 
     guiutils.set_margins(vbox, 12, 0, 12, 12)
 
     # Aug-2019 - SvdB - AS - Added autosave_combo
     return vbox, ( default_profile_combo, open_in_last_opened_check, open_in_last_rendered_check,
-                    undo_max_spin, load_order_combo, autosave_combo, render_folder_select, disk_cache_warning_combo)
+                    undo_max_spin, load_order_combo, autosave_combo, render_folder_select, disk_cache_warning_combo,
+                    disk_cache_budget_combo)
 
 def _edit_prefs_panel():
     prefs = editorpersistance.prefs
@@ -437,25 +453,35 @@ def _performance_panel():
     perf_drop_frames = Gtk.CheckButton()
     perf_drop_frames.set_active(prefs.perf_drop_frames)
 
+    # Combo index is concurrency limit value, 0 == from CPU count.
+    jobs_concurrency_combo = Gtk.ComboBoxText()
+    jobs_concurrency_combo.append_text(_("Number of CPU Cores") + " (" + str(multiprocessing.cpu_count()) + ")")
+    for i in range(1, multiprocessing.cpu_count() * 2 + 1):
+        jobs_concurrency_combo.append_text(str(i))
+    jobs_concurrency_combo.set_active(min(prefs.jobs_concurrency_limit, multiprocessing.cpu_count() * 2))
+
     # Tooltips
     perf_render_threads.set_tooltip_text(_("Between 1 and the number of CPU Cores"))
     perf_drop_frames.set_tooltip_text(_("Allow Frame Dropping for real-time rendering, when needed"))
+    jobs_concurrency_combo.set_tooltip_text(_("Number of CPU cores used by concurrently running Jobs panel renders.\nMost renders use two cores, Generator and G'Mic renders use one."))
 
     # Layout
     row0 = _row(guiutils.get_left_justified_box([warning_icon, warning_label]))
     row1 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Render Threads:")), perf_render_threads, PREFERENCES_LEFT))
     row2 = _row(guiutils.get_checkbox_row_box(perf_drop_frames, Gtk.Label(label=_("Allow Frame Dropping"))))
+    row3 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Jobs CPU Cores:")), jobs_concurrency_combo, PREFERENCES_LEFT))
 
     vbox = Gtk.VBox(False, 2)
     vbox.pack_start(row0, False, False, 0)
     vbox.pack_start(guiutils.pad_label(12, 12), False, False, 0)
     vbox.pack_start(row1, False, False, 0)
     vbox.pack_start(row2, False, False, 0)
+    vbox.pack_start(row3, False, False, 0)
     vbox.pack_start(Gtk.Label(), True, True, 0)
 
     guiutils.set_margins(vbox, 12, 0, 12, 12)
 
-    return vbox, (perf_render_threads, perf_drop_frames)
+    return vbox, (perf_render_threads, perf_drop_frames, jobs_concurrency_combo)
 
 def _row(row_cont):
     row_cont.set_size_request(10, 26)
@@ -0,0 +1,282 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module handles background preview renders of timeline ranges for real-time playback.
+
+Marked range or automatically detected heavy ranges are rendered in background
+as fixed timeline segments into intra-frame files in segment cache, see
+segmentcache.py and chunkrender.py.
+
+When playback is started mltplayer.Player asks for playback producer. Segment
+hashes are computed from live sequence and the playback producer uses rendered
+segments whose contents have not changed and timeline for everything else, so any
+edit touching a segment invalidates it.
+"""
+
+from gi.repository import GLib
+
+try:
+    import mlt7 as mlt
+except:
+    import mlt
+
+import os
+import threading
+import time
+
+import appconsts
+import chunkrender
+import dialogutils
+from editorstate import current_sequence
+from editorstate import PLAYER
+from editorstate import PROJECT
+import gui
+import persistance
+import segmentcache
+import userfolders
+
+PREVIEW_SEGMENT_SECONDS = 10
+PREVIEW_EXTENSION = ".mov"
+PREVIEW_ARGS = [("f", "mov"), ("vcodec", "mjpeg"), ("qscale", "3"), ("acodec", "pcm_s16le")]
+
+# Heavy range detection weights. Every active filter on a video clip counts as 1.
+COMPOSITOR_WEIGHT = 2
+HEAVY_WEIGHT = 4
+
+_preview_segments = [] # (range_in, range_out) list of segments requested for preview.
+_render_thread = None
+_playback_producer = None
+_playback_key = None
+
+
+# ------------------------------------------------------------- interface
+def render_marked_range_preview():
+    seq = current_sequence()
+    mark_in = seq.tractor.mark_in
+    mark_out = seq.tractor.mark_out
+    if mark_in == -1 or mark_out == -1:
+        primary_txt = _("No Mark In and Mark Out set")
+        secondary_txt = _("Set Mark In and Mark Out to select range for preview render.")
+        dialogutils.info_message(primary_txt, secondary_txt, gui.editor_window.window)
+        return
+
+    _render_preview([(mark_in, mark_out)])
+
+def render_heavy_ranges_preview():
+    heavy_ranges = get_heavy_ranges(current_sequence())
+    if len(heavy_ranges) == 0:
+        primary_txt = _("No heavy ranges found")
+        secondary_txt = _("Timeline has no ranges with several filters or compositors.")
+        dialogutils.info_message(primary_txt, secondary_txt, gui.editor_window.window)
+        return
+
+    _render_preview(heavy_ranges)
+
+def clear_preview_renders():
+    global _preview_segments, _playback_producer, _playback_key
+    PLAYER().stop_playback()
+    _stop_render_thread()
+    _preview_segments = []
+    _playback_producer = None
+    _playback_key = None
+
+def get_playback_producer():
+    """
+    Returns producer with rendered segments for timeline playback or None if no rendered segment is valid.
+    """
+    global _playback_producer, _playback_key
+
+    if len(_preview_segments) == 0:
+        return None
+
+    seq = current_sequence()
+    seq_len = seq.tractor.get_length()
+    segments = [segment for segment in _preview_segments if segment[1] < seq_len]
+    cache_paths = _get_cache_paths(seq, segments)
+
+    valid_segments = []
+    for i in range(0, len(segments)):
+        if os.path.isfile(cache_paths[i]):
+            range_in, range_out = segments[i]
+            valid_segments.append((range_in, range_out, cache_paths[i]))
+    if len(valid_segments) == 0:
+        return None
+
+    playback_key = (id(seq.tractor), seq_len, tuple(valid_segments))
+    if playback_key == _playback_key:
+        return _playback_producer
+
+    playlist = mlt.Playlist(PROJECT().profile)
+    pos = 0
+    for range_in, range_out, cache_path in valid_segments:
+        if range_in > pos:
+            playlist.append(seq.tractor, pos, range_in - 1)
+        segment_producer = mlt.Producer(PROJECT().profile, str(cache_path))
+        playlist.append(segment_producer, 0, range_out - range_in)
+        pos = range_out + 1
+    if pos < seq_len:
+        playlist.append(seq.tractor, pos, seq_len - 1)
+
+    _playback_producer = playlist
+    _playback_key = playback_key
+    return _playback_producer
+
+def is_playback_producer(producer):
+    return (_playback_producer != None and producer is _playback_producer)
+
+def get_heavy_ranges(seq):
+    """
+    Returns list of (range_in, range_out) timeline ranges with active filters and compositors
+    weight at or above HEAVY_WEIGHT.
+    """
+    events = []
+    for track in seq.tracks:
+        if track.type != appconsts.VIDEO:
+            continue
+        clip_start = 0
+        for clip in track.clips:
+            clip_length = clip.clip_out - clip.clip_in + 1
+            if clip.is_blanck_clip == False:
+                weight = len([f for f in clip.filters if f.active == True])
+                if weight > 0:
+                    events.append((clip_start, weight))
+                    events.append((clip_start + clip_length, -weight))
+            clip_start += clip_length
+
+    for compositor in seq.compositors:
+        events.append((compositor.clip_in, COMPOSITOR_WEIGHT))
+        events.append((compositor.clip_out + 1, -COMPOSITOR_WEIGHT))
+
+    events.sort()
+
+    heavy_ranges = []
+    weight = 0
+    heavy_start = -1
+    i = 0
+    while i < len(events):
+        frame = events[i][0]
+        while i < len(events) and events[i][0] == frame:
+            weight += events[i][1]
+            i += 1
+        if weight >= HEAVY_WEIGHT and heavy_start == -1:
+            heavy_start = frame
+        elif weight < HEAVY_WEIGHT and heavy_start != -1:
+            heavy_ranges.append((heavy_start, frame - 1))
+            heavy_start = -1
+
+    return heavy_ranges
+
+
+# ------------------------------------------------------------- module functions
+def _render_preview(ranges):
+    global _preview_segments, _render_thread
+
+    seq = current_sequence()
+    seq_len = seq.tractor.get_length()
+    segment_length = max(1, int(round(PREVIEW_SEGMENT_SECONDS * PROJECT().profile.fps())))
+
+    # Segments are at fixed timeline positions, so segments requested by different ranges match.
+    segments = set(_preview_segments)
+    for range_in, range_out in ranges:
+        range_out = min(range_out, seq_len - 1)
+        for segment_index in range(range_in // segment_length, range_out // segment_length + 1):
+            segment_in = segment_index * segment_length
+            segment_out = min(segment_in + segment_length - 1, seq_len - 1)
+            segments.add((segment_in, segment_out))
+    _preview_segments = sorted(segments)
+
+    cache_paths = _get_cache_paths(seq, _preview_segments)
+    render_segments = []
+    render_cache_paths = []
+    for i in range(0, len(_preview_segments)):
+        if not os.path.isfile(cache_paths[i]):
+            render_segments.append(_preview_segments[i])
+            render_cache_paths.append(cache_paths[i])
+    if len(render_segments) == 0:
+        return
+
+    _stop_render_thread()
+
+    # Project snapshot needs to be created on GTK thread.
+    s_proj = persistance.get_pickleable_project(PROJECT())
+    _render_thread = PreviewRenderThread(s_proj, render_segments, render_cache_paths)
+    _render_thread.start()
+
+def _get_cache_paths(seq, segments):
+    segment_hashes = segmentcache.get_sequence_segment_hashes(seq, segments, PREVIEW_ARGS,
+                                                              PROJECT().profile.description(), PREVIEW_EXTENSION)
+    return [segmentcache.get_segment_path(segment_hash, PREVIEW_EXTENSION) for segment_hash in segment_hashes]
+
+def _stop_render_thread():
+    global _render_thread
+    if _render_thread != None:
+        _render_thread.abort()
+        _render_thread = None
+
+def _preview_render_done(render_thread):
+    global _render_thread
+    if render_thread == _render_thread:
+        _render_thread = None
+
+
+class PreviewRenderThread(threading.Thread):
+
+    def __init__(self, s_proj, segments, cache_paths):
+        threading.Thread.__init__(self)
+        self.s_proj = s_proj
+        self.segments = segments
+        self.cache_paths = cache_paths
+        self.running = True
+
+    def run(self):
+        project_path = userfolders.get_temp_render_dir() + "preview_" + os.urandom(8).hex() + ".flb"
+        persistance.write_pickleable_project(self.s_proj, project_path)
+
+        # Chunk renders write only into cache paths, render path is given for file extension.
+        # Segments are played one by one and not joined, so they are rendered with audio.
+        render_path = userfolders.get_temp_render_dir() + "preview" + PREVIEW_EXTENSION
+        chunked_render = chunkrender.ChunkedRender(project_path, render_path, PREVIEW_ARGS, self.s_proj.profile_desc,
+                                                   self.segments, self.cache_paths, separate_audio=False)
+        # Leave processors for editing and playback while rendering.
+        chunked_render.max_running = max(1, chunked_render.max_running // 2)
+        chunked_render.start()
+
+        try:
+            while self.running:
+                if chunked_render.update() == True:
+                    break
+                time.sleep(0.5)
+        except chunkrender.ChunkRenderError as e:
+            print("Preview render failed:", e)
+            self.running = False
+
+        if self.running == False:
+            chunked_render.abort()
+        chunked_render.cleanup()
+        try:
+            os.remove(project_path)
+        except OSError:
+            pass
+
+        GLib.idle_add(_preview_render_done, self)
+
+    def abort(self):
+        self.running = False
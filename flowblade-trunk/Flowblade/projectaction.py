@@ -23,9 +23,11 @@ Module handles user actions that are not edits on the current sequence.
 Load, save, add media file, etc...
 """
 
+import concurrent.futures
 import datetime
 import glob
 import hashlib
+import multiprocessing
 try:
     import mlt7 as mlt
 except:
@@ -70,6 +72,7 @@ import kftoolmode
 import medialinker
 import medialog
 import mediaplugin
+import mediaprobecache
 import modesetting
 import movemodes
 import mltprofiles
@@ -104,6 +107,15 @@ force_proxy = False
 # This is needed to pass only one event for double click, double init for monitor click possibly somewhat unstable
 _media_panel_double_click_counter = 0
 
+# Save currently being written out, if any.
+_save_thread = None
+
+# Minimum time in seconds between media panel updates when adding media files.
+MEDIA_PANEL_UPDATE_INTERVAL = 0.5
+
+# Media files are probed in parallel, decoders use threads of their own and disk access dominates with more threads.
+MAX_MEDIA_PROBE_THREADS = 4
+
 
 #--------------------------------------- worker threads
 class LoadThread(threading.Thread):
@@ -206,7 +218,8 @@ class LoadThread(threading.Thread):
         
         # Update icons for 'replace media' feature.
         if self.replace_media_file_path != None: 
-            (icon_path, length, info) = projectdata.thumbnailer.write_image(self.replace_media_file_path)
+            (icon_path, length, info) = projectdata.thumbnailer.write_image(self.replace_media_file_path, use_cache=False)
+            mediaprobecache.save()
             media_file = PROJECT().get_media_file_for_path(self.replace_media_file_path)
             media_file.info = info
             media_file.icon_path = icon_path
@@ -266,6 +279,37 @@ class LoadThread(threading.Thread):
             dialog.destroy()
 
 
+class SaveThread(threading.Thread):
+    """
+    Writes out project snapshot created on GTK thread with persistance.get_pickleable_project().
+    Callbacks are called on GTK thread, completed_callback(file_path) and failed_callback().
+    """
+    def __init__(self, s_proj, file_path, completed_callback, failed_callback):
+        self.s_proj = s_proj
+        self.file_path = file_path
+        self.completed_callback = completed_callback
+        self.failed_callback = failed_callback
+        threading.Thread.__init__(self)
+
+    def run(self):
+        try:
+            persistance.write_pickleable_project(self.s_proj, self.file_path)
+        except Exception as e:
+            GLib.idle_add(self._save_failed, e)
+            return
+
+        GLib.idle_add(self._save_completed)
+
+    def _save_completed(self):
+        if self.completed_callback != None:
+            self.completed_callback(self.file_path)
+
+    def _save_failed(self, error):
+        _save_failed(error)
+        if self.failed_callback != None:
+            self.failed_callback()
+
+
 class AddMediaFilesThread(threading.Thread):
     
     def __init__(self, filenames, compound_clip_name=None):
@@ -283,6 +327,8 @@ class AddMediaFilesThread(threading.Thread):
         target_bin = PROJECT().c_bin
         succes_new_file = None
         filenames = self.filenames
+        accepted_files = []
+        accepted_paths = set()
         for new_file in filenames:
             (folder, file_name) = os.path.split(new_file)
             
@@ -302,19 +348,33 @@ class AddMediaFilesThread(threading.Thread):
                 extension_refused.append(new_file)
                 continue
 
-            if PROJECT().media_file_exists(new_file):
+            if PROJECT().media_file_exists(new_file) or new_file in accepted_paths:
                 duplicates.append(file_name)
             else:
+                accepted_files.append(new_file)
+                accepted_paths.add(new_file)
+
+        # Probe files and write thumbnails in parallel, add results to project in 
+        # original order and update media panel once per batch.
+        last_update_time = time.monotonic()
+        added_media_files = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(multiprocessing.cpu_count(), MAX_MEDIA_PROBE_THREADS)) as executor:
+            probe_futures = [executor.submit(projectdata.probe_media_file, new_file) for new_file in accepted_files]
+            for new_file, probe_future in zip(accepted_files, probe_futures):
                 try:
-                    PROJECT().add_media_file(new_file, self.compound_clip_name, target_bin)
+                    probe_data = probe_future.result()
+                    media_file = PROJECT().add_probed_media_file(new_file, probe_data, self.compound_clip_name, target_bin)
+                    added_media_files.append(media_file)
                     succes_new_file = new_file
                 except projectdata.ProducerNotValidError as err:
                     GLib.idle_add(self._not_valid_producer, err)
 
-            self.list_view_update_done = False
-            GLib.idle_add(self._list_view_update)
-            while self.list_view_update_done == False:
-                time.sleep(0.05)
+                if time.monotonic() - last_update_time > MEDIA_PANEL_UPDATE_INTERVAL:
+                    self._wait_list_view_update()
+                    last_update_time = time.monotonic()
+
+        self._wait_list_view_update()
+        mediaprobecache.save()
 
         add_count = len(filenames) - len(duplicates)
         project_event = projectdata.ProjectEvent(projectdata.EVENT_MEDIA_ADDED, str(add_count))
@@ -333,10 +393,20 @@ class AddMediaFilesThread(threading.Thread):
             GLib.timeout_add(10, _duplicates_info, duplicates)
 
         if is_first_video_load:
+            # Proxies are created after profile check, proxy size depends on profile.
             GLib.timeout_add(10, _first_load_profile_check)
-            
+        elif self.compound_clip_name == None:
+            GLib.idle_add(proxyediting.create_proxies_by_rules, added_media_files)
+
         audiowaveformrenderer.launch_audio_levels_rendering(filenames)
 
+    def _wait_list_view_update(self):
+        # Media panel reads project media files, so we don't add more until update is done.
+        self.list_view_update_done = False
+        GLib.idle_add(self._list_view_update)
+        while self.list_view_update_done == False:
+            time.sleep(0.05)
+
     def _list_view_update(self):
         gui.media_list_view.fill_data_model()
         max_val = gui.editor_window.media_scroll_window.get_vadjustment().get_upper()
@@ -423,7 +493,12 @@ class UpdateMediaLengthsThread(threading.Thread):
         for key, media_file in PROJECT().media_files.items():
             if media_file.type == appconsts.VIDEO or media_file.type == appconsts.IMAGE_SEQUENCE:
                 guiutils.update_text_idle(self.dialog.info, media_file.name)
-        
+
+                probe_data = mediaprobecache.get_probe_data(media_file.path, PROJECT().profile)
+                if probe_data != None:
+                    media_file.length = probe_data["length"]
+                    continue
+
                 producer = mlt.Producer(PROJECT().profile, str(media_file.path))
                 if producer.is_valid() == False:
                     print("not valid producer")
@@ -433,6 +508,7 @@ class UpdateMediaLengthsThread(threading.Thread):
                 media_file.length = length
                 
         PROJECT().update_media_lengths_on_load = False
+        mediaprobecache.save()
         
         GLib.idle_add(dialogutils.dialog_destroy, self.dialog, None)
         
@@ -462,7 +538,9 @@ def _first_load_profile_check():
         if media_file.type == appconsts.VIDEO:
             if media_file.matches_project_profile() == False:
                 dialogs.not_matching_media_info_dialog(PROJECT(), media_file, _not_matching_media_info_callback)
-                break
+                return
+
+    proxyediting.create_proxies_by_rules(list(PROJECT().media_files.values()))
 
 def _not_matching_media_info_callback(dialog, response_id, media_file):
     dialog.destroy()
@@ -486,6 +564,8 @@ def _not_matching_media_info_callback(dialog, response_id, media_file):
         persistance.save_project(PROJECT(), path, profile.description()) #<----- HERE
 
         actually_load_project(path, False, True)
+    else:
+        proxyediting.create_proxies_by_rules(list(PROJECT().media_files.values()))
 
 def _load_pulse_bar():
     GLib.idle_add(persistance.load_dialog.progress_bar.pulse)
@@ -544,7 +624,7 @@ def _close_dialog_callback(dialog, response_id, no_dialog_project_close=False):
             pass
         elif response_id ==  Gtk.ResponseType.YES:# "Save"
             if editorstate.PROJECT().last_save_path != None:
-                
+                wait_for_save_to_complete()
                 persistance.save_project(editorstate.PROJECT(), editorstate.PROJECT().last_save_path)
                 
                 projectdatavault.project_saved(PROJECT().last_save_path)
@@ -564,6 +644,7 @@ def _close_dialog_callback(dialog, response_id, no_dialog_project_close=False):
     app.open_project(new_project)
     
 def actually_load_project(filename, block_recent_files=False, is_first_video_load=False, is_autosave_load=False, replace_media_file_path=None):
+    wait_for_save_to_complete()
     gui.tline_canvas.disconnect_mouse_events() # mouse events dutring load cause crashes because there is no data to handle
     updater.set_info_icon("document-open")
 
@@ -582,34 +663,81 @@ def save_project():
         _save_project_in_last_saved_path()
 
 def _save_project_in_last_saved_path():
-    icon = guiutils.get_image("filter_save")
-    updater.set_info_icon(None, icon)
-
-    try:
-        
-        persistance.save_project(PROJECT(), PROJECT().last_save_path) #<----- HERE
-        projectdatavault.project_saved( PROJECT().last_save_path)
-        
-    except IOError as ioe:
-        updater.set_info_icon(None)
-        primary_txt = "I/O error({0})".format(ioe.errno)
-        secondary_txt = ioe.strerror + "."
-        dialogutils.warning_message(primary_txt, secondary_txt, gui.editor_window.window, is_info=False)
+    if _launch_save(PROJECT().last_save_path, _save_in_last_saved_path_completed) == False:
         return
 
-    editorpersistance.add_recent_project_path(PROJECT().last_save_path)
-    gui.editor_window.fill_recents_menu_widget(gui.editor_window.uimanager.get_widget('/MenuBar/FileMenu/OpenRecent'), open_recent_project)
     PROJECT().events.append(projectdata.ProjectEvent(projectdata.EVENT_SAVED, PROJECT().last_save_path))
+
+def _save_in_last_saved_path_completed(file_path):
+    projectdatavault.project_saved(file_path)
+    editorpersistance.add_recent_project_path(file_path)
+    gui.editor_window.fill_recents_menu_widget(gui.editor_window.uimanager.get_widget('/MenuBar/FileMenu/OpenRecent'), open_recent_project)
+    
+    _show_save_completed()
+
+    projectinfogui.update_project_info()
+
+def _launch_save(file_path, completed_callback, changed_profile_desc=None, failed_callback=None):
+    """
+    Creates project snapshot on GTK thread and writes it out on worker thread.
+    Edits are only blocked while snapshot is being created.
+
+    Returns False if save could not be started, error has then been shown to user.
+    If writing out fails after save was started, failed_callback is called after error has been shown.
+    """
+    global _save_thread
+    # Saves are written in request order, a save requested while another one is being written waits for it.
+    wait_for_save_to_complete()
+
+    spinner = Gtk.Spinner()
+    spinner.set_tooltip_text(_("Saving project..."))
+    spinner.start()
+    updater.set_info_icon(None, spinner)
+
+    try:
+        s_proj = persistance.get_pickleable_project(PROJECT(), changed_profile_desc)
+    except Exception as e:
+        _save_failed(e)
+        return False
+
+    # Edits done while snapshot is written out are unsaved.
+    clear_changed_since_last_save_flags()
+
+    _save_thread = SaveThread(s_proj, file_path, completed_callback, failed_callback)
+    _save_thread.start()
+    return True
+
+def save_in_progress():
+    return _save_thread != None and _save_thread.is_alive()
+
+def wait_for_save_to_complete():
+    if _save_thread != None:
+        _save_thread.join()
+
+def _show_save_completed():
+    icon = guiutils.get_image("filter_save")
+    updater.set_info_icon(None, icon)
     
     global save_icon_remove_event_id
     save_icon_remove_event_id = GLib.timeout_add(500, remove_save_icon)
 
     global save_time
     save_time = time.monotonic()
-    clear_changed_since_last_save_flags()
-    
-    projectinfogui.update_project_info()
-        
+
+def _save_failed(error):
+    # Snapshot was not written, project has unsaved changes.
+    edit.edit_done_since_last_save = True
+
+    updater.set_info_icon(None)
+    if isinstance(error, OSError) and error.errno != None:
+        primary_txt = "I/O error({0})".format(error.errno)
+        secondary_txt = str(error.strerror) + "."
+    else:
+        primary_txt = _("Project save failed!")
+        secondary_txt = _("Error message: ") + str(error)
+    dialogutils.warning_message(primary_txt, secondary_txt, gui.editor_window.window, is_info=False)
+    return False
+
 def save_project_as():
     if  PROJECT().last_save_path != None:
         open_dir = os.path.dirname(PROJECT().last_save_path)
@@ -625,53 +753,55 @@ def save_project_as():
 def _save_as_dialog_callback(dialog, response_id):
     if response_id == Gtk.ResponseType.ACCEPT:
         filenames = dialog.get_filenames()
-        PROJECT().last_save_path = filenames[0]
-        PROJECT().name = os.path.basename(filenames[0])
-        icon = guiutils.get_image("filter_save")
-        updater.set_info_icon(None, icon)
+        dialog.destroy()
 
-        try:
-            
-            persistance.save_project(PROJECT(), PROJECT().last_save_path) #<----- HERE
-            projectdatavault.project_saved( PROJECT().last_save_path)
-        
-        except IOError as ioe:
-            dialog.destroy()
-            updater.set_info_icon(None)
-            primary_txt = "I/O error({0})".format(ioe.errno)
-            secondary_txt = ioe.strerror + "."
-            dialogutils.warning_message(primary_txt, secondary_txt, gui.editor_window.window, is_info=False)
-            return
+        old_save_path = PROJECT().last_save_path
+        old_name = PROJECT().name
+        save_path = filenames[0]
+        # Snapshot is created with new path and name.
+        PROJECT().last_save_path = save_path
+        PROJECT().name = os.path.basename(save_path)
 
         if len(PROJECT().events) == 0: # Save as... with 0 project events is considered Project creation
-            p_event = projectdata.ProjectEvent(projectdata.EVENT_CREATED_BY_SAVING, PROJECT().last_save_path)
-            PROJECT().events.append(p_event)
+            p_event = projectdata.ProjectEvent(projectdata.EVENT_CREATED_BY_SAVING, save_path)
         else:
-            p_event = projectdata.ProjectEvent(projectdata.EVENT_SAVED_AS, (PROJECT().name, PROJECT().last_save_path))
-            PROJECT().events.append(p_event)
-            
-        app.stop_autosave()
-        app.start_autosave()
-        
-        global save_icon_remove_event_id
-        save_icon_remove_event_id = GLib.timeout_add(500, remove_save_icon)
-
-        global save_time
-        save_time = time.monotonic()
-        clear_changed_since_last_save_flags()
-
-        gui.editor_window.window.set_title(PROJECT().name + " - Flowblade")        
-        gui.editor_window.uimanager.get_widget("/MenuBar/FileMenu/Save").set_sensitive(True)
+            p_event = projectdata.ProjectEvent(projectdata.EVENT_SAVED_AS, (PROJECT().name, save_path))
+
+        def _save_as_failed():
+            if PROJECT().last_save_path != save_path:
+                return # Project has been saved with another name since this save was launched.
+            PROJECT().last_save_path = old_save_path
+            PROJECT().name = old_name
+            if p_event in PROJECT().events:
+                PROJECT().events.remove(p_event)
+            gui.editor_window.window.set_title(PROJECT().name + " - Flowblade")
+            projectinfogui.update_project_info()
+
+        if _launch_save(save_path, _save_as_completed, None, _save_as_failed) == False:
+            PROJECT().last_save_path = old_save_path
+            PROJECT().name = old_name
+            return
+        PROJECT().events.append(p_event)
 
-        editorpersistance.add_recent_project_path(PROJECT().last_save_path)
-        gui.editor_window.fill_recents_menu_widget(gui.editor_window.uimanager.get_widget('/MenuBar/FileMenu/OpenRecent'), open_recent_project)
-        
-        projectinfogui.update_project_info()
-        
-        dialog.destroy()
+        gui.editor_window.window.set_title(PROJECT().name + " - Flowblade")
     else:
         dialog.destroy()
 
+def _save_as_completed(file_path):
+    projectdatavault.project_saved(file_path)
+
+    app.stop_autosave()
+    app.start_autosave()
+    
+    _show_save_completed()
+
+    gui.editor_window.uimanager.get_widget("/MenuBar/FileMenu/Save").set_sensitive(True)
+
+    editorpersistance.add_recent_project_path(file_path)
+    gui.editor_window.fill_recents_menu_widget(gui.editor_window.uimanager.get_widget('/MenuBar/FileMenu/OpenRecent'), open_recent_project)
+    
+    projectinfogui.update_project_info()
+
 def update_media_lengths():
     dialog = dialogs.update_media_lengths_progress_dialog()
     time.sleep(0.1)
@@ -694,11 +824,16 @@ def _change_project_profile_callback(dialog, response_id, profile_combo, out_fol
         old_name = PROJECT().name
         PROJECT().name  = name
         
-        persistance.save_project(PROJECT(), path, profile.description()) #<----- HERE
-        print("_change_project_profile_callback")
-            
-        project_event = projectdata.ProjectEvent(projectdata.EVENT_PROFILE_CHANGED_SAVE, str(profile.description()))
-        PROJECT().events.append(project_event)
+        # Changed profile project is saved in another file, current project still has unsaved changes if it had them before.
+        was_edited = was_edited_since_last_save()
+        # Changed profile project file is not saved into current project's vault data.
+        save_launched = _launch_save(path, lambda file_path: _show_save_completed(), profile.description())
+        if was_edited == True:
+            edit.edit_done_since_last_save = True
+
+        if save_launched == True:
+            project_event = projectdata.ProjectEvent(projectdata.EVENT_PROFILE_CHANGED_SAVE, str(profile.description()))
+            PROJECT().events.append(project_event)
         
         PROJECT().name = old_name
         PROJECT().update_media_lengths_on_load = False
@@ -744,6 +879,7 @@ def _open_recent_shutdown_dialog_callback(dialog, response_id, path):
         pass
     elif response_id ==  Gtk.ResponseType.YES:# "Save"
         if editorstate.PROJECT().last_save_path != None:
+            wait_for_save_to_complete()
             persistance.save_project(editorstate.PROJECT(), editorstate.PROJECT().last_save_path)
             projectdatavault.project_saved( PROJECT().last_save_path)
             print("_open_recent_shutdown_dialog_callback")
@@ -895,6 +1031,7 @@ def _write_out_render_item(single_render_item_item):
     profile_name = profile.description()
     r_data = batchrendering.RenderData(enc_index, quality_index, user_args, profile_text, profile_name, fps)
     r_data.proxy_mode = PROJECT().proxy_data.proxy_mode 
+    r_data.chunked_render = render.widgets.chunked_render_check.get_active()
     if user_args == True:
         r_data.args_vals_list = args_vals_list # pack these to go for display purposes if used
     
@@ -1508,6 +1645,7 @@ def _do_create_sequence_compound_clip_from_selected(dialog, response_id, name_en
     (model, rows) = selection.get_selected_rows()
     row = max(rows[0])
     selected_sequence = PROJECT().sequences[row]
+    persistance.build_deferred_sequence(selected_sequence)
 
     render_player = renderconsumer.XMLRenderPlayer( write_file, _sequence_xml_compound_render_done_callback, 
                                                     (write_file, media_name), selected_sequence, 
@@ -1984,6 +2122,8 @@ def _combine_sequences_dialog_callback(dialog, response_id, action_select, seq_s
     seq = selectable_seqs[seq_select.get_active()]
     
     dialog.destroy()
+
+    persistance.build_deferred_sequence(seq)
     
     if action == 0:
         _append_sequence(seq)
@@ -2212,7 +2352,7 @@ def media_file_menu_item_selected(action, variant, data):
     if item_id == "Render Proxy File":
         proxyediting.create_proxy_menu_item_selected(media_file)
     if item_id == "Recreate Icon":
-        (icon_path, length, info) = projectdata.thumbnailer.write_image(media_file.path)
+        (icon_path, length, info) = projectdata.thumbnailer.write_image(media_file.path, use_cache=False)
         media_file.info = info
         media_file.icon_path = icon_path
         media_file.create_icon()
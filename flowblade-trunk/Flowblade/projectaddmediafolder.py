@@ -1,7 +1,8 @@
 from gi.repository import Gtk, GObject, GLib, Gdk
 
-import fnmatch
 import os
+import threading
+import time
 
 import gui
 import guiutils
@@ -11,6 +12,10 @@ import utils
 
 _add_media_window = None
 _add_files_set = None
+_scan_thread = None
+
+# Minimum time in seconds between found files updates to window while scanning.
+SCAN_UPDATE_INTERVAL = 0.25
 
 # ----------------------------------- open close
 def show_add_media_folder_dialog():
@@ -19,6 +24,7 @@ def show_add_media_folder_dialog():
 
 def _close_window():
     global _add_media_window
+    _stop_scan()
     _add_media_window.set_visible(False)
     _add_media_window.destroy()
 
@@ -119,17 +125,6 @@ class AddMediaWindow(Gtk.Window):
         row8.pack_start(close_button, False, False, 0)
         row8.pack_start(self.add_button, False, False, 0)
         
-        maximum_select = Gtk.ComboBoxText()
-        maximum_select.append_text(_("29"))
-        maximum_select.append_text(_("49"))
-        maximum_select.append_text(_("99"))
-        maximum_select.append_text(_("199"))
-        maximum_select.set_active(0)
-        self.maximum_select = maximum_select
-        maximum_label = Gtk.Label(label=_("Max. number of files to import:"))
-        row7 = guiutils.get_two_column_box(maximum_label, maximum_select, 220)
-        guiutils.set_margins(row7, 0, 12, 0, 0)
-        
         activateble_widgets = (action_label, action_select, extension_label, extension_entry)
         use_extension_checkbox.connect("toggled", _use_extension_toggled, activateble_widgets)
         
@@ -141,7 +136,7 @@ class AddMediaWindow(Gtk.Window):
         vbox.pack_start(row4, False, False, 0)
         vbox.pack_start(row5, False, False, 0)
         vbox.pack_start(row6, False, False, 0)
-        vbox.pack_start(row7, False, False, 0)
+        vbox.pack_start(guiutils.pad_label(12, 12), False, False, 0)
         vbox.pack_start(scroll_frame, False, False, 0)
         vbox.pack_start(row9, False, False, 0)
         vbox.pack_start(row8, False, False, 0)
@@ -154,93 +149,125 @@ class AddMediaWindow(Gtk.Window):
 
 # --------------------------------------------------- functionality 
 def _load_add_files_clicked():
-    _add_media_window.load_info.set_text(_("Searching..."))
-    Gdk.threads_add_idle(GLib.PRIORITY_DEFAULT_IDLE, _do_add_files_search, None)
-
-def _do_add_files_search(data):
     add_folder = _add_media_window.file_chooser.get_filenames()[0]
+    if add_folder == None:
+        return
+
     load_action = _add_media_window.action_select.get_active()
     search_recursively = _add_media_window.recursively_checkbox.get_active()
     use_extension = _add_media_window.use_extension_checkbox.get_active()
     user_extensions = _add_media_window.extension_entry.get_text()
-    maximum_file_option = _add_media_window.maximum_select.get_active()
-
-    if add_folder == None:
-        return
-    
-    if search_recursively == True:
-        candidate_files = []
-        for root, dirnames, filenames in os.walk(add_folder):
-            for filename in filenames:
-                candidate_files.append(os.path.join(root, filename))
-    else:
-        candidate_files = []
-        for filename in os.listdir(add_folder):
-            candidate_files.append(add_folder + "/" + filename)
 
     if use_extension == False:
-        if load_action == 0: # "All Files", see dialogs.py
-            filtered_files = candidate_files
-        else:
-            filtered_files = []
-            for cand_file in candidate_files:
-                file_type = utils.get_file_type(cand_file)
-                if load_action == 1 and file_type == "video": # 1 = "Video Files", see dialogs.py
-                    filtered_files.append(cand_file)
-                elif load_action == 2 and file_type == "audio": # 2 = "Audio Files", see dialogs.py
-                    filtered_files.append(cand_file)
-                elif load_action == 3 and file_type == "image": # 3 = "Image Files", see dialogs.py
-                    filtered_files.append(cand_file)
+        # Values from file type select.
+        accepted_types = [{"video", "audio", "image"}, {"video"}, {"audio"}, {"image"}][load_action]
+        accepted_extensions = None
     else:
         # Try to accept spaces, commas and periods between extensions.
         stage1 = user_extensions.replace(",", " ")
         stage2 = stage1.replace(".", " ")
-        exts = stage2.split()
+        accepted_types = None
+        accepted_extensions = set(ext.lower() for ext in stage2.split())
 
-        filtered_files = []
-        for ext in exts:
-            for cand_file in candidate_files:
-                if fnmatch.fnmatch(cand_file, "*." + ext):
-                    filtered_files.append(cand_file)
-    
-    # This is recursive, we need upper limit always
-    max_files = 29
-    if maximum_file_option == 1:
-        max_files = 49 # see dialogs.py 
-    elif maximum_file_option == 2:
-        max_files = 99 # see dialogs.py
-    elif maximum_file_option == 3:
-        max_files = 199 # see dialogs.py
-        
-    filtered_amount = len(filtered_files)
-    if filtered_amount > max_files:
-        filtered_files = filtered_files[0:max_files]
+    _stop_scan()
+
+    global _add_files_set, _scan_thread
+    _add_files_set = []
+    _add_media_window.files_view.set_buffer(Gtk.TextBuffer())
+    _add_media_window.add_button.set_sensitive(False)
+    _add_media_window.load_info.set_text(_("Searching..."))
+    _add_media_window.load_info_2.set_text("")
+
+    _scan_thread = FolderScanThread(add_folder, search_recursively, accepted_types, accepted_extensions)
+    _scan_thread.start()
+
+def _stop_scan():
+    if _scan_thread != None:
+        _scan_thread.aborted = True
+
+def _files_found(scan_thread, found_files):
+    if scan_thread != _scan_thread or scan_thread.aborted == True:
+        return
+
+    _add_files_set.extend(found_files)
+
+    text_buffer = _add_media_window.files_view.get_buffer()
+    text_buffer.insert(text_buffer.get_end_iter(), "\n".join(found_files) + "\n")
     
+    _add_media_window.load_info.set_text(_("Searching...") + " " + str(len(_add_files_set)))
+    _add_media_window.add_button.set_sensitive(True)
+
+def _scan_done(scan_thread):
+    if scan_thread != _scan_thread or scan_thread.aborted == True:
+        return
+
     global _add_files_set
-    _add_files_set = filtered_files
-
-    files_text = ""
-    for f in filtered_files:
-        files_text += f + "\n"
-     
-    text_buffer = Gtk.TextBuffer()
-    text_buffer.set_text(files_text)
-    _add_media_window.files_view.set_buffer(text_buffer)
-    
-    info_text = _("Files to load: ") + str(len(filtered_files))
+    info_text = _("Files to load: ") + str(len(_add_files_set))
     _add_media_window.load_info.set_text(info_text)
 
-    if filtered_amount > max_files:
-        _add_media_window.load_info_2.set_text(str(filtered_amount - max_files) + " / " + str(filtered_amount) + _(" of found files will not be loaded."))       
-    else:
-        _add_media_window.load_info_2.set_text("")
-
-    if len(filtered_files) > 0:
-        _add_media_window.add_button.set_sensitive(True)
-    else:
+    if len(_add_files_set) == 0:
         _add_files_set = None
+        text_buffer = Gtk.TextBuffer()
+        text_buffer.set_text(_("No files loaded."))
+        _add_media_window.files_view.set_buffer(text_buffer)
         _add_media_window.add_button.set_sensitive(False)
-    
+
+
+class FolderScanThread(threading.Thread):
+    """
+    Walks folder and sends found media files to window in batches as they are found.
+    """
+    def __init__(self, add_folder, search_recursively, accepted_types, accepted_extensions):
+        threading.Thread.__init__(self)
+        self.add_folder = add_folder
+        self.search_recursively = search_recursively
+        self.accepted_types = accepted_types
+        self.accepted_extensions = accepted_extensions
+        self.aborted = False
+
+    def run(self):
+        found_files = []
+        last_update_time = time.monotonic()
+        folders = [self.add_folder]
+        while len(folders) > 0 and self.aborted == False:
+            folder = folders.pop()
+            try:
+                with os.scandir(folder) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError as e:
+                print("Add media folder scan failed for", folder, e)
+                continue
+
+            sub_folders = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        sub_folders.append(entry.path)
+                    elif entry.is_file() and self._accepts(entry.name):
+                        found_files.append(entry.path)
+                except OSError:
+                    continue
+
+            if self.search_recursively == True:
+                # Reversed so that folders are popped in name order.
+                folders.extend(reversed(sub_folders))
+
+            if len(found_files) > 0 and time.monotonic() - last_update_time > SCAN_UPDATE_INTERVAL:
+                GLib.idle_add(_files_found, self, found_files)
+                found_files = []
+                last_update_time = time.monotonic()
+
+        if len(found_files) > 0:
+            GLib.idle_add(_files_found, self, found_files)
+        GLib.idle_add(_scan_done, self)
+
+    def _accepts(self, file_name):
+        if self.accepted_extensions != None:
+            ext = os.path.splitext(file_name)[1].lstrip(".").lower()
+            return ext in self.accepted_extensions
+
+        return utils.get_file_type(file_name) in self.accepted_types
+
 def _use_extension_toggled(checkbutton, widgets):
     action_label, action_select, extension_label, extension_entry = widgets
     if checkbutton.get_active() == True:
@@ -255,7 +282,7 @@ def _use_extension_toggled(checkbutton, widgets):
         extension_entry.set_sensitive(False)
 
 def _do_folder_media_import():
-    _close_window()
+    _close_window() # Stops scan if still running, files found so far are imported.
     Gdk.threads_add_idle(GLib.PRIORITY_DEFAULT_IDLE, _do_folder_media_import_on_idle, None) # Let's kill window first
 
 def _do_folder_media_import_on_idle(data):
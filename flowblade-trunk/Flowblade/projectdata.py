@@ -22,6 +22,7 @@
 Module contains objects used to capture project data.
 """
 import cairo
+import collections
 import datetime
 try:
     import mlt7 as mlt
@@ -30,11 +31,13 @@ except:
 import hashlib
 import os
 import shutil
+import threading
 
-from gi.repository import GdkPixbuf
+from gi.repository import GdkPixbuf, GLib
 
 import appconsts
 import editorpersistance
+import mediaprobecache
 from editorstate import PROJECT
 import mltprofiles
 import patternproducer
@@ -50,6 +53,18 @@ SAVEFILE_VERSION = 5 # This has freezed at 5 for long time,
 
 FALLBACK_THUMB = "fallback_thumb.png"
 
+# Media icon surfaces are decoded lazily on a worker thread and kept in a size bounded LRU cache.
+ICON_CACHE_SIZE = 1000
+_icon_surfaces = collections.OrderedDict() # icon path -> cairo surface
+_icons_to_decode = []
+_icon_media_paths = {} # icon path -> media path, used to recreate evicted thumbnail files
+_icon_decode_thread = None
+_icon_lock = threading.Lock()
+_loading_icon = None
+
+# Called on GTK thread after decoded icons are available.
+icons_decoded_listener = None
+
  
 # Project events
 EVENT_CREATED_BY_NEW_DIALOG = 0
@@ -138,25 +153,17 @@ class Project:
         """
         Adds media file to project if exists and file is of right type.
         """
+        probe_data = probe_media_file(file_path)
+        return self.add_probed_media_file(file_path, probe_data, compound_clip_name, target_bin)
+
+    def add_probed_media_file(self, file_path, probe_data, compound_clip_name=None, target_bin=None):
+        """
+        Adds media file to project using data from probe_media_file().
+        """
         (directory, file_name) = os.path.split(file_path)
         (name, ext) = os.path.splitext(file_name)
+        (media_type, icon_path, length, info) = probe_data
 
-        # Get media type
-        media_type = sequence.get_media_type(file_path)
-
-        # Get length and icon
-        if media_type == appconsts.AUDIO:
-            icon_path = respaths.IMAGE_PATH + "audio_file.png"
-            length = thumbnailer.get_file_length(file_path)
-            info = None
-        else: # For non-audio we need write a thumbnail file and get file length while we're at it
-             (icon_path, length, info) = thumbnailer.write_image(file_path)
-
-        # Refuse files giving "fps_den" == 0, these have been seen in the wild.
-        if media_type == appconsts.VIDEO and info["fps_den"] == 0.0: 
-            msg = _("Video file gives value 0 for 'fps_den' property.")
-            raise ProducerNotValidError(msg, file_path)
-        
         # Hide file extension if enabled in user preferences
         clip_name = file_name
         if editorpersistance.prefs.hide_file_ext == True:
@@ -398,7 +405,7 @@ class MediaFile:
         self.type = media_type
         self.length = length
         self.icon_path = icon_path
-        self.icon = None
+        self._icon = None
         self.create_icon()
 
         self.mark_in = -1
@@ -423,23 +430,28 @@ class MediaFile:
             self.mark_out = out_fr
             self.length = l
  
+    @property
+    def icon(self):
+        # Icons set explicitly are kept, icons from thumbnail files are decoded when first needed.
+        if getattr(self, "_icon", None) != None:
+            return self._icon
+
+        media_path = None
+        if self.type != appconsts.AUDIO:
+            media_path = self.path
+        surface = get_icon_surface(self.icon_path, media_path)
+        if surface == None:
+            return _get_loading_icon()
+        return surface
+
+    @icon.setter
+    def icon(self, surface):
+        self._icon = surface
+
     def create_icon(self):
-        try:
-            self.icon = self._create_image_surface(self.icon_path)
-        except:
-            print("failed to make icon from:", self.icon_path)
-            self.icon_path = respaths.IMAGE_PATH + FALLBACK_THUMB
-            self.icon = self._create_image_surface(self.icon_path)
-
-    def _create_image_surface(self, path):
-        icon = cairo.ImageSurface.create_from_png(self.icon_path)
-        scaled_icon = cairo.ImageSurface(cairo.FORMAT_ARGB32, appconsts.THUMB_WIDTH, appconsts.THUMB_HEIGHT)
-        cr = cairo.Context(scaled_icon)
-        cr.scale(float(appconsts.THUMB_WIDTH) / float(icon.get_width()), float(appconsts.THUMB_HEIGHT) / float(icon.get_height()))
-        cr.set_source_surface(icon, 0, 0)
-        cr.paint()
-        
-        return scaled_icon
+        # Icon is decoded again from icon_path when next needed.
+        self._icon = None
+        discard_icon_surface(self.icon_path)
 
     def create_proxy_path(self, proxy_width, proxy_height, file_extesion):
         if self.type == appconsts.IMAGE_SEQUENCE:
@@ -541,27 +553,41 @@ class ProducerNotValidError(Exception):
 class Thumbnailer:
     def __init__(self):
         self.profile = None
+        self.thread_profiles = threading.local()
 
     def set_context(self, profile):
         self.profile = profile
+        self.thread_profiles = threading.local()
+
+    def get_producer_profile(self):
+        # Creating producers can write into their profile, https://github.com/mltframework/mlt/issues/212,
+        # so producers created in probe threads each get profile object of their own thread.
+        if threading.current_thread() is threading.main_thread():
+            return self.profile
+        if getattr(self.thread_profiles, "profile", None) == None:
+            self.thread_profiles.profile = mlt.Profile(self.profile.file_path)
+        return self.thread_profiles.profile
     
-    def write_image(self, file_path):
+    def write_image(self, file_path, use_cache=True):
         """
-        Writes thumbnail image from file producer
+        Writes thumbnail image from file producer, use_cache=False always creates new thumbnail.
         """
         # Get data
         md_str = hashlib.md5(file_path.encode('utf-8')).hexdigest()
         thumbnail_path = userfolders.get_thumbnail_dir() + md_str + ".png"
-        render_image_path = userfolders.get_cache_dir() + "thumbnail%03d.png"
 
-        # Create consumer
-        consumer = mlt.Consumer(self.profile, "avformat", 
-                                     render_image_path)
-        consumer.set("real_time", 0)
-        consumer.set("vcodec", "png")
+        # Use cached probe data if this file has been probed before in any project.
+        probe_data = None
+        if use_cache == True:
+            probe_data = mediaprobecache.get_probe_data(file_path, self.profile)
+        if probe_data != None and probe_data["thumbnail_path"] != None and os.path.isfile(probe_data["thumbnail_path"]):
+            if probe_data["thumbnail_path"] != thumbnail_path:
+                shutil.copyfile(probe_data["thumbnail_path"], thumbnail_path)
+            utils.touch_cache_file(probe_data["thumbnail_path"])
+            return (thumbnail_path, probe_data["length"], probe_data["info"])
 
         # Create one frame producer
-        producer = mlt.Producer(self.profile, str(file_path))
+        producer = mlt.Producer(self.get_producer_profile(), str(file_path))
         if producer.is_valid() == False:
             msg = _("MLT reports that file is not a valid media producer.")
             raise ProducerNotValidError(msg, file_path)
@@ -571,25 +597,158 @@ class Thumbnailer:
         length = producer.get_length()
         frame = length // 2
         producer = producer.cut(frame, frame)
+        producer.set_speed(0)
+        producer.seek(0)
+
+        # Get frame image from producer already scaled to thumbnail size, 
+        # so full resolution image is never encoded or decoded.
+        mlt_frame = producer.get_frame()
+        mlt_frame.set("consumer_deinterlace", 1)
+        mlt_rgba = mlt_frame.get_image(mlt.mlt_image_rgba, appconsts.THUMB_WIDTH, appconsts.THUMB_HEIGHT)
+
+        # Write thumbnail
+        surface = utils.get_cairo_surface_from_mlt_rgba(mlt_rgba, appconsts.THUMB_WIDTH, appconsts.THUMB_HEIGHT)
+        surface.write_to_png(thumbnail_path)
+
+        mediaprobecache.set_probe_data(file_path, self.profile, length, info, thumbnail_path)
 
-        # Connect and write image
-        consumer.connect(producer)
-        consumer.run()
-        
-        # consumer.run() blocks until done so the thubnailfile is now ready to be copied.
-        shutil.copyfile(userfolders.get_cache_dir() + "thumbnail001.png", thumbnail_path)
-        
         return (thumbnail_path, length, info)
 
     def get_file_length(self, file_path):
         # This is used for audio files which don't need a thumbnail written
         # but do need file length known
+        probe_data = mediaprobecache.get_probe_data(file_path, self.profile)
+        if probe_data != None:
+            return probe_data["length"]
 
-        producer = mlt.Producer(self.profile, str(file_path))
+        producer = mlt.Producer(self.get_producer_profile(), str(file_path))
         if producer.get("seekable") == "0":
             msg = _("Audio file not seekable, cannot be edited.\n\n")
             raise ProducerNotValidError(msg, file_path)
-        return producer.get_length()
+        length = producer.get_length()
+
+        mediaprobecache.set_probe_data(file_path, self.profile, length, None, None)
+
+        return length
+
+
+
+# ----------------------------------- media icons
+def get_icon_surface(icon_path, media_path=None):
+    """
+    Returns decoded icon surface or None and queues icon for decoding if not available.
+
+    If media_path is given, missing thumbnail file is recreated from media.
+    """
+    global _icon_decode_thread
+    with _icon_lock:
+        surface = _icon_surfaces.get(icon_path)
+        if surface != None:
+            _icon_surfaces.move_to_end(icon_path)
+            return surface
+
+        if not(icon_path in _icons_to_decode):
+            _icons_to_decode.append(icon_path)
+            if media_path != None:
+                _icon_media_paths[icon_path] = media_path
+        if _icon_decode_thread == None:
+            _icon_decode_thread = IconDecodeThread()
+            _icon_decode_thread.start()
+
+    return None
+
+def peek_icon_surface(icon_path):
+    """
+    Returns decoded icon surface or None without queueing decode.
+    """
+    with _icon_lock:
+        return _icon_surfaces.get(icon_path)
+
+def discard_icon_surface(icon_path):
+    with _icon_lock:
+        _icon_surfaces.pop(icon_path, None)
+
+def _create_icon_surface(icon_path):
+    icon = cairo.ImageSurface.create_from_png(icon_path)
+    scaled_icon = cairo.ImageSurface(cairo.FORMAT_ARGB32, appconsts.THUMB_WIDTH, appconsts.THUMB_HEIGHT)
+    cr = cairo.Context(scaled_icon)
+    cr.scale(float(appconsts.THUMB_WIDTH) / float(icon.get_width()), float(appconsts.THUMB_HEIGHT) / float(icon.get_height()))
+    cr.set_source_surface(icon, 0, 0)
+    cr.paint()
+    
+    return scaled_icon
+
+def _get_loading_icon():
+    # Displayed while icon is being decoded.
+    global _loading_icon
+    if _loading_icon == None:
+        _loading_icon = _create_icon_surface(respaths.IMAGE_PATH + FALLBACK_THUMB)
+    return _loading_icon
+
+def _icons_decoded():
+    if icons_decoded_listener != None:
+        icons_decoded_listener()
+
+
+class IconDecodeThread(threading.Thread):
+    """
+    Decodes queued icon files into surfaces in icon cache.
+    """
+    def run(self):
+        global _icon_decode_thread
+        while True:
+            with _icon_lock:
+                if len(_icons_to_decode) == 0:
+                    _icon_decode_thread = None
+                    break
+                icon_path = _icons_to_decode[0]
+                media_path = _icon_media_paths.pop(icon_path, None)
+
+            try:
+                decode_path = icon_path
+                if not os.path.isfile(icon_path) and media_path != None:
+                    # Thumbnail file was evicted from disk cache.
+                    decode_path, length, info = thumbnailer.write_image(media_path)
+                surface = _create_icon_surface(decode_path)
+                utils.touch_cache_file(decode_path)
+            except:
+                print("failed to make icon from:", icon_path)
+                surface = _get_loading_icon()
+
+            with _icon_lock:
+                _icons_to_decode.remove(icon_path)
+                _icon_surfaces[icon_path] = surface
+                while len(_icon_surfaces) > ICON_CACHE_SIZE:
+                    _icon_surfaces.popitem(last=False)
+
+        GLib.idle_add(_icons_decoded)
+
+
+# ----------------------------------- media probing
+def probe_media_file(file_path):
+    """
+    Returns (media_type, icon_path, length, info) for media file, writes thumbnail for non-audio files.
+
+    This does not touch project data and can be called from multiple threads at once,
+    see Thumbnailer.get_producer_profile(). Probe cache has its own lock.
+    """
+    # Get media type
+    media_type = sequence.get_media_type(file_path)
+
+    # Get length and icon
+    if media_type == appconsts.AUDIO:
+        icon_path = respaths.IMAGE_PATH + "audio_file.png"
+        length = thumbnailer.get_file_length(file_path)
+        info = None
+    else: # For non-audio we need write a thumbnail file and get file length while we're at it
+         (icon_path, length, info) = thumbnailer.write_image(file_path)
+
+    # Refuse files giving "fps_den" == 0, these have been seen in the wild.
+    if media_type == appconsts.VIDEO and info["fps_den"] == 0.0: 
+        msg = _("Video file gives value 0 for 'fps_den' property.")
+        raise ProducerNotValidError(msg, file_path)
+
+    return (media_type, icon_path, length, info)
 
 
 # ----------------------------------- project and media log events
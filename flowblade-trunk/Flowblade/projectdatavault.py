@@ -62,6 +62,10 @@ AUDIO_LEVELS_FOLDER = "audio_levels/"
 PROXIES_FOLDER = "proxies/"
 INGEST_FOLDER = "ingest/"
 
+# Vault folder for proxy files shared by all projects in vault, see proxycache.py.
+# This is not a project data folder and is skipped when handling those.
+SHARED_PROXIES_FOLDER = "shared_proxies"
+
 # Enumerations for conditions that make folder an non-valid data vault.
 VAULT_IS_VALID = 0
 VAULT_HAS_NON_FOLDER_FILES = 1
@@ -183,6 +187,9 @@ def get_proxies_folder():
     
 def get_ingest_folder():
     return get_project_data_folder() + INGEST_FOLDER
+
+def get_shared_proxies_folder():
+    return join(get_active_vault_folder(), SHARED_PROXIES_FOLDER) + "/"
     
 # ----------------------------------------------------- functional methods
 def create_project_data_folders():
@@ -331,7 +338,7 @@ class VaultDataHandle:
 
     def create_data_folders_handles(self):
         self.data_folders = []
-        folders = [f for f in listdir(self.vault_path) if isdir(join(self.vault_path, f))]
+        folders = [f for f in listdir(self.vault_path) if isdir(join(self.vault_path, f)) and f != SHARED_PROXIES_FOLDER]
         
         for folder in folders:
             path = self.vault_path + folder
@@ -340,7 +347,8 @@ class VaultDataHandle:
 
     def folder_is_valid_data_store(self):
         self.create_data_folders_handles()
-        if len(self.data_folders) != len(listdir(self.vault_path)):
+        vault_contents = [f for f in listdir(self.vault_path) if f != SHARED_PROXIES_FOLDER]
+        if len(self.data_folders) != len(vault_contents):
             # Valid data store only has folders in it.
             return (VAULT_HAS_NON_FOLDER_FILES, (len(self.data_folders), listdir(self.vault_path)))
         
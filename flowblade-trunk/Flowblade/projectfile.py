@@ -0,0 +1,201 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module reads and writes project files.
+
+Project files are written in a container format where pickleable project
+data is split into separately pickled sections. Tools that only need some of the
+data, e.g. media files list or a single sequence, can read just those sections.
+
+File layout:
+    MAGIC
+    container version, 4 bytes big endian
+    index length, 8 bytes big endian
+    index, pickled dict { section name : (offset, length) }, offsets from end of index
+    section data
+
+Files written before container format are single pickled project objects,
+those are still read with all sections present.
+"""
+
+import copy
+import pickle
+import struct
+import sys
+
+import atomicfile
+
+MAGIC = b"FLOWBLADEPROJECT"
+CONTAINER_VERSION = 1
+
+# Sections
+HEADER = "header"
+MEDIA_FILES = "media_files"
+MEDIA_LOG = "media_log"
+EVENTS = "events"
+SEQUENCE = "sequence_" # + sequence index
+
+# Project attributes for sections other than header and sequences.
+_SECTION_ATTRS = {  MEDIA_FILES: ["media_files"],
+                    MEDIA_LOG: ["media_log", "media_log_groups"],
+                    EVENTS: ["events"]}
+
+_HEADER_FORMAT = ">IQ"
+
+
+class ProjectFileError(Exception):
+
+    def __init__(self, value):
+        self.value = value
+    def __str__(self):
+        return repr(self.value)
+
+
+# ------------------------------------------------------ write
+def write_project_file(s_proj, file_path):
+    """
+    Writes pickleable project object into container file.
+    """
+    sections = {}
+
+    header = copy.copy(s_proj)
+    for section_name, attrs in _SECTION_ATTRS.items():
+        section_data = []
+        for attr in attrs:
+            section_data.append(getattr(s_proj, attr))
+            delattr(header, attr)
+        sections[section_name] = pickle.dumps(section_data)
+
+    for i in range(0, len(s_proj.sequences)):
+        sections[SEQUENCE + str(i)] = pickle.dumps(s_proj.sequences[i])
+    header.sequences = None
+    header.sequences_count = len(s_proj.sequences)
+
+    sections[HEADER] = pickle.dumps(header)
+
+    index = {}
+    offset = 0
+    for section_name, data in sections.items():
+        index[section_name] = (offset, len(data))
+        offset += len(data)
+    index_data = pickle.dumps(index)
+
+    with atomicfile.AtomicFileWriter(file_path, "wb") as afw:
+        outfile = afw.get_file()
+        outfile.write(MAGIC)
+        outfile.write(struct.pack(_HEADER_FORMAT, CONTAINER_VERSION, len(index_data)))
+        outfile.write(index_data)
+        for section_name, data in sections.items():
+            outfile.write(data)
+
+# ------------------------------------------------------ read
+def is_container_file(file_path):
+    with open(file_path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def read_project_file(file_path):
+    """
+    Returns pickleable project object with all sections.
+    """
+    return read_project_sections(file_path, None)
+
+def read_project_sections(file_path, section_names, current_sequence_only=False):
+    """
+    Returns pickleable project object with header data and given sections.
+
+    section_names == None reads all sections. 
+    
+    If current_sequence_only == True, only current sequence is read 
+    and it is made the only sequence in project.
+
+    Attributes for sections not read are not set, except for files saved
+    before container format that always have all data.
+    """
+    with open(file_path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            # Pre-container file, everything is in single pickle.
+            f.seek(0)
+            project = _loads(f.read())
+            if current_sequence_only == True:
+                _set_current_sequence_only(project, project.sequences[project.c_seq_index])
+            return project
+
+        container_version, index_length = struct.unpack(_HEADER_FORMAT, f.read(struct.calcsize(_HEADER_FORMAT)))
+        if container_version > CONTAINER_VERSION:
+            raise ProjectFileError("Project file container version " + str(container_version) + " not supported.")
+
+        index = _loads(f.read(index_length))
+        data_start = f.tell()
+
+        def read_section(name):
+            offset, length = index[name]
+            f.seek(data_start + offset)
+            return _loads(f.read(length))
+
+        project = read_section(HEADER)
+
+        for section_name, attrs in _SECTION_ATTRS.items():
+            if section_names != None and not(section_name in section_names):
+                continue
+            section_data = read_section(section_name)
+            for attr, value in zip(attrs, section_data):
+                setattr(project, attr, value)
+
+        sequences_count = project.sequences_count
+        del project.sequences_count
+        if section_names == None or SEQUENCE in section_names:
+            if current_sequence_only == True:
+                _set_current_sequence_only(project, read_section(SEQUENCE + str(project.c_seq_index)))
+            else:
+                project.sequences = []
+                for i in range(0, sequences_count):
+                    project.sequences.append(read_section(SEQUENCE + str(i)))
+
+    return project
+
+def _set_current_sequence_only(project, seq):
+    project.sequences = [seq]
+    project.c_seq_index = 0
+
+def _loads(data):
+    try:
+        return pickle.loads(data)
+    except:
+        # Fix for opening projects when mlt available as 'mlt7' but saved with
+        # mlt available as 'mlt'.
+        #
+        # Because sequence.py does 'import mlt' (and now does 'import mlt7') we still
+        # import it on pickle.load() even if no MLT objects are pickled.
+        # Once mlt Python bindigs name changed from 'mlt to 'mlt7' the unpickle failed.
+        # We need to do 'sys.modules["mlt"] = mlt' after 'import mlt7 as mlt'
+        # to make module 'mlt' available when doing unpickling.
+        #
+        # NOTE: It may not be possible to remove mlt import from pickle data, but we need to
+        # make an effort.
+        if not("mlt" in sys.modules):
+            print("Fixing for unpickling doing 'import mlt'...")
+            import mlt7 as mlt
+            sys.modules["mlt"] = mlt
+
+        try:
+            return pickle.loads(data)
+        except:
+            return pickle.loads(data, encoding='latin1')
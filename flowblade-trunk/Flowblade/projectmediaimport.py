@@ -46,6 +46,7 @@ import patternproducer
 import persistance
 import pickle
 import processutils
+import projectfile
 import respaths
 import renderconsumer
 import translations
@@ -74,9 +75,7 @@ class ProjectLoadThread(threading.Thread):
         GLib.timeout_add(0, self._update_info_window)
         
         persistance.show_messages = False
-        target_project = persistance.load_project(self.filename, False, True)
-        
-        target_project.c_seq = target_project.sequences[target_project.c_seq_index]
+        target_project = persistance.load_project_sections(self.filename, [projectfile.MEDIA_FILES])
 
         # Media file media assets and generator assets are handled a differently.
         media_assets = ""
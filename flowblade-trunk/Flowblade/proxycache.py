@@ -0,0 +1,158 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module provides proxy files shared by all projects in active data vault.
+
+Proxy files are named by source file content identity and proxy settings, so the same
+source file used in several projects is transcoded only once. Content identity is
+file size, modification time and md5 of data at file start and end, hashing whole
+camera files would take too long.
+
+Proxies are rendered into temporary files that are moved into place when complete,
+so files with cache names are always complete proxies. Render files of failed and aborted
+renders are deleted by render jobs, render files left by crashed processes are deleted on startup.
+
+Shared proxies are evicted with other disk cache data when disk cache budget is exceeded,
+see diskcachemanagement.py. Proxies used by open project are not evicted.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import projectdatavault
+
+HASH_BLOCK_SIZE = 1024 * 1024
+RENDERING_MARKER = ".rendering"
+STALE_RENDER_FILE_AGE = 60 * 60 # seconds, render files are written continuously while rendering.
+
+_identities = {} # (path, size, mtime_ns) -> content identity, each file is hashed once per session.
+_lock = threading.Lock()
+
+
+# ------------------------------------------------------ interface
+def get_proxy_path(media_path, proxy_w, proxy_h, proxy_profile, proxy_encoding):
+    """
+    Returns shared cache path for proxy file or None if media file cannot be read.
+    """
+    identity = _get_content_identity(media_path)
+    if identity == None:
+        return None
+
+    # Encoding is identified by its args, index into proxy encodings list differs between machines sharing vault.
+    proxy_key = (identity + str(proxy_w) + "x" + str(proxy_h)
+                 + "_" + str(proxy_profile.frame_rate_num()) + "/" + str(proxy_profile.frame_rate_den())
+                 + "_" + proxy_profile.description()
+                 + "_" + proxy_encoding.name + "_" + proxy_encoding.attr_string)
+    md_str = hashlib.md5(proxy_key.encode('utf-8')).hexdigest()
+    return get_cache_folder() + md_str + "." + proxy_encoding.extension
+
+def get_cached_proxy(media_path, proxy_w, proxy_h, proxy_profile, proxy_encoding):
+    """
+    Returns path to existing proxy file or None.
+    """
+    proxy_path = get_proxy_path(media_path, proxy_w, proxy_h, proxy_profile, proxy_encoding)
+    if proxy_path != None and os.path.isfile(proxy_path):
+        return proxy_path
+    return None
+
+def get_render_path(proxy_path):
+    # Each render gets its own file so that projects rendering the same proxy do not collide.
+    path_start, file_extension = os.path.splitext(proxy_path)
+    return path_start + "_" + os.urandom(8).hex() + RENDERING_MARKER + file_extension
+
+def proxy_render_complete(render_path, proxy_path):
+    """
+    Moves rendered proxy into its cache path, returns path that should be used for proxy.
+    """
+    try:
+        os.replace(render_path, proxy_path)
+        return proxy_path
+    except OSError as e:
+        print("Moving rendered proxy to shared proxies failed:", e)
+        return render_path
+
+def is_render_file(path):
+    # Segment files of segmented renders have the marker too.
+    return RENDERING_MARKER in os.path.basename(path)
+
+def delete_render_file(render_path):
+    try:
+        os.remove(render_path)
+    except OSError:
+        pass
+
+def delete_stale_render_files():
+    """
+    Deletes render files left behind by crashed or killed renders. Other running instances sharing
+    vault may be rendering, so only files that have not been written into for a while are deleted.
+    """
+    folder = projectdatavault.get_shared_proxies_folder()
+    try:
+        file_names = os.listdir(folder)
+    except OSError:
+        return # Folder does not exist.
+
+    now = time.time()
+    for file_name in file_names:
+        if is_render_file(file_name) == False:
+            continue
+        try:
+            if now - os.path.getmtime(folder + file_name) > STALE_RENDER_FILE_AGE:
+                os.remove(folder + file_name)
+        except OSError:
+            pass
+
+def get_cache_folder():
+    folder = projectdatavault.get_shared_proxies_folder()
+    if not os.path.isdir(folder):
+        os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+# ------------------------------------------------------ module functions
+def _get_content_identity(media_path):
+    try:
+        stat = os.stat(media_path)
+    except OSError:
+        return None
+
+    stat_key = (media_path, stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        identity = _identities.get(stat_key)
+    if identity != None:
+        return identity
+
+    md5 = hashlib.md5()
+    try:
+        with open(media_path, "rb") as f:
+            md5.update(f.read(HASH_BLOCK_SIZE))
+            if stat.st_size > HASH_BLOCK_SIZE:
+                f.seek(max(HASH_BLOCK_SIZE, stat.st_size - HASH_BLOCK_SIZE))
+                md5.update(f.read(HASH_BLOCK_SIZE))
+    except OSError:
+        return None
+
+    identity = str(stat.st_size) + "_" + str(stat.st_mtime_ns) + "_" + md5.hexdigest()
+    with _lock:
+        _identities[stat_key] = identity
+    return identity
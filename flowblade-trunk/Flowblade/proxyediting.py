@@ -24,22 +24,27 @@ except:
     import mlt
 import os
 import threading
-import time
 
 from gi.repository import Gtk, GLib
 
-import app
 import appconsts
 import atomicfile
+import clipeffectseditor
 import dialogutils
+import edit
 import editorstate
 import gui
 import guiutils
 import jobs
+import miscdataobjects
+import mltfilters
+import movemodes
 import persistance
-import render
+import proxycache
 import renderconsumer
-import sequence
+import resync
+import undo
+import updater
 import utils
 import userfolders
 
@@ -49,7 +54,15 @@ proxy_render_issues_window = None
 
 render_thread = None
 runner_thread = None
-load_thread = None
+
+# Clip attributes that are not copied when clip is replaced with a clip using other media file.
+SWAP_NOT_COPIED_ATTRS = ["this", "thisown", "path", "speed", "clip_length", "filters", "mute_filter"]
+
+# Automatic proxy creation size rule values, these correspond with rules size combobox indexes.
+CREATE_RULE_WIDTHS = [-1, 1280, 1920, 2560, 3840]
+
+# Codec long name parts for codecs that use inter frame compression and are slow to seek and scrub.
+LONG_GOP_CODECS = ["h.264", "h.265", "hevc", "mpeg-1", "mpeg-2", "mpeg-4", "vp8", "vp9", "av1"]
 
 # These are made to correspond with size selector combobox indexes on manager window
 PROXY_SIZE_FULL = appconsts.PROXY_SIZE_FULL
@@ -71,16 +84,22 @@ class ProxyRenderItemData:
         self.media_file_path = media_file_path
         self.proxy_profile_desc = proxy_profile_desc
         self.lookup_path = lookup_path # For img seqs only
+        self.cache_proxy_path = None # Shared proxy path when rendering into proxycache, 'proxy_file_path' is then temporary render file.
+        self.media_length = -1 # Used to split long renders into segments, -1 for not known.
         
         # We're packing this to go, jobs.py is imported into this module and we wish to not import this into jobs.py.
         self.do_auto_re_convert_func = _auto_re_convert_after_proxy_render_in_proxy_mode
 
-    def get_data_as_args_tuple(self):
+    def get_data_as_args_tuple(self, proxy_file_path=None):
+        # 'proxy_file_path' is given when rendering proxy segments into separate files.
+        if proxy_file_path == None:
+            proxy_file_path = self.proxy_file_path
+
         args = ("media_file_id:" + str(self.media_file_id), 
                 "proxy_w:" + str(self.proxy_w), 
                 "proxy_h:" + str(self.proxy_h),
                 "enc_index:" + str(self.enc_index),
-                "proxy_file_path:" + str(self.proxy_file_path),
+                "proxy_file_path:" + str(proxy_file_path),
                 "proxy_rate:"+ str(self.proxy_rate),
                 "media_file_path:" + str(self.media_file_path),
                 "proxy_profile_desc:" + str(self.proxy_profile_desc),
@@ -101,12 +120,25 @@ class ProxyRenderRunnerThread(threading.Thread):
         enc_index = editorstate.PROJECT().proxy_data.encoding
 
         proxy_render_items = []
+        cached_proxies = []
         for media_file in self.files_to_render:
             if media_file.type != appconsts.IMAGE_SEQUENCE:
-                
-                
                 proxy_encoding = renderconsumer.proxy_encodings[enc_index]
-                proxy_file_path = media_file.create_proxy_path(proxy_w, proxy_h, proxy_encoding.extension)
+
+                # Proxies are shared between projects using content addressed cache unless
+                # user has asked for project specific proxies to be rerendered.
+                cache_proxy_path = None
+                if not hasattr(media_file, "use_unique_proxy"):
+                    cache_proxy_path = proxycache.get_proxy_path(media_file.path, proxy_w, proxy_h, self.proxy_profile, proxy_encoding)
+                if cache_proxy_path != None and os.path.isfile(cache_proxy_path):
+                    utils.touch_cache_file(cache_proxy_path)
+                    cached_proxies.append((media_file, cache_proxy_path))
+                    continue
+
+                if cache_proxy_path != None:
+                    proxy_file_path = proxycache.get_render_path(cache_proxy_path)
+                else:
+                    proxy_file_path = media_file.create_proxy_path(proxy_w, proxy_h, proxy_encoding.extension)
 
                 # Bit rates for proxy files are counted using 2500kbs for 
                 # PAL size image as starting point.
@@ -123,6 +155,8 @@ class ProxyRenderRunnerThread(threading.Thread):
                                                 proxy_file_path, proxy_rate, media_file.path,
                                                 self.proxy_profile.description(), 
                                                 None)
+                item_data.cache_proxy_path = cache_proxy_path
+                item_data.media_length = media_file.length
             else:
 
                 asset_folder, asset_file_name = os.path.split(media_file.path)
@@ -139,8 +173,22 @@ class ProxyRenderRunnerThread(threading.Thread):
                 
             proxy_render_items.append(item_data)
         
+        if len(cached_proxies) > 0:
+            GLib.idle_add(self._use_cached_proxies, cached_proxies)
         GLib.idle_add(self._create_job_queue_objects, proxy_render_items)
+
+    def _use_cached_proxies(self, cached_proxies):
+        for media_file, proxy_path in cached_proxies:
+            media_file.add_proxy_file(proxy_path)
+            if editorstate.PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA:
+                media_file.set_as_proxy_media_file()
         
+        gui.media_list_view.widget.queue_draw()
+
+        # Proxy clips are updated here if no renders are needed, otherwise after the last render completes.
+        if editorstate.PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA and len(self.files_to_render) == len(cached_proxies):
+            _auto_re_convert_after_proxy_render_in_proxy_mode()
+
     def _create_job_queue_objects(self, proxy_render_items):
         for proxy_render_data_item in proxy_render_items:
             session_id = hashlib.md5(str(os.urandom(32)).encode('utf-8')).hexdigest()
@@ -248,10 +296,45 @@ class ProxyManagerDialog:
 
         panel_onoff = guiutils.get_named_frame(_("Project Proxy Mode"), vbox_onoff)
 
+        # Automatic proxy creation
+        rules = _get_create_rules()
+        self.rules_enabled = Gtk.CheckButton(label=_("Create Proxies When Media Is Added"))
+        self.rules_enabled.set_active(rules.enabled)
+        self.rules_enabled.connect("toggled", lambda w: self.rules_changed())
+
+        self.rules_width_select = Gtk.ComboBoxText()
+        self.rules_width_select.append_text(_("No Size Rule"))
+        for width in CREATE_RULE_WIDTHS[1:]:
+            self.rules_width_select.append_text(_("Wider Than ") + str(width) + " px")
+        if rules.min_width in CREATE_RULE_WIDTHS:
+            self.rules_width_select.set_active(CREATE_RULE_WIDTHS.index(rules.min_width))
+        else:
+            self.rules_width_select.set_active(0)
+        self.rules_width_select.connect("changed", lambda w: self.rules_changed())
+
+        self.rules_long_gop = Gtk.CheckButton(label=_("Long-GOP Codecs (H.264, HEVC, MPEG, VP9, AV1)"))
+        self.rules_long_gop.set_active(rules.long_gop_codecs)
+        self.rules_long_gop.connect("toggled", lambda w: self.rules_changed())
+
+        row_rules = Gtk.HBox(False, 2)
+        row_rules.pack_start(self.rules_width_select, False, False, 0)
+        row_rules.pack_start(guiutils.pad_label(12, 12), False, False, 0)
+        row_rules.pack_start(self.rules_long_gop, False, False, 0)
+        row_rules.pack_start(Gtk.Label(), True, True, 0)
+
+        vbox_rules = Gtk.VBox(False, 2)
+        vbox_rules.pack_start(guiutils.get_left_justified_box([self.rules_enabled]), False, False, 0)
+        vbox_rules.pack_start(row_rules, False, False, 0)
+        vbox_rules.pack_start(guiutils.pad_label(8, 12), False, False, 0)
+        self.set_rules_sensitive()
+
+        panel_rules = guiutils.get_named_frame(_("Automatic Proxy Creation"), vbox_rules)
+
         # Pane
         vbox = Gtk.VBox(False, 2)
         vbox.pack_start(panel_encoding, False, False, 0)
         vbox.pack_start(panel_onoff, False, False, 0)
+        vbox.pack_start(panel_rules, False, False, 0)
 
         guiutils.set_margins(vbox, 8, 12, 12, 12)
 
@@ -287,6 +370,17 @@ class ProxyManagerDialog:
     def size_changed(self, size_index):
         editorstate.PROJECT().proxy_data.size = size_index
 
+    def rules_changed(self):
+        rules = _get_create_rules()
+        rules.enabled = self.rules_enabled.get_active()
+        rules.min_width = CREATE_RULE_WIDTHS[self.rules_width_select.get_active()]
+        rules.long_gop_codecs = self.rules_long_gop.get_active()
+        self.set_rules_sensitive()
+
+    def set_rules_sensitive(self):
+        self.rules_width_select.set_sensitive(self.rules_enabled.get_active())
+        self.rules_long_gop.set_sensitive(self.rules_enabled.get_active())
+
     def update_proxy_mode_display(self):
         self.set_convert_buttons_state()
         self.set_mode_display_value()
@@ -384,6 +478,8 @@ class ProxyRenderIssuesWindow:
                     f.add_existing_proxy_file(self.proxy_w, self.proxy_h, self.proxy_file_extension)
                     if editorstate.PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA:
                         f.set_as_proxy_media_file()
+                if editorstate.PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA and len(self.other_project_proxies) > 0:
+                    _auto_re_convert_after_proxy_render_in_proxy_mode()
         
             else: # Rerender All Possible
                 # We can't mess existing proxy files that are used by other projects
@@ -420,6 +516,19 @@ def create_proxy_files_pressed(render_all=False):
     
     _do_create_proxy_files(media_files)
 
+def create_proxies_by_rules(media_files):
+    """
+    Queues proxy renders for added media files that match project proxy create rules.
+    Renders are low priority jobs and use cores not used by other jobs.
+    """
+    rules = _get_create_rules()
+    if rules.enabled == False:
+        return
+
+    files_to_render = [f for f in media_files if _create_rules_match(rules, f)]
+    if len(files_to_render) > 0:
+        _create_proxy_files(files_to_render)
+
 def create_proxy_menu_item_selected(media_file):
     media_files = []
     media_files.append(media_file)
@@ -491,6 +600,31 @@ def _create_proxy_files(media_files_to_render):
     runner_thread.start()
 
 # ------------------------------------------------------------------ module functions
+def _get_create_rules():
+    proxy_data = editorstate.PROJECT().proxy_data
+    if proxy_data.create_rules == None: # projects saved before rules were implemented
+        proxy_data.create_rules = miscdataobjects.ProxyCreateRules()
+    return proxy_data.create_rules
+
+def _create_rules_match(rules, media_file):
+    if media_file.type != appconsts.VIDEO or media_file.container_data != None:
+        return False
+    if media_file.has_proxy_file == True or media_file.is_proxy_file == True:
+        return False
+    if media_file.info == None:
+        return False
+
+    if rules.min_width > 0 and media_file.info["width"] > rules.min_width:
+        return True
+    
+    if rules.long_gop_codecs == True and media_file.info["vcodec"] != None:
+        vcodec = media_file.info["vcodec"].lower()
+        for codec in LONG_GOP_CODECS:
+            if codec in vcodec:
+                return True
+
+    return False
+
 def _get_proxy_encoding():
     enc_index = editorstate.PROJECT().proxy_data.encoding
     return renderconsumer.proxy_encodings[enc_index]
@@ -544,125 +678,213 @@ def _proxy_render_stopped():
 # ----------------------------------------------------------- changing proxy modes
 def _convert_to_proxy_project():    
     editorstate.PROJECT().proxy_data.proxy_mode = appconsts.CONVERTING_TO_USE_PROXY_MEDIA
-    conv_temp_project_path = userfolders.get_cache_dir() + "proxy_conv.flb"
     manager_window.convert_progress_bar.set_text(_("Converting Project to Use Proxy Media"))
-    
-    mark_in = editorstate.PROJECT().c_seq.tractor.mark_in
-    mark_out = editorstate.PROJECT().c_seq.tractor.mark_out
-    
-    persistance.save_project(editorstate.PROJECT(), conv_temp_project_path)
-    global load_thread
-    load_thread = ProxyProjectLoadThread(conv_temp_project_path, manager_window.convert_progress_bar, mark_in, mark_out)
-    load_thread.start()
+
+    # Let progress text display before swapping producers blocks GUI thread.
+    GLib.idle_add(_do_proxy_mode_convert)
 
 def _convert_to_original_media_project():
     editorstate.PROJECT().proxy_data.proxy_mode = appconsts.CONVERTING_TO_USE_ORIGINAL_MEDIA
-    conv_temp_project_path = userfolders.get_cache_dir() + "proxy_conv.flb"
     manager_window.convert_progress_bar.set_text(_("Converting to Use Original Media"))
 
-    mark_in = editorstate.PROJECT().c_seq.tractor.mark_in
-    mark_out = editorstate.PROJECT().c_seq.tractor.mark_out
-    
-    persistance.save_project(editorstate.PROJECT(), conv_temp_project_path)
-    global load_thread
-    load_thread = ProxyProjectLoadThread(conv_temp_project_path, manager_window.convert_progress_bar, mark_in, mark_out)
-    load_thread.start()
+    GLib.idle_add(_do_proxy_mode_convert)
 
-def _auto_re_convert_after_proxy_render_in_proxy_mode():
+def _do_proxy_mode_convert():
+    project = editorstate.PROJECT()
+    to_proxy = (project.proxy_data.proxy_mode == appconsts.CONVERTING_TO_USE_PROXY_MEDIA)
 
-    editorstate.project_is_loading = True
+    # Convert media files between original and proxy files and collect clip path changes.
+    path_dict = {}
+    for media_file in project.media_files.values():
+        if to_proxy == True:
+            if media_file.has_proxy_file == False or media_file.is_proxy_file == True:
+                continue
+        elif media_file.is_proxy_file == False:
+            continue
 
-    # Save to temp to convert to using original media
-    project = editorstate.PROJECT()
-    project.proxy_data.proxy_mode = appconsts.CONVERTING_TO_USE_ORIGINAL_MEDIA
-    conv_temp_project_path = userfolders.get_cache_dir() + "proxy_conv.flb"
-    persistance.save_project(editorstate.PROJECT(), conv_temp_project_path)
-    project.proxy_data.proxy_mode = appconsts.USE_ORIGINAL_MEDIA
-
-    # Load saved temp original media project
-    persistance.show_messages = False
-    project = persistance.load_project(conv_temp_project_path)
-    
-    # Save to temp to convert back to using proxy media
-    project.proxy_data.proxy_mode = appconsts.CONVERTING_TO_USE_PROXY_MEDIA
-    persistance.save_project(project, conv_temp_project_path)
+        if not _media_file_second_path_exists(media_file):
+            print("Proxy mode convert, media not found:", media_file.second_file_path)
+            continue
+
+        path_dict[media_file.path] = media_file.second_file_path
+        if to_proxy == True:
+            media_file.set_as_proxy_media_file()
+        else:
+            media_file.set_as_original_media_file()
+
+    if to_proxy == True:
+        project.proxy_data.proxy_mode = appconsts.USE_PROXY_MEDIA
+    else:
+        project.proxy_data.proxy_mode = appconsts.USE_ORIGINAL_MEDIA
+
+    _swap_clips_media(path_dict)
     
-    # Load saved temp proxy project
-    project = persistance.load_project(conv_temp_project_path)
-    project.proxy_data.proxy_mode = appconsts.USE_PROXY_MEDIA
-        
-    editorstate.project_is_loading = False
-            
-    # Open saved temp project
-    app.stop_autosave()
+    _converting_proxy_mode_done()
 
-    GLib.idle_add(_open_project, project)
+def _auto_re_convert_after_proxy_render_in_proxy_mode():
+    # Media files have been set to use new proxies, clips still using original media are swapped.
+    path_dict = {}
+    for media_file in editorstate.PROJECT().media_files.values():
+        if media_file.is_proxy_file == True:
+            path_dict[media_file.second_file_path] = media_file.path
+
+    _swap_clips_media(path_dict)
 
-def _open_project(project):
-    app.open_project(project)
-    app.start_autosave()
     editorstate.update_current_proxy_paths()
-    persistance.show_messages = True
 
 def _converting_proxy_mode_done():
-    global load_thread
-    load_thread = None
-
     editorstate.update_current_proxy_paths()
     
     manager_window.update_proxy_mode_display()
     gui.media_list_view.widget.queue_draw()
     gui.tline_left_corner.update_gui()
-    
-
-class ProxyProjectLoadThread(threading.Thread):
-
-    def __init__(self, proxy_project_path, progressbar, mark_in, mark_out):
-        threading.Thread.__init__(self)
-        self.proxy_project_path = proxy_project_path
-        self.progressbar = progressbar
-        self.mark_in = mark_in
-        self.mark_out = mark_out
-    
-    def run(self):
-        GLib.idle_add(self._do_proxy_project_load)
-    
-    def _do_proxy_project_load(self):
-        pulse_runner = guiutils.PulseEvent(self.progressbar)
-        time.sleep(2.0)
-        persistance.show_messages = False
-        try:
 
-            project = persistance.load_project(self.proxy_project_path)
-            sequence.set_track_counts(project)
+def _media_file_second_path_exists(media_file):
+    if media_file.second_file_path == None:
+        return False
+    if media_file.type == appconsts.IMAGE_SEQUENCE:
+        return os.path.isdir(os.path.dirname(media_file.second_file_path))
+    return os.path.isfile(media_file.second_file_path)
 
-        except persistance.FileProducerNotFoundError as e:
-            print("did not find file:", e)
 
-        pulse_runner.running = False
-        time.sleep(0.3) # need to be sure pulse_runner has stopped
-        
-        project.c_seq.tractor.mark_in = self.mark_in
-        project.c_seq.tractor.mark_out = self.mark_out
+# ----------------------------------------------------------- clip media swap
+def _swap_clips_media(path_dict):
+    """
+    Replaces clips using media in path_dict keys with clips using media in
+    corresponding values in all sequences and in undo stack.
     
-        app.stop_autosave()
+    New clips get old clips ids, ranges, filters, sync relations and other clip data,
+    so compositors, undo and redo keep working without project save and reload.
+    """
+    if len(path_dict) == 0:
+        return
 
-        app.open_project(project)
+    editorstate.PLAYER().stop_playback()
+    movemodes.clear_selected_clips()
 
-        # Loaded project has been converted, set proxy mode to correct mode 
-        if project.proxy_data.proxy_mode == appconsts.CONVERTING_TO_USE_PROXY_MEDIA:
-            project.proxy_data.proxy_mode = appconsts.USE_PROXY_MEDIA
-        else:
-            project.proxy_data.proxy_mode = appconsts.USE_ORIGINAL_MEDIA
+    project = editorstate.PROJECT()
+    swapped_clips = {} # id(old_clip) -> (old_clip, new_clip), old clip is kept so that its id is not reused.
 
-        app.start_autosave()
+    for seq in project.sequences:
+        if not persistance.sequence_mlt_built(seq):
+            _swap_deferred_sequence_paths(seq, path_dict)
+            continue
 
-        global load_thread
-        load_thread = None
-        persistance.show_messages = True
+        for track in seq.tracks:
+            for i in range(0, len(track.clips)):
+                new_clip = _get_swapped_clip(seq, track.clips[i], path_dict, swapped_clips)
+                if new_clip == None:
+                    continue
+                track.remove(i)
+                track.clips[i] = new_clip
+                track.insert(new_clip, i, new_clip.clip_in, new_clip.clip_out)
 
-        selections = project.get_project_property(appconsts.P_PROP_LAST_RENDER_SELECTIONS)
-        if selections != None:
-            render.set_saved_gui_selections(selections)
-        _converting_proxy_mode_done()
+    if len(swapped_clips) == 0:
+        return
 
+    # Edits may bring back clips that are only in undo stack, those are swapped too.
+    visited = set()
+    for i in range(0, len(undo.undo_stack)):
+        undo.undo_stack[i] = _swap_edit_data_clips(undo.undo_stack[i], path_dict, swapped_clips, visited)
+
+    # Master clips of sync relations may have been swapped.
+    for seq in project.sequences:
+        if not persistance.sequence_mlt_built(seq):
+            continue
+        for track in seq.tracks:
+            for clip in track.clips:
+                if clip.is_blanck_clip == False and clip.sync_data != None:
+                    _swap_edit_data_clips(clip.sync_data, path_dict, swapped_clips, visited)
+
+    resync.sequence_changed(editorstate.current_sequence())
+
+    if id(clipeffectseditor.get_edited_clip()) in swapped_clips:
+        updater.clear_editor_panel()
+
+    editorstate.current_sequence().update_edit_tracks_length()
+    editorstate.current_sequence().update_hidden_track_for_timeline_rendering()
+    updater.repaint_tline()
+    editorstate.PLAYER().seek_frame(editorstate.PLAYER().current_frame())
+
+def _get_swapped_clip(seq, clip, path_dict, swapped_clips):
+    try:
+        old_clip, new_clip = swapped_clips[id(clip)]
+        return new_clip
+    except KeyError:
+        pass
+
+    if clip.is_blanck_clip == True or clip.media_type == appconsts.PATTERN_PRODUCER:
+        return None
+    try:
+        new_path = path_dict[clip.path]
+    except KeyError:
+        return None
+
+    if hasattr(clip, "speed"):
+        new_clip = seq.create_slowmotion_producer(new_path, clip.speed)
+    else:
+        new_clip = seq.create_file_producer_clip(new_path, None, False, getattr(clip, "ttl", None))
+    if new_clip == None:
+        return None
+
+    # Copy clip data, but not MLT object attributes, media path and objects that are moved below.
+    for attr_name, value in clip.__dict__.items():
+        if attr_name not in SWAP_NOT_COPIED_ATTRS:
+            setattr(new_clip, attr_name, value)
+
+    # Filter objects are moved to new clip, so filter edit state is kept.
+    mltfilters.detach_all_filters(clip)
+    new_clip.filters = clip.filters
+    mltfilters.attach_all_filters(new_clip)
+    if clip.mute_filter != None:
+        clip.detach(clip.mute_filter.mlt_filter)
+        mltfilters.do_clip_mute(new_clip, clip.mute_filter)
+
+    swapped_clips[id(clip)] = (clip, new_clip)
+    return new_clip
+
+def _swap_edit_data_clips(value, path_dict, swapped_clips, visited):
+    """
+    Returns value with swapped clips replaced. Only edit actions, sync data and 
+    containers are searched, MLT objects are not followed.
+    """
+    if isinstance(value, (edit.EditAction, edit.ConsolidatedEditAction, edit.SyncData)):
+        if id(value) not in visited:
+            visited.add(id(value))
+            for attr_name, attr_value in list(value.__dict__.items()):
+                value.__dict__[attr_name] = _swap_edit_data_clips(attr_value, path_dict, swapped_clips, visited)
+        return value
+    elif isinstance(value, list):
+        if id(value) not in visited:
+            visited.add(id(value))
+            for i in range(0, len(value)):
+                value[i] = _swap_edit_data_clips(value[i], path_dict, swapped_clips, visited)
+        return value
+    elif isinstance(value, tuple):
+        return tuple([_swap_edit_data_clips(item, path_dict, swapped_clips, visited) for item in value])
+    elif isinstance(value, dict):
+        if id(value) not in visited:
+            visited.add(id(value))
+            for key, item in list(value.items()):
+                value[key] = _swap_edit_data_clips(item, path_dict, swapped_clips, visited)
+        return value
+    elif hasattr(value, "is_blanck_clip") and hasattr(value, "filters"):
+        new_clip = _get_swapped_clip(editorstate.current_sequence(), value, path_dict, swapped_clips)
+        if new_clip != None:
+            return new_clip
+
+    return value
+
+def _swap_deferred_sequence_paths(seq, path_dict):
+    # Unbuilt sequences hold saved clip data, changing paths is enough.
+    for track in seq.tracks:
+        for clip in track.clips:
+            if clip.is_blanck_clip == False and clip.media_type != appconsts.PATTERN_PRODUCER and clip.path in path_dict:
+                clip.path = path_dict[clip.path]
+
+    # Sequence is built later in current proxy mode.
+    proxy_path_dict = {}
+    for media_file in editorstate.PROJECT().media_files.values():
+        proxy_path_dict[media_file.path] = media_file.second_file_path
+    load_file_path, proxy_mode, old_proxy_path_dict, SAVEFILE_VERSION = seq.deferred_load_data
+    seq.deferred_load_data = (load_file_path, editorstate.PROJECT().proxy_data.proxy_mode, proxy_path_dict, SAVEFILE_VERSION)
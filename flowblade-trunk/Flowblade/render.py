@@ -113,6 +113,7 @@ def get_current_gui_selections():
     selections["render_profile"] = widgets.profile_panel.out_profile_combo.widget.get_active()
     selections["render_profile_name"] = widgets.profile_panel.out_profile_combo.categories_combo.get_selected()
     selections["audio_frequency"] = widgets.encoding_panel.sample_rate_selector.widget.get_active()
+    selections["chunked_render"] = widgets.chunked_render_check.get_active()
     if widgets.args_panel.use_args_check.get_active() == True:
         if widgets.args_panel.text_buffer == None:
             buf = widgets.args_panel.opts_view.get_buffer()
@@ -153,6 +154,7 @@ def set_saved_gui_selections(selections):
             widgets.args_panel.use_args_check.set_active(True)
 
         widgets.encoding_panel.sample_rate_selector.widget.set_active(selections["audio_frequency"])
+        widgets.chunked_render_check.set_active(selections["chunked_render"])
     except:
         pass
     
@@ -205,10 +207,12 @@ def create_widgets():
     widgets.range_cb = rendergui.get_range_selection_combo()
     widgets.queue_button = Gtk.Button(label=_("To Queue"))
     widgets.queue_button.set_tooltip_text(_("Save Project in Render Queue"))
-    widgets.render_range_panel = rendergui.RenderRangePanel(widgets.range_cb)
+    widgets.chunked_render_check = Gtk.CheckButton(label=_("Chunked Parallel Render"))
+    widgets.render_range_panel = rendergui.RenderRangePanel(widgets.range_cb, widgets.chunked_render_check)
 
     # Add some tooltips
     widgets.range_cb.set_tooltip_text(_("Select render range"))
+    widgets.chunked_render_check.set_tooltip_text(_("Render range in parallel chunks and join them without re-encoding.\nChunks with unchanged contents are reused from earlier renders.\nUsed with video file renders long enough to be split, other renders are done normally."))
     widgets.render_button.set_tooltip_text(_("Begin Rendering"))
 
 def set_default_values_for_widgets(movie_name_too=False):
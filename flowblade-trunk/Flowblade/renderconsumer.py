@@ -484,8 +484,27 @@ def get_ffmpeg_opts_args_vals_tuples_list(buf):
     
     return (arg_vals, None)
 
+def get_ffmpeg_opts_args_vals_tuples_list_for_text(opts_text):
+    """
+    Same as get_ffmpeg_opts_args_vals_tuples_list() for text of saved render args file.
+    """
+    arg_vals = []
+    lines = opts_text.split("\n")
+    for i in range(0, len(lines)):
+        av_tuple, error = _parse_line_text(lines[i].strip("\r"))
+        if error != None:
+            errs_str = _("Error on line ") + str(i + 1) + ": " + error + _("\nLine contents: ") + lines[i]
+            return (None, errs_str)
+        if av_tuple != None:
+            arg_vals.append(av_tuple)
+
+    return (arg_vals, None)
+
 def _parse_line(line_start, line_end, buf):
     line = buf.get_text(line_start, line_end, include_hidden_chars=False)
+    return _parse_line_text(line)
+
+def _parse_line_text(line):
     if len(line) == 0:
         return (None, None)
     if line.find("=") == -1:
@@ -516,16 +535,26 @@ def _parse_line(line_start, line_end, buf):
 # Convenience function needed because FileRenderPlayer no longer stops on last
 # frame with 'wait_for_producer_end_stop' set True and naked producer as producer.
 # With tractor we get full length rendered and player stops correctly.
-def get_producer_as_tractor(producer, last_frame):
+def get_producer_as_tractor(producer, last_frame, first_frame=0):
     tractor = mlt.Tractor()
     multitrack = tractor.multitrack()
     track0 = mlt.Playlist(producer.profile())
     multitrack.connect(track0, 0)
-    track0.insert(producer, 0, 0, last_frame)
+    track0.insert(producer, 0, first_frame, last_frame)
     return tractor
             
 
+# MLT Python bindings cannot register Python listeners for consumer events, so render end is detected
+# by following producer and consumer state. Poll interval is short because checks are cheap
+# and it sets latency for every render end.
+RENDER_POLL_INTERVAL = 0.02
+
+
 class FileRenderPlayer(threading.Thread):
+    """
+    Renders producer range with consumer. Callsites can block on wait_for_start() and
+    wait_for_stop() instead of polling 'has_started_running' and 'stopped' flags.
+    """
     def __init__(self, file_name, producer, consumer, start_frame, stop_frame):
         self.file_name = file_name
         self.producer = producer
@@ -539,6 +568,9 @@ class FileRenderPlayer(threading.Thread):
         self.do_consumer_position_wait = True
         print("FileRenderPlayer started, start frame: " + str(self.start_frame) + ", stop frame: " + str(self.stop_frame))
         self.consumer_pos_stop_add = 1 # HACK!!! File renders work then this is one, screenshot render requires this to be 2 to work 
+        self.started_event = threading.Event()
+        self.stopped_event = threading.Event()
+        self.shutdown_event = threading.Event()
         threading.Thread.__init__(self)
 
     def run(self):
@@ -547,6 +579,7 @@ class FileRenderPlayer(threading.Thread):
         
         self.running = True
         self.has_started_running = True
+        self.started_event.set()
         self.connect_and_start()
 
         while self.running: # set false at shutdown() for abort
@@ -556,10 +589,10 @@ class FileRenderPlayer(threading.Thread):
                 # Used when producer out frame is last frame.
                 if self.wait_for_producer_end_stop:
 
-                    while self.producer.get_speed() > 0:
-                        time.sleep(0.2)
-                    while not self.consumer.is_stopped():
-                        time.sleep(0.2)
+                    while self.producer.get_speed() > 0 and self._wait_poll_interval():
+                        pass
+                    while not self.consumer.is_stopped() and self._wait_poll_interval():
+                        pass
                     
                 # This method of stopping stops producer
                 # and waits for consumer to reach that frame.
@@ -568,23 +601,42 @@ class FileRenderPlayer(threading.Thread):
                     self.producer.set_speed(0)
                     last_frame = self.producer.frame()
                     if self.do_consumer_position_wait == True:
-                        while self.consumer.position() + self.consumer_pos_stop_add < last_frame:
-                            time.sleep(0.2)
+                        while self.consumer.position() + self.consumer_pos_stop_add < last_frame and self._wait_poll_interval():
+                            pass
 
                     self.consumer.stop()
                                         
                 self.running = False
-
-            time.sleep(0.1)
+            else:
+                self._wait_poll_interval()
 
         print("FileRenderPlayer stopped, producer frame: " + str(self.producer.frame()))
 
         self.stopped = True
-                
+        self.stopped_event.set()
+
+    def _wait_poll_interval(self):
+        # Returns False if shutdown() has been called.
+        return not self.shutdown_event.wait(RENDER_POLL_INTERVAL)
+
+    def wait_for_start(self, timeout=None):
+        """
+        Blocks until render has started, returns False on timeout.
+        """
+        return self.started_event.wait(timeout)
+
+    def wait_for_stop(self, timeout=None):
+        """
+        Blocks until render has stopped, returns False on timeout.
+        Callsites doing progress updates can use this in place of sleeping between updates.
+        """
+        return self.stopped_event.wait(timeout)
+
     def shutdown(self):
         self.consumer.stop()
         self.producer.set_speed(0)
         self.running = False
+        self.shutdown_event.set()
 
     def connect_and_start(self):
         self.consumer.connect(self.producer)
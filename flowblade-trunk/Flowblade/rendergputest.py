@@ -202,11 +202,8 @@ class GPUTestRenderThread(threading.Thread):
 
         # Make sure that render thread is actually running before
         # testing render_thread.running value later
-        while render_thread.has_started_running == False:
-            time.sleep(0.05)
-
-        while render_thread.running != False:
-            time.sleep(0.1)
+        render_thread.wait_for_start()
+        render_thread.wait_for_stop()
 
         end = time.time()
         print("render time:", str(end - start))
@@ -708,9 +708,10 @@ class RenderFilePanel():
 
 class RenderRangePanel():
     
-    def __init__(self, range_selector):
+    def __init__(self, range_selector, chunked_render_check):
         self.vbox = Gtk.VBox(False, 2)
         self.vbox.pack_start(range_selector, False, False, 0)
+        self.vbox.pack_start(guiutils.get_left_justified_box([chunked_render_check]), False, False, 0)
 
 
 class RenderProfilePanel():
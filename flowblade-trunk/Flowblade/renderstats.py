@@ -0,0 +1,281 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module records render throughput statistics and displays them for comparison.
+
+Statistics of a completed render are written next to rendered file and appended
+into render statistics history in user data folder.
+
+CPU time and peak memory are measured for the rendering process. Peak memory is
+the largest resident memory sampled during the render, on systems without /proc
+it is peak memory of the process lifetime. MLT does not
+expose decode, filter and encode times separately, so these are not recorded.
+Batch renders running in parallel share the process and their CPU and memory
+figures cover all renders running at the same time.
+"""
+
+from gi.repository import GObject, Gtk, Pango
+
+import datetime
+import json
+import multiprocessing
+import os
+import resource
+import time
+
+import atomicfile
+import dialogutils
+import guiutils
+import userfolders
+import utils
+
+STATS_FILE_EXTENSION = ".renderstats.json"
+HISTORY_FILE = "render_stats_history.json"
+MAX_HISTORY_ITEMS = 500
+
+SAMPLE_INTERVAL = 1.0 # seconds
+
+
+# ------------------------------------------------------------- recording
+class RenderStatsRecorder:
+    """
+    Call start() when render starts, sample() from render progress update loop
+    and render_completed() when render has reached end.
+    """
+    def __init__(self, render_path, args_vals_list, profile_desc, filters_summary):
+        self.render_path = render_path
+        self.args_vals_list = args_vals_list
+        self.profile_desc = profile_desc
+        self.filters_summary = filters_summary
+        self.throughput = [] # frames rendered during each SAMPLE_INTERVAL.
+
+    def start(self):
+        self.start_time = time.monotonic()
+        self.start_cpu_time = _get_cpu_time()
+        self.last_sample_time = self.start_time
+        self.last_sample_frames = 0
+        self.peak_rss_kb = _get_current_rss_kb()
+
+    def sample(self, rendered_frames):
+        now = time.monotonic()
+        if now - self.last_sample_time < SAMPLE_INTERVAL:
+            return
+
+        fps = (rendered_frames - self.last_sample_frames) / (now - self.last_sample_time)
+        self.throughput.append(round(fps, 2))
+        self.last_sample_time = now
+        self.last_sample_frames = rendered_frames
+        self.peak_rss_kb = max(self.peak_rss_kb, _get_current_rss_kb())
+
+    def render_completed(self, rendered_frames):
+        """
+        Writes statistics file next to rendered file and adds statistics to history.
+        """
+        render_seconds = time.monotonic() - self.start_time
+        cpu_seconds = _get_cpu_time() - self.start_cpu_time
+        cpu_count = multiprocessing.cpu_count()
+
+        stats = {}
+        stats["date"] = datetime.datetime.now().isoformat(timespec="seconds")
+        stats["render_path"] = self.render_path
+        stats["profile"] = self.profile_desc
+        stats["args"] = dict(self.args_vals_list)
+        stats["frames"] = rendered_frames
+        stats["render_seconds"] = round(render_seconds, 2)
+        stats["average_fps"] = round(rendered_frames / max(render_seconds, 0.001), 2)
+        if len(self.throughput) > 0:
+            stats["min_fps"] = min(self.throughput)
+            stats["max_fps"] = max(self.throughput)
+        else:
+            stats["min_fps"] = stats["average_fps"]
+            stats["max_fps"] = stats["average_fps"]
+        stats["throughput"] = self.throughput
+        stats["cpu_seconds"] = round(cpu_seconds, 2)
+        stats["cpu_count"] = cpu_count
+        stats["cpu_utilisation"] = round(100.0 * cpu_seconds / max(render_seconds, 0.001) / cpu_count, 1)
+        self.peak_rss_kb = max(self.peak_rss_kb, _get_current_rss_kb())
+        stats["peak_rss_mb"] = round(self.peak_rss_kb / 1024.0, 1)
+        stats["filters"] = self.filters_summary
+
+        _write_stats_file(self.render_path, stats)
+        _add_to_history(stats)
+
+        return stats
+
+
+def get_sequence_filters_summary(seq):
+    """
+    Returns dict of filter service id -> count for active filters on sequence clips
+    and compositor service id -> count for compositors.
+    """
+    summary = {}
+    for track in seq.tracks:
+        for clip in track.clips:
+            if clip.is_blanck_clip == True:
+                continue
+            for f in clip.filters:
+                if f.active == False:
+                    continue
+                service_id = str(f.info.mlt_service_id)
+                summary[service_id] = summary.get(service_id, 0) + 1
+    for compositor in seq.compositors:
+        service_id = str(compositor.transition.info.mlt_service_id)
+        summary[service_id] = summary.get(service_id, 0) + 1
+    return summary
+
+def load_history():
+    try:
+        with open(_get_history_path(), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+# ------------------------------------------------------------- module functions
+def _get_cpu_time():
+    # Includes all threads of the process, MLT encoders and filters run in their own threads.
+    times = os.times()
+    return times.user + times.system
+
+def _get_current_rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    # ru_maxrss is peak of the process lifetime, in kB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _get_history_path():
+    return userfolders.get_data_dir() + HISTORY_FILE
+
+def _write_stats_file(render_path, stats):
+    try:
+        with atomicfile.AtomicFileWriter(render_path + STATS_FILE_EXTENSION, "w") as afw:
+            json.dump(stats, afw.get_file(), indent=4)
+    except Exception as e:
+        print("Writing render statistics file failed:", e)
+
+def _add_to_history(stats):
+    history = load_history()
+    history.append(stats)
+    history = history[-MAX_HISTORY_ITEMS:]
+    try:
+        with atomicfile.AtomicFileWriter(_get_history_path(), "w") as afw:
+            json.dump(history, afw.get_file())
+    except Exception as e:
+        print("Writing render statistics history failed:", e)
+
+
+# ------------------------------------------------------------- GUI
+def show_render_stats_dialog():
+    dialog = Gtk.Dialog(_("Render Statistics"), None,
+                    Gtk.DialogFlags.MODAL | Gtk.DialogFlags.DESTROY_WITH_PARENT,
+                    (_("Close"), Gtk.ResponseType.CLOSE))
+
+    stats_view = RenderStatsView()
+    stats_view.fill_data_model(load_history())
+    stats_view.set_size_request(1000, 400)
+
+    info_label = Gtk.Label()
+    info_label.set_markup("<small>" + _("Click column headers to sort renders. CPU % is relative to all processor cores.") + "</small>")
+    info_label.set_margin_top(8)
+
+    pane = Gtk.VBox(False, 2)
+    pane.pack_start(stats_view, True, True, 0)
+    pane.pack_start(guiutils.get_left_justified_box([info_label]), False, False, 0)
+    guiutils.set_margins(pane, 12, 12, 12, 12)
+
+    dialog.connect('response', dialogutils.dialog_destroy)
+
+    dialog.vbox.pack_start(pane, True, True, 0)
+    dialogutils.set_outer_margins(dialog.vbox)
+    dialogutils.default_behaviour(dialog)
+    dialog.show_all()
+    return dialog
+
+
+class RenderStatsView(Gtk.VBox):
+
+    # Numeric columns are sorted using hidden float columns that follow display columns.
+    NUMERIC_COLUMNS = [4, 5, 6, 7, 8, 9]
+
+    def __init__(self):
+        GObject.GObject.__init__(self)
+
+        self.columns = [_("Date"), _("File"), _("Video Codec"), _("Audio Codec"), _("Frames"), _("Time"),
+                        _("Avg FPS"), _("Min FPS"), _("CPU %"), _("Peak Memory"), _("Filters")]
+        column_types = [str] * len(self.columns) + [float] * len(self.NUMERIC_COLUMNS)
+        self.storemodel = Gtk.ListStore(*column_types)
+
+        self.scroll = Gtk.ScrolledWindow()
+        self.scroll.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+
+        self.treeview = Gtk.TreeView(model=self.storemodel)
+        self.treeview.set_headers_visible(True)
+
+        for i in range(0, len(self.columns)):
+            text_rend = Gtk.CellRendererText()
+            text_rend.set_property("ellipsize", Pango.EllipsizeMode.END)
+            column = Gtk.TreeViewColumn(self.columns[i])
+            column.pack_start(text_rend, True)
+            column.add_attribute(text_rend, "text", i)
+            column.set_resizable(True)
+            if i in self.NUMERIC_COLUMNS:
+                column.set_sort_column_id(len(self.columns) + self.NUMERIC_COLUMNS.index(i))
+            else:
+                column.set_sort_column_id(i)
+            if i == 1 or i == 10:
+                column.set_expand(True)
+                column.set_min_width(150)
+            self.treeview.append_column(column)
+
+        self.scroll.add(self.treeview)
+        frame = Gtk.Frame()
+        frame.add(self.scroll)
+        self.pack_start(frame, True, True, 0)
+
+    def fill_data_model(self, history):
+        self.storemodel.clear()
+        for stats in reversed(history):
+            try:
+                args = stats["args"]
+                filters = sorted(stats["filters"].items(), key=lambda item: -item[1])
+                filters_str = ", ".join([service_id + " x" + str(count) for service_id, count in filters])
+                row = [ stats["date"].replace("T", " "),
+                        os.path.basename(stats["render_path"]),
+                        str(args.get("vcodec", "-")),
+                        str(args.get("acodec", "-")),
+                        str(stats["frames"]),
+                        utils.get_time_str_for_sec_float(stats["render_seconds"]),
+                        str(stats["average_fps"]),
+                        str(stats["min_fps"]),
+                        str(stats["cpu_utilisation"]),
+                        str(stats["peak_rss_mb"]) + " MB",
+                        filters_str]
+                row += [float(stats["frames"]), float(stats["render_seconds"]), float(stats["average_fps"]),
+                        float(stats["min_fps"]), float(stats["cpu_utilisation"]), float(stats["peak_rss_mb"])]
+                self.storemodel.append(row)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                # Skip entries written by other versions.
+                pass
@@ -0,0 +1,161 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module provides cache of rendered timeline segments for chunked renders.
+
+Segment files are named by hash of everything that affects segment contents: encoding
+settings, profile, sequence master audio and watermark, tracks and clips, filters and
+compositors overlapping the segment and identities of used media files. Clip and compositor positions are hashed relative
+to segment start, so segments are reused on re-export as long as their contents have
+not changed.
+
+Segments are rendered into temporary files that are moved into place when complete,
+so files with cache names are always complete segments.
+"""
+
+import hashlib
+import os
+
+import appconsts
+import projectfile
+import userfolders
+
+SEGMENT_CACHE_VERSION = "1" # Change to invalidate all cached segments when rendering changes.
+
+# These attributes do not affect rendered frames, or are MLT objects that only exist
+# in live sequences. Mute filters are hashed as flags.
+NOT_HASHED_ATTRS = ["id", "name", "selected", "markers", "color", "waveform_data", "sync_data",
+                    "titler_data", "origin_clip_id", "destroy_id", "mark_in", "mark_out", "type",
+                    "this", "thisown", "clip_length", "mute_filter", "mlt_filter", "mlt_filters",
+                    "mlt_transition", "planted", "compositor_index", "obey_autofollow"]
+HASHED_TRACK_ATTRS = ["id", "type", "mute_state", "audio_gain", "audio_pan"]
+
+MAX_HASH_DEPTH = 12
+
+
+# ------------------------------------------------------ interface
+def get_segment_hashes(project_path, segment_ranges, args_vals_list, profile_desc, file_extension):
+    """
+    Returns list of content hashes for given (range_in, range_out) segments of current
+    sequence in saved project file, or None if project file could not be read.
+    """
+    try:
+        project = projectfile.read_project_sections(project_path, [projectfile.SEQUENCE], current_sequence_only=True)
+    except Exception as e:
+        print("segmentcache.get_segment_hashes, reading project failed:", e)
+        return None
+
+    return get_sequence_segment_hashes(project.sequences[0], segment_ranges, args_vals_list, profile_desc, file_extension)
+
+def get_sequence_segment_hashes(seq, segment_ranges, args_vals_list, profile_desc, file_extension):
+    """
+    Returns list of content hashes for given (range_in, range_out) segments of sequence.
+    Sequence can be a live sequence or one read from project file.
+    """
+    # Sequence level rendered state: compositing mode, master audio filters on tractor and watermark.
+    render_key = [SEGMENT_CACHE_VERSION, args_vals_list, profile_desc, file_extension.lower(),
+                  getattr(seq, "compositing_mode", None), len(seq.tracks),
+                  getattr(seq, "master_audio_gain", None), getattr(seq, "master_audio_pan", None)]
+    watermark_path = getattr(seq, "watermark_file_path", None)
+    if watermark_path != None:
+        render_key.append(_get_file_identity(watermark_path))
+    render_key_str = _get_hash_str(render_key, 0)
+
+    # Clip timeline positions are computed once for all segments.
+    tracks_clips = []
+    for track in seq.tracks:
+        clips = []
+        clip_start = 0
+        for clip in track.clips:
+            clip_length = clip.clip_out - clip.clip_in + 1
+            clips.append((clip_start, clip_start + clip_length - 1, clip))
+            clip_start += clip_length
+        tracks_clips.append(clips)
+
+    hashes = []
+    for range_in, range_out in segment_ranges:
+        md5 = hashlib.md5()
+        md5.update(render_key_str.encode("utf-8"))
+        md5.update(str(range_out - range_in).encode("utf-8"))
+
+        for i in range(0, len(seq.tracks)):
+            track = seq.tracks[i]
+            track_data = [getattr(track, attr, None) for attr in HASHED_TRACK_ATTRS]
+            md5.update(_get_hash_str(track_data, 0).encode("utf-8"))
+
+            for clip_start, clip_end, clip in tracks_clips[i]:
+                if clip_end < range_in or clip_start > range_out:
+                    continue
+                clip_data = [clip_start - range_in, clip, getattr(clip, "mute_filter", None) != None]
+                clip_path = getattr(clip, "path", None)
+                if clip_path != None and getattr(clip, "is_blanck_clip", False) == False:
+                    clip_data.append(_get_file_identity(clip_path))
+                md5.update(_get_hash_str(clip_data, 0).encode("utf-8"))
+
+        for compositor in seq.compositors:
+            if compositor.clip_out < range_in or compositor.clip_in > range_out:
+                continue
+            compositor_data = [compositor.clip_in - range_in, compositor.clip_out - range_in, compositor]
+            md5.update(_get_hash_str(compositor_data, 0).encode("utf-8"))
+
+        hashes.append(md5.hexdigest())
+
+    return hashes
+
+def get_segment_path(segment_hash, file_extension):
+    return get_cache_folder() + segment_hash + file_extension
+
+def get_cache_folder():
+    folder = userfolders.get_cache_dir() + appconsts.RENDER_SEGMENTS_DIR + "/"
+    if not os.path.isdir(folder):
+        os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+# ------------------------------------------------------ module functions
+def _get_file_identity(path):
+    try:
+        stat = os.stat(path)
+        return (path, stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return (path, None)
+
+def _get_hash_str(value, depth):
+    if depth > MAX_HASH_DEPTH:
+        return ""
+
+    if value == None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join([_get_hash_str(item, depth + 1) for item in value]) + "]"
+    if isinstance(value, dict):
+        items = sorted([(repr(k), _get_hash_str(v, depth + 1)) for k, v in value.items()])
+        return "{" + ",".join([k + ":" + v for k, v in items]) + "}"
+    if hasattr(value, "__dict__"):
+        items = []
+        for attr in sorted(value.__dict__.keys()):
+            attr_value = value.__dict__[attr]
+            if attr in NOT_HASHED_ATTRS or callable(attr_value):
+                continue
+            items.append(attr + ":" + _get_hash_str(attr_value, depth + 1))
+        return type(value).__name__ + "(" + ",".join(items) + ")"
+
+    return repr(value)
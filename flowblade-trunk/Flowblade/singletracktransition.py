@@ -710,7 +710,7 @@ class ReRenderRunnerThread(threading.Thread):
             
             item_render_ongoing = True
             while item_render_ongoing:
-                time.sleep(0.33)
+                self.rerender_window.renderer.wait_for_stop(0.33)
                 
                 self.rerender_window.update_fraction()
                 
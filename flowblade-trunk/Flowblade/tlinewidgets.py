@@ -334,7 +334,10 @@ fake_current_frame = None
 # Used to draw indicators that tell if more frames are available while trimming.
 trim_status = appconsts.ON_BETWEEN_FRAME
 
-# Dict for clip thumbnails path -> image.
+# Dict for clip media files path -> media file, clip thumbnails are media file icons.
+clip_media_files = {}
+
+# Dict for clip thumbnails path -> image, for container clips without media file.
 clip_thumbnails = {}
 
 
@@ -407,9 +410,32 @@ def load_icons_and_set_colors():
     FRAME_SCALE_LINES = (0.5, 0.5, 0.5)
 
 def update_clip_thumbnail(media_file):
-    global clip_thumbnails
+    global clip_media_files
+
+    clip_media_files[media_file.path] = media_file
+
+def _get_clip_thumbnail(clip):
+    try:
+        return clip_media_files[clip.path].icon
+    except KeyError:
+        pass
+
+    try:
+        return clip_thumbnails[clip.path]
+    except KeyError:
+        pass
+    
+    media_file = PROJECT().get_media_file_for_path(clip.path)
+    if media_file != None:
+        clip_media_files[clip.path] = media_file
+        return media_file.icon
 
-    clip_thumbnails[media_file.path] = media_file.icon
+    if clip.container_data != None:
+        thumb_img = clip.container_data.get_rendered_thumbnail()
+        clip_thumbnails[clip.path] = thumb_img
+        return thumb_img
+
+    return None # This happens for rendered fades and transitions.
 
 def set_tracks_double_height_consts():
     global ID_PAD_Y_HIGH, ID_PAD_Y, ID_PAD_Y_SMALL, MUTE_ICON_POS, MUTE_ICON_POS_NORMAL, \
@@ -1737,8 +1763,6 @@ class TimeLineCanvas:
 
         proxy_paths = current_proxy_media_paths()
 
-        global clip_thumbnails
-                
         # Draw clips in draw range
         for i in range(start, end):
 
@@ -1917,30 +1941,14 @@ class TimeLineCanvas:
                     text_x_add = 115
                     cr.save()
                     try: # paint thumbnail
-                        thumb_img = clip_thumbnails[clip.path]
-                        self.create_round_rect_path(cr, scale_in + 5, y + 4.5, scale_length - 10, track_height - 8, 3.0)
-                        cr.clip()
-                        cr.set_source_surface(thumb_img,scale_in, y - 20)
-                        cr.paint()
-                    except: # thumbnail not found  in dict, get it and  paint it.
-                        try:
-                            if clip.container_data == None:
-                                media_file = PROJECT().get_media_file_for_path(clip.path)
-                                thumb_img = media_file.icon
-                            else:
-                                media_file = PROJECT().get_media_file_for_path(clip.path)
-                                if media_file != None:
-                                    thumb_img = media_file.icon
-                                else:
-                                    thumb_img = clip.container_data.get_rendered_thumbnail()
-
-                            cr.rectangle(scale_in + 4, y + 3.5, scale_length - 8, track_height - 6)
+                        thumb_img = _get_clip_thumbnail(clip)
+                        if thumb_img != None:
+                            self.create_round_rect_path(cr, scale_in + 5, y + 4.5, scale_length - 10, track_height - 8, 3.0)
                             cr.clip()
-                            cr.set_source_surface(thumb_img, scale_in, y - 20)
+                            cr.set_source_surface(thumb_img,scale_in, y - 20)
                             cr.paint()
-                            clip_thumbnails[clip.path] = thumb_img
-                        except:
-                            pass # This fails for rendered fades and transitions.
+                    except:
+                        pass
                     
                     if clip.selected:
                         if scale_length - 8 < appconsts.THUMB_WIDTH:
@@ -31,13 +31,16 @@ try:
 except:
     import mlt
 import hashlib
+import json
 import locale
+import multiprocessing
 import os
 from os import listdir
 from os.path import isfile, join
 from gi.repository import Pango
 import pickle
 import shutil
+import socket
 import subprocess
 import sys
 import textwrap
@@ -47,6 +50,7 @@ import unicodedata
 
 import atomicfile
 import appconsts
+import chunkrender
 import dialogutils
 import editorstate
 import editorpersistance
@@ -58,6 +62,7 @@ import processutils
 import persistance
 import respaths
 import renderconsumer
+import renderstats
 import toolguicomponents
 import translations
 import userfolders
@@ -67,6 +72,9 @@ import utils
 BATCH_DIR = "batchrender/"
 DATAFILES_DIR = "batchrender/datafiles/"
 PROJECTS_DIR = "batchrender/projects/"
+SPOOL_DATAFILES_DIR = "datafiles/"
+SPOOL_PROJECTS_DIR = "projects/"
+SPOOL_CLAIMS_DIR = "claims/"
 
 PID_FILE = "batchrenderingpid"
 
@@ -83,12 +91,30 @@ RENDERING = 1
 RENDERED = 2
 UNQUEUED = 3
 ABORTED = 4
+FAILED = 5
+
+# Values for parallel renders limit preference, 0 == from CPU count.
+PARALLEL_RENDERS_LIMITS = [0, 1, 2, 3, 4, 6, 8]
+CPU_CORES_PER_RENDER = 8 # Encoders are multithreaded, so one render per core would overcommit memory and caches.
+
+# Memory estimate for admitting a render when others are running, see memory_available_for_render().
+RENDER_BASE_MEMORY = 300 * 1024 * 1024
+RENDER_BUFFERED_FRAMES = 100
+# Seconds a started render is given to allocate its memory before next render is admitted,
+# available memory does not yet show memory of renders that were just started.
+RENDER_MEMORY_SETTLE_TIME = 10.0
+
+# Render item claims, see claim_item().
+CLAIM_HEARTBEAT_INTERVAL = 5.0 # seconds
+CLAIM_STALE_TIME = 60.0 # seconds without heartbeat after which claiming renderer is assumed dead
 
 render_queue = []
 _batch_render_app = None
 batch_window = None
 render_thread = None
 queue_runner_thread = None
+_render_fractions = {} # render item identifier -> render fraction for items being rendered
+_spool_dir = None # Batch render folder in user cache is used if not set.
 
 timeout_id = None
 
@@ -106,100 +132,158 @@ single_render_thread = None
 
 # -------------------------------------------------------- render thread
 class QueueRunnerThread(threading.Thread):
+    """
+    Renders queued items, several at once if parallel renders limit and
+    available memory allow it. Each item has its own FileRenderPlayer and MLT consumer.
+
+    Items are claimed before rendering, items claimed by render workers are skipped.
+    """
     def __init__(self):
         threading.Thread.__init__(self)
+        self.active_renders = []
+        self.stats_recorders = {} # render item identifier -> renderstats.RenderStatsRecorder
+        self.worker_name = get_worker_name()
+        self.last_heartbeat = 0.0
+        self.last_render_start = 0.0
     
     def run(self):        
         self.running = True
+        self.aborted = False
         items = 0
         global render_queue, batch_window
-        for render_item in render_queue.queue:
-            if self.running == False:
-                break
-            if render_item.render_this_item == False:
-                continue
-            
-            current_render_time = 0
-
-            # Create render objects
-            identifier = render_item.generate_identifier()
-            project_file_path = get_projects_dir() + identifier + ".flb"
-            persistance.show_messages = False
-
-            project = persistance.load_project(project_file_path, False)
+        queued_items = list(render_queue.queue)
+        parallel_limit = get_parallel_renders_limit()
+
+        while self.running == True:
+            # Start renders while there is capacity, first item is always started.
+            # Renders are admitted one at a time with memory checked after the previous one has settled.
+            while (len(queued_items) > 0 and len(self.active_renders) < parallel_limit
+                   and self.running == True):
+                if queued_items[0].render_this_item == False:
+                    queued_items.pop(0)
+                    continue
+                if len(self.active_renders) > 0 and (render_memory_settling(self.last_render_start)
+                                                     or not memory_available_for_render(queued_items[0])):
+                    break
+                render_item = queued_items.pop(0)
+                active_render = self._start_item_render(render_item)
+                if active_render != None:
+                    self.active_renders.append(active_render)
+                    self.last_render_start = time.monotonic()
 
-            project.c_seq.fix_v1_for_render()
+            if len(self.active_renders) == 0 and len(queued_items) == 0:
+                break
 
-            maybe_create_render_folder(render_item.render_path)
-        
-            producer = project.c_seq.tractor
-            profile = mltprofiles.get_profile(render_item.render_data.profile_name)
-            consumer = renderconsumer.get_mlt_render_consumer(render_item.render_path, 
-                                                              profile,
-                                                              render_item.args_vals_list)
+            heartbeat = (time.monotonic() - self.last_heartbeat > CLAIM_HEARTBEAT_INTERVAL)
+            if heartbeat == True:
+                self.last_heartbeat = time.monotonic()
 
-            # Get render range
-            start_frame, end_frame, wait_for_stop_render = get_render_range(render_item)
-            
-            # Create and launch render thread
-            global render_thread 
-            render_thread = renderconsumer.FileRenderPlayer(None, producer, consumer, start_frame, end_frame) # None == file name not needed this time when using FileRenderPlayer because callsite keeps track of things
-            render_thread.wait_for_producer_end_stop = wait_for_stop_render
-            render_thread.start()
-
-            # Set render start time and item state
-            render_item.render_started()
-
-            GLib.idle_add(self._render_start_update, render_item)
-
-            # Make sure that render thread is actually running before
-            # testing render_thread.running value later
-            while render_thread.has_started_running == False:
-                time.sleep(0.05)
-
-            # View update loop
-            self.thread_running = True
-            self.aborted = False
-            while self.thread_running:
-                if self.aborted == True:
-                    break        
-                render_fraction = render_thread.get_render_fraction()
-                now = time.time()
-                current_render_time = now - render_item.start_time
-    
-                GLib.idle_add(self._render_progress_update, render_fraction, items, render_item.get_display_name(), current_render_time)
-                
+            for active_render in list(self.active_renders):
+                render_item, render_thread = active_render
+                identifier = render_item.generate_identifier()
+                _render_fractions[identifier] = render_thread.get_render_fraction()
+                self.stats_recorders[identifier].sample(render_thread.producer.frame() - render_thread.start_frame)
                 if render_thread.running == False: # Rendering has reached end
-                    self.thread_running = False
-                    
-                    GLib.idle_add(self._progress_bar_update, 1.0)
-                                    
+                    render_thread.shutdown()
+                    stats_recorder = self.stats_recorders.pop(identifier)
+                    stats_recorder.render_completed(render_thread.stop_frame - render_thread.start_frame + 1)
                     render_item.render_completed()
-                else:
-                    time.sleep(0.33)
-                    
-            if not self.aborted:
-                items = items + 1
-                GLib.idle_add(self._render_progress_update, 0, items, render_item.get_display_name(), 0)
+                    release_claim(identifier, self.worker_name)
+                    _render_fractions.pop(identifier, None)
+                    self.active_renders.remove(active_render)
+                    items = items + 1
+                elif heartbeat == True and update_claim(identifier, self.worker_name, _render_fractions[identifier]) == False:
+                    # Claim was taken over after a stall, item is now rendered elsewhere.
+                    print("Batch render item " + render_item.get_display_name() + " claim lost, render stopped.")
+                    render_thread.shutdown()
+                    self.stats_recorders.pop(identifier)
+                    _render_fractions.pop(identifier, None)
+                    self.active_renders.remove(active_render)
+
+            self._show_progress(items)
+            if len(self.active_renders) > 0:
+                # Oldest render usually ends first, continue as soon as it does.
+                self.active_renders[0][1].wait_for_stop(0.33)
             else:
-                if render_item != None:
-                    render_item.render_aborted()
-                    break
-            render_thread.shutdown()
+                time.sleep(0.33)
+
+        if self.aborted == True:
+            for render_item, render_thread in self.active_renders:
+                render_thread.shutdown()
+                render_item.render_aborted()
+                release_claim(render_item.generate_identifier(), self.worker_name)
+            self.active_renders = []
+            self.stats_recorders = {}
+        _render_fractions.clear()
         
         # Update view for render end
         GLib.idle_add(self._queue_done_update)
 
-    def _render_start_update(self, render_item):
-        batch_window.update_queue_view()
-        batch_window.current_render.set_text("  " + render_item.get_display_name())
-        batch_window.current_file.set_text("  " +  os.path.basename(render_item.render_path))
+    def _start_item_render(self, render_item):
+        identifier = render_item.generate_identifier()
+        if claim_item(identifier, self.worker_name) == False:
+            return None # Render worker is rendering item.
+
+        # Render worker may have rendered item after queue was loaded.
+        spool_item = load_spool_render_item(identifier)
+        if spool_item == None or spool_item.render_this_item == False or spool_item.status in [RENDERED, FAILED]:
+            release_claim(identifier, self.worker_name)
+            if spool_item != None:
+                render_item.status = spool_item.status
+                render_item.render_this_item = spool_item.render_this_item
+                render_item.render_time = spool_item.render_time
+            GLib.idle_add(self._render_start_update)
+            return None
+
+        try:
+            render_thread, stats_recorder = start_item_render(render_item)
+        except Exception as e:
+            print("Batch render item " + render_item.get_display_name() + " failed to start:", e)
+            render_item.render_failed(str(e))
+            release_claim(identifier, self.worker_name)
+            GLib.idle_add(self._render_start_update)
+            return None
 
-    def _render_progress_update(self, render_fraction, items, display_time, current_render_time):
-        batch_window.update_render_progress(render_fraction, items, display_time, current_render_time)
+        self.stats_recorders[identifier] = stats_recorder
+        _render_fractions[identifier] = 0.0
 
-    def _progress_bar_update(self, fraction):
-        batch_window.render_progress_bar.set_fraction(fraction)
+        GLib.idle_add(self._render_start_update)
+
+        return (render_item, render_thread)
+
+    def _show_progress(self, items):
+        if len(self.active_renders) == 0:
+            GLib.idle_add(self._render_progress_update, 0, items, [], 0)
+            return
+        
+        # Progress bar displays the render that is estimated to finish last.
+        now = time.time()
+        display_fraction = 0
+        display_render_time = 0
+        longest_left = -1
+        for render_item, render_thread in self.active_renders:
+            render_fraction = render_thread.get_render_fraction()
+            current_render_time = now - render_item.start_time
+            if render_fraction > 0:
+                time_left = (1.0 / render_fraction) * current_render_time - current_render_time
+            else:
+                time_left = float("inf")
+            if time_left > longest_left:
+                longest_left = time_left
+                display_fraction = render_fraction
+                display_render_time = current_render_time
+
+        active_items = [render_item for render_item, render_thread in self.active_renders]
+        GLib.idle_add(self._render_progress_update, display_fraction, items, active_items, display_render_time)
+
+    def _render_start_update(self):
+        batch_window.update_queue_view()
+
+    def _render_progress_update(self, render_fraction, items, active_items, current_render_time):
+        batch_window.current_render.set_text("  " + ", ".join([render_item.get_display_name() for render_item in active_items]))
+        batch_window.current_file.set_text("  " + ", ".join([os.path.basename(render_item.render_path) for render_item in active_items]))
+        batch_window.update_render_progress(render_fraction, items, None, current_render_time)
+        batch_window.queue_view.update_statuses(render_queue)
 
     def _queue_done_update(self):
         # Update view for render end
@@ -207,15 +291,56 @@ class QueueRunnerThread(threading.Thread):
         batch_window.render_queue_stopped()
         
     def abort(self):
-        render_thread.shutdown()
-        # It may be that 'aborted' and 'running' could combined into single flag, but whatevaar
+        # Active renders are shut down and set aborted by render thread when it exits its loop.
         self.aborted = True
         self.running = False
-        self.thread_running = False
         
         batch_window.reload_queue() # item may have added to queue while rendering
 
 
+def start_item_render(render_item):
+    """
+    Starts rendering claimed render item and returns (render_thread, stats_recorder).
+    Raises exception if render could not be started.
+    """
+    # Projects are loaded one at a time because persistance uses module state.
+    persistance.show_messages = False
+    project = persistance.load_project(render_item.get_project_filepath(), False, current_sequence_only=True)
+
+    project.c_seq.fix_v1_for_render()
+
+    maybe_create_render_folder(render_item.render_path)
+
+    producer = project.c_seq.tractor
+    profile = mltprofiles.get_profile(render_item.render_data.profile_name)
+    consumer = renderconsumer.get_mlt_render_consumer(render_item.render_path, 
+                                                      profile,
+                                                      render_item.args_vals_list)
+
+    # Get render range
+    start_frame, end_frame, wait_for_stop_render = get_render_range(render_item)
+    
+    # Create and launch render thread
+    render_thread = renderconsumer.FileRenderPlayer(None, producer, consumer, start_frame, end_frame) # None == file name not needed this time when using FileRenderPlayer because callsite keeps track of things
+    render_thread.wait_for_producer_end_stop = wait_for_stop_render
+    render_thread.start()
+
+    stats_recorder = renderstats.RenderStatsRecorder(render_item.render_path, render_item.args_vals_list,
+                                                     render_item.render_data.profile_name,
+                                                     renderstats.get_sequence_filters_summary(project.c_seq))
+    stats_recorder.start()
+
+    # Set render start time and item state, item file tells other renderers and batch render app that item is being rendered.
+    render_item.render_started()
+    render_item.save()
+
+    # Make sure that render thread is actually running before
+    # testing render_thread.running value later
+    render_thread.wait_for_start()
+
+    return (render_thread, stats_recorder)
+
+
 class BatchRenderIPC():
     def __init__(self):
         self.polling_thread = None
@@ -314,20 +439,39 @@ def add_render_item(flowblade_project, render_path, args_vals_list, mark_in, mar
 
 # ------------------------------------------------------- file utils
 def init_dirs_if_needed():
-    user_dir = userfolders.get_cache_dir()
-
-    if not os.path.exists(user_dir + BATCH_DIR):
-        os.mkdir(user_dir + BATCH_DIR)
+    if not os.path.exists(get_spool_dir()):
+        os.makedirs(get_spool_dir(), exist_ok=True)
     if not os.path.exists(get_datafiles_dir()):
         os.mkdir(get_datafiles_dir())
     if not os.path.exists(get_projects_dir()):
         os.mkdir(get_projects_dir())
+    if not os.path.exists(get_claims_dir()):
+        os.mkdir(get_claims_dir())
+
+def set_spool_dir(spool_dir):
+    # Render workers can be pointed to batch render folder of another user or machine.
+    global _spool_dir
+    _spool_dir = spool_dir.rstrip("/") + "/"
+
+def get_spool_dir():
+    if _spool_dir != None:
+        return _spool_dir
+    return userfolders.get_cache_dir() + BATCH_DIR
 
 def get_projects_dir():
-    return userfolders.get_cache_dir() + PROJECTS_DIR
+    return get_spool_dir() + SPOOL_PROJECTS_DIR
 
 def get_datafiles_dir():
-    return userfolders.get_cache_dir() + DATAFILES_DIR
+    return get_spool_dir() + SPOOL_DATAFILES_DIR
+
+def get_claims_dir():
+    return get_spool_dir() + SPOOL_CLAIMS_DIR
+
+def load_spool_render_item(identifier):
+    try:
+        return utils.unpickle(get_datafiles_dir() + identifier + ".renderitem")
+    except Exception:
+        return None
 
 def get_identifier_from_path(file_path):
     start = file_path.rfind("/")
@@ -365,6 +509,134 @@ def maybe_create_render_folder(render_path):
     if not os.path.exists(folder):
         os.mkdir(folder)
         
+
+# --------------------------------------------------------------- render item claims
+# Batch render app and any number of render workers on this or other machines sharing
+# the spool folder render from the same queue. Renderer creates a claim file for item
+# before rendering it. Claim file creation with O_EXCL is atomic, so only one renderer
+# gets each item. Claim files are written only when created, so a claim can not be
+# overwritten by another renderer. Heartbeat is written by touching claim file every
+# CLAIM_HEARTBEAT_INTERVAL and render progress into a separate progress file. Claims
+# of renderers that have died are taken over after CLAIM_STALE_TIME.
+def get_worker_name():
+    return socket.gethostname() + "-" + str(os.getpid())
+
+def claim_item(identifier, worker_name):
+    """
+    Returns True if render item was claimed for worker, False if item is claimed by another renderer.
+    """
+    claim_path = _get_claim_path(identifier)
+    for attempt in range(0, 2):
+        try:
+            fd = os.open(claim_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            if _claim_is_stale(claim_path) == False or _break_stale_claim(claim_path, worker_name) == False:
+                return False
+            continue
+        with os.fdopen(fd, "w") as f:
+            json.dump(_get_claim_data(worker_name, 0.0), f)
+        return True
+
+    return False
+
+def update_claim(identifier, worker_name, render_fraction):
+    """
+    Writes heartbeat and render progress.
+    Returns False if claim has been taken over by another renderer.
+    """
+    if _is_own_claim(identifier, worker_name) == False:
+        return False
+
+    # If claim is taken over between the test and touch, touch only refreshes heartbeat of new claim
+    # and loss of claim is noticed on next update.
+    try:
+        os.utime(_get_claim_path(identifier))
+    except OSError:
+        return False
+
+    try:
+        with atomicfile.AtomicFileWriter(_get_progress_path(identifier), "w") as afw:
+            json.dump(_get_claim_data(worker_name, render_fraction), afw.get_file())
+    except Exception as e:
+        print("Render item progress update failed:", e)
+    return True
+
+def release_claim(identifier, worker_name):
+    # Claim that can not be read may be just being created by another renderer, only own claims are removed.
+    if _is_own_claim(identifier, worker_name) == False:
+        return
+    _remove_claim_file(_get_progress_path(identifier))
+    _remove_claim_file(_get_claim_path(identifier))
+
+def get_claim(identifier):
+    return _read_claim_file(_get_claim_path(identifier))
+
+def get_claim_progress(identifier):
+    """
+    Returns render fraction of claimed item or None if not available.
+    """
+    progress = _read_claim_file(_get_progress_path(identifier))
+    claim = get_claim(identifier)
+    if progress == None or claim == None or progress.get("worker") != claim.get("worker"):
+        return None
+    return progress.get("fraction")
+
+def _is_own_claim(identifier, worker_name):
+    claim = get_claim(identifier)
+    return (claim != None and claim.get("worker") == worker_name)
+
+def _read_claim_file(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _get_claim_path(identifier):
+    return get_claims_dir() + identifier + ".claim"
+
+def _get_progress_path(identifier):
+    return get_claims_dir() + identifier + ".progress"
+
+def _get_claim_data(worker_name, render_fraction):
+    return {"worker": worker_name, "heartbeat": time.time(), "fraction": render_fraction}
+
+def _claim_is_stale(claim_path):
+    # Clocks of machines sharing spool folder are assumed to be in sync well within CLAIM_STALE_TIME.
+    try:
+        modified = os.stat(claim_path).st_mtime
+    except OSError:
+        return True
+    return time.time() - modified > CLAIM_STALE_TIME
+
+def _break_stale_claim(claim_path, worker_name):
+    # Rename succeeds for only one renderer breaking the claim, others see the file gone.
+    broken_path = claim_path + "." + worker_name + ".stale"
+    try:
+        os.rename(claim_path, broken_path)
+    except OSError:
+        return False
+
+    # Another renderer may have broken the claim and claimed the item between our
+    # staleness test and rename, in that case the fresh claim is put back.
+    if _claim_is_stale(broken_path) == False:
+        try:
+            os.link(broken_path, claim_path)
+        except OSError:
+            pass
+        _remove_claim_file(broken_path)
+        return False
+
+    _remove_claim_file(broken_path)
+    return True
+
+def _remove_claim_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
 # --------------------------------------------------------------- app thread and data objects
 def launch_batch_rendering():
     ipc_handle = BatchRenderIPC()
@@ -481,8 +753,7 @@ class RenderQueue:
     def load_render_items(self):
         self.queue = []
         self.error_status = None
-        user_dir = userfolders.get_cache_dir()
-        data_files_dir = user_dir + DATAFILES_DIR
+        data_files_dir = get_datafiles_dir()
         data_files = [ f for f in listdir(data_files_dir) if isfile(join(data_files_dir,f)) ]
         for data_file_name in data_files:
             render_item = None
@@ -623,6 +894,13 @@ class BatchRenderItemData:
         self.render_time = time.time() - self.start_time
         self.save()
     
+    def render_failed(self, error_message):
+        self.status = FAILED
+        self.render_this_item = False
+        self.render_time = -1
+        self.error_message = error_message
+        self.save()
+
     def render_aborted(self):
         self.status = ABORTED
         self.render_this_item = False
@@ -637,11 +915,16 @@ class BatchRenderItemData:
         if self.status == IN_QUEUE:
             return _("Queued")
         elif self.status == RENDERING:
-            return _("Rendering")
+            try:
+                return _("Rendering") + " " + str(int(_render_fractions[self.generate_identifier()] * 100)) + "%"
+            except KeyError:
+                return _("Rendering")
         elif self.status == RENDERED:
             return _("Finished")
         elif self.status == UNQUEUED:
             return _("Unqueued")
+        elif self.status == FAILED:
+            return _("Failed")
         else:
             return _("Aborted")
 
@@ -686,6 +969,35 @@ def get_render_range(render_item):
     
     return (start_frame, end_frame, wait_for_stop_render)
 
+def get_parallel_renders_limit():
+    limit = PARALLEL_RENDERS_LIMITS[editorpersistance.prefs.batch_render_parallel_limit]
+    if limit == 0: # 0 == from CPU count
+        return max(1, multiprocessing.cpu_count() // CPU_CORES_PER_RENDER)
+    return limit
+
+def render_memory_settling(last_render_start):
+    return (time.monotonic() - last_render_start < RENDER_MEMORY_SETTLE_TIME)
+
+def memory_available_for_render(render_item):
+    # Renders already running have their memory allocated, so available memory
+    # only needs to cover the new render. Use render_memory_settling() to make sure
+    # that this is the case for the most recently started render.
+    try:
+        available = None
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError):
+        return True # Memory info not available, admit on parallel renders limit only.
+    if available == None:
+        return True
+
+    profile = mltprofiles.get_profile(render_item.render_data.profile_name)
+    frame_bytes = profile.width() * profile.height() * 4
+    return available > RENDER_BASE_MEMORY + RENDER_BUFFERED_FRAMES * frame_bytes
+
 
 # -------------------------------------------------------------------- gui
 class BatchRenderWindow:
@@ -755,10 +1067,21 @@ class BatchRenderWindow:
                                    lambda w, e: self.abort_render(), 
                                    None)
 
+        self.parallel_renders_combo = Gtk.ComboBoxText()
+        self.parallel_renders_combo.append_text(_("Auto") + " (" + str(max(1, multiprocessing.cpu_count() // CPU_CORES_PER_RENDER)) + ")")
+        for limit in PARALLEL_RENDERS_LIMITS[1:]:
+            self.parallel_renders_combo.append_text(str(limit))
+        self.parallel_renders_combo.set_active(editorpersistance.prefs.batch_render_parallel_limit)
+        self.parallel_renders_combo.set_tooltip_text(_("Number of queue items rendered at the same time.\nMore items are started only if there is enough free memory."))
+        self.parallel_renders_combo.connect("changed", lambda w: self.parallel_renders_changed())
+
         button_row =  Gtk.HBox(False, 0)
         button_row.pack_start(self.remove_selected, False, False, 0)
         button_row.pack_start(self.remove_finished, False, False, 0)
         button_row.pack_start(Gtk.Label(), True, True, 0)
+        button_row.pack_start(Gtk.Label(label=_("Parallel Renders:")), False, False, 0)
+        button_row.pack_start(self.parallel_renders_combo, False, False, 0)
+        button_row.pack_start(guiutils.get_pad_label(12, 12), False, False, 0)
         button_row.pack_start(self.stop_render_button, False, False, 0)
         button_row.pack_start(self.render_button, False, False, 0)
 
@@ -789,6 +1112,11 @@ class BatchRenderWindow:
         self.window.set_position(Gtk.WindowPosition.CENTER)  
         self.window.show_all()
 
+    def parallel_renders_changed(self):
+        # Limit is read when render is launched.
+        editorpersistance.prefs.batch_render_parallel_limit = self.parallel_renders_combo.get_active()
+        editorpersistance.save()
+
     def remove_finished_clicked(self):
         delete_list = []
         for render_item in render_queue.queue:
@@ -831,6 +1159,39 @@ class BatchRenderWindow:
         
         if render_queue.queue_has_hanged(test_queue) == True:
             self.reload_queue()
+        else:
+            GLib.idle_add(self._update_spool_statuses, test_queue)
+
+    def _update_spool_statuses(self, spool_queue):
+        # Items rendered by render workers get their status from item files and progress from claim files.
+        local_renders = []
+        if queue_runner_thread != None:
+            local_renders = [render_item.generate_identifier() for render_item, render_thread in list(queue_runner_thread.active_renders)]
+
+        queued_changed = False
+        for render_item, spool_item in zip(render_queue.queue, spool_queue.queue):
+            identifier = render_item.generate_identifier()
+            if identifier in local_renders or identifier != spool_item.generate_identifier():
+                continue
+
+            if spool_item.status == RENDERING:
+                fraction = get_claim_progress(identifier)
+                if fraction != None:
+                    _render_fractions[identifier] = fraction
+            else:
+                _render_fractions.pop(identifier, None)
+
+            if render_item.render_this_item != spool_item.render_this_item:
+                queued_changed = True
+            render_item.status = spool_item.status
+            render_item.render_this_item = spool_item.render_this_item
+            render_item.start_time = spool_item.start_time
+            render_item.render_time = spool_item.render_time
+
+        if queued_changed == True:
+            self.queue_view.fill_data_model(render_queue)
+        else:
+            self.queue_view.update_statuses(render_queue)
 
     def reload_queue(self):
         global render_queue
@@ -1010,6 +1371,7 @@ class RenderQueueView(Gtk.VBox):
             render_queue.queue[item_index].status = IN_QUEUE
         else:
             render_queue.queue[item_index].status = UNQUEUED
+        render_queue.queue[item_index].save() # Render workers read queue state from item files.
         self.fill_data_model(render_queue)
 
     def on_treeview_button_press_event(self, treeview, event):
@@ -1040,6 +1402,17 @@ class RenderQueueView(Gtk.VBox):
         elif msg == "changepath":
             show_change_render_item_path_dialog(_change_render_item_path_callback, render_item)
 
+    def update_statuses(self, render_queue):
+        # Updates rows in place to keep selection while rendering.
+        if len(self.storemodel) != len(render_queue.queue):
+            self.fill_data_model(render_queue)
+            return
+
+        for i in range(0, len(render_queue.queue)):
+            render_item = render_queue.queue[i]
+            self.storemodel[i][2] = render_item.get_status_string()
+            self.storemodel[i][4] = render_item.get_render_time()
+
     def fill_data_model(self, render_queue):
         self.storemodel.clear()        
         
@@ -1123,6 +1496,11 @@ def show_render_properties_panel(render_item):
     vbox.pack_start(row6, False, False, 0)
     vbox.pack_start(row7, False, False, 0)
     vbox.pack_start(row8, False, False, 0)
+    if render_item.status == FAILED and hasattr(render_item, "error_message"):
+        error_label = Gtk.Label(label=render_item.error_message)
+        error_label.set_line_wrap(True)
+        row9 = guiutils.get_two_column_box(guiutils.bold_label(_("Render Error:")), error_label, LEFT_WIDTH)
+        vbox.pack_start(row9, False, False, 0)
     vbox.pack_start(Gtk.Label(), True, True, 0)
 
     title = _("Render Properties")
@@ -1313,11 +1691,18 @@ class SingleRenderThread(threading.Thread):
 
         current_render_time = 0
 
-        # Create render objects
         project_file_path = hidden_dir + CURRENT_RENDER_PROJECT_FILE
+
+        # Chunked render falls back to normal render if it cannot be done.
+        if getattr(render_item.render_data, "chunked_render", False) == True:
+            if self.do_chunked_render(render_item, project_file_path) == True:
+                self._render_done()
+                return
+
+        # Create render objects
         persistance.show_messages = False
 
-        project = persistance.load_project(project_file_path, False)
+        project = persistance.load_project(project_file_path, False, current_sequence_only=True)
 
         project.c_seq.fix_v1_for_render()
 
@@ -1356,8 +1741,15 @@ class SingleRenderThread(threading.Thread):
 
         # Make sure that render thread is actually running before
         # testing render_thread.running value later
-        while render_thread.has_started_running == False:
-            time.sleep(0.05)
+        render_thread.wait_for_start()
+
+        # Frame sequence renders have no single output file to save statistics with.
+        stats_recorder = None
+        if not(self.is_frame_sequence_render(vcodec) == True and vformat == None):
+            stats_recorder = renderstats.RenderStatsRecorder(render_item.render_path, render_item.args_vals_list,
+                                                             render_item.render_data.profile_name,
+                                                             renderstats.get_sequence_filters_summary(project.c_seq))
+            stats_recorder.start()
 
         # View update loop
         self.running = True
@@ -1368,13 +1760,18 @@ class SingleRenderThread(threading.Thread):
             current_render_time = now - render_item.start_time
             
             GLib.idle_add(self._update_render_progress, render_fraction, render_item.get_display_name(), current_render_time)
-            
+            if stats_recorder != None:
+                stats_recorder.sample(render_thread.producer.frame() - start_frame)
+
             if render_thread.running == False: # Rendering has reached end
                 self.running = False
 
                 GLib.idle_add(self._update_progress_bar, 1.0)
 
-            time.sleep(0.33)
+                if stats_recorder != None:
+                    stats_recorder.render_completed(end_frame - start_frame + 1)
+
+            render_thread.wait_for_stop(0.33)
                 
         render_thread.shutdown()
         global single_render_thread
@@ -1383,6 +1780,62 @@ class SingleRenderThread(threading.Thread):
         # Update view for render end
         GLib.idle_add(_single_render_shutdown)
 
+    def do_chunked_render(self, render_item, project_file_path):
+        """
+        Renders in parallel chunks, returns False if render was not done and needs to be done normally.
+        """
+        if not chunkrender.can_render_chunked(render_item.render_path, render_item.args_vals_list):
+            return False
+
+        start_frame, end_frame, wait_for_stop_render = get_render_range(render_item)
+        chunk_ranges = chunkrender.get_chunk_ranges(start_frame, end_frame, render_item.render_data.fps, render_item.args_vals_list)
+        if chunk_ranges == None:
+            return False
+
+        maybe_create_render_folder(render_item.render_path)
+
+        chunked_render = chunkrender.ChunkedRender(project_file_path, render_item.render_path, render_item.args_vals_list,
+                                                   render_item.render_data.profile_name, chunk_ranges)
+        render_item.render_started()
+        GLib.idle_add(self._show_current_render, render_item)
+        chunked_render.start()
+
+        self.running = True
+        try:
+            while self.running:
+                all_completed = chunked_render.update()
+                current_render_time = time.time() - render_item.start_time
+                GLib.idle_add(self._update_render_progress, chunked_render.get_render_fraction(), render_item.get_display_name(), current_render_time)
+                if all_completed == True:
+                    break
+                time.sleep(0.33)
+        except chunkrender.ChunkRenderError as e:
+            print("Chunked render failed, rendering without chunks:", e)
+            chunked_render.abort()
+            chunked_render.cleanup()
+            return False
+
+        if self.running == False: # Render was aborted.
+            chunked_render.abort()
+            chunked_render.cleanup()
+            return True
+
+        success = chunked_render.join_chunks()
+        chunked_render.cleanup()
+        if success == False:
+            print("Joining render chunks failed, rendering without chunks.")
+            return False
+
+        GLib.idle_add(self._update_progress_bar, 1.0)
+        return True
+
+    def _render_done(self):
+        global single_render_thread
+        single_render_thread = None
+
+        # Update view for render end
+        GLib.idle_add(_single_render_shutdown)
+
     def _show_current_render(self, render_item):
         single_render_window.current_render.set_text("  " + os.path.basename(render_item.render_path))
 
@@ -21,10 +21,21 @@
 """
 Module provides utility methods for modules creating headless render procesesses.
 Created originally for container clips rendering, hence ContainerClipsRenderingUTILS.
+
+Render processes push status, completed and abort messages through per session
+Unix datagram sockets in Linux abstract namespace, so nothing is written to disk 
+or polled while jobs are running. Message files are used as fallback when application 
+has not opened a channel for session, and completed and abort messages are always also written 
+as files so that they are not lost if other side is not yet listening.
+
+Abstract namespace sockets have no file permissions, so receiving sides get sender 
+credentials from kernel and drop messages not sent by processes of this user.
 """
 
 import os
 import pickle
+import socket
+import struct
 import sys
 
 import appconsts
@@ -41,15 +52,31 @@ ABORT_MSG_FILE = "abort"
 RENDER_DATA_FILE = "render_data"
 RANGE_RENDER_DATA_DICT = "proc_fctx_dict"
 
+CHANNEL_ADDRESS_PREFIX = "\0flowblade-session-"
+APP_CHANNEL = "-app"
+WORKER_CHANNEL = "-worker"
+STATUS_MSG = "status"
+COMPLETED_MSG = "completed"
+ABORT_MSG = "abort"
+MAX_MSG_SIZE = 4096
+UCRED_FORMAT = "iII" # struct ucred: pid, uid, gid
+
 _session_folder = None
 _clip_frames_folder_internal = None
 _rendered_frames_folder_internal = None
 
 _render_data = None
 
+_session_id = None
+_worker_socket = None
+_worker_socket_opened = False
+_abort_received = False
+
+_channels = {} # session_id -> SessionChannel, application side channels for running jobs.
+
 
-# ----------------------------------------------------- interface with message files, used by main app
-# We are using message files to communicate with application.
+# ----------------------------------------------------- interface with message files and channels, used by main app
+# Status and completed messages are pushed through session channels when available, message files are fallback.
 def clear_flag_files(parent_folder, session_id):
     folder = _get_session_folder(parent_folder, session_id)
     
@@ -96,6 +123,10 @@ def read_misc_session_data(parent_folder, session_id, file_name):
     return misc_data
         
 def session_render_complete(parent_folder, session_id):
+    channel = get_session_channel(session_id)
+    if channel != None and channel.completed == True:
+        return True
+
     folder = _get_session_folder(parent_folder, session_id)
     completed_msg_path = folder + "/" + COMPLETED_MSG_FILE
 
@@ -113,6 +144,10 @@ def get_session_status(parent_folder, session_id):
     return (step, frame, length, elapsed)
 
 def get_session_status_message(parent_folder, session_id):
+    channel = get_session_channel(session_id)
+    if channel != None and channel.status_message != None:
+        return channel.status_message
+
     try:
         status_msg_file = _get_session_folder(parent_folder, session_id) + "/" + STATUS_MSG_FILE
         with open(status_msg_file) as f:
@@ -142,7 +177,114 @@ def abort_render(parent_folder, session_id):
     except atomicfile.AtomicFileWriteError:
         # Sometimes this fails and not handling it makes things worse, see if this needs more attention.
         print("atomicfile.AtomicFileWriteError in ccrutils.abort_render(), could not open for writing: ", folder)
+
+    # Abort file is written first, render process checks it after opening its channel 
+    # so abort is not lost if process has not yet started listening.
+    _send_message(_get_channel_address(session_id, WORKER_CHANNEL), ABORT_MSG)
         
+# ----------------------------------------------------- session channels, used by main app
+class SessionChannel:
+    """
+    Application side end of session channel, receives messages sent by render process.
+    """
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.status_message = None
+        self.completed = False
+
+        self.socket = _create_receiving_socket()
+        try:
+            self.socket.bind(_get_channel_address(session_id, APP_CHANNEL))
+        except OSError:
+            self.socket.close()
+            raise
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def receive_messages(self):
+        # Reads all pending messages, only latest status message is kept.
+        while True:
+            try:
+                data = _receive_message(self.socket)
+            except OSError: # includes BlockingIOError when no more messages
+                return
+            
+            msg = data.decode("utf-8")
+            if msg == COMPLETED_MSG:
+                self.completed = True
+            elif msg.startswith(STATUS_MSG + " "):
+                self.status_message = msg[len(STATUS_MSG) + 1:]
+
+    def close(self):
+        self.socket.close()
+
+def open_session_channel(session_id):
+    """
+    Returns SessionChannel for session or None if channel could not be opened,
+    in which case message files are used.
+    """
+    close_session_channel(session_id)
+    try:
+        channel = SessionChannel(session_id)
+    except OSError as e:
+        print("Could not open session channel for", session_id, e)
+        return None
+
+    _channels[session_id] = channel
+    return channel
+
+def get_session_channel(session_id):
+    return _channels.get(session_id)
+
+def close_session_channel(session_id):
+    channel = _channels.pop(session_id, None)
+    if channel != None:
+        channel.close()
+
+def _get_channel_address(session_id, side):
+    return CHANNEL_ADDRESS_PREFIX + session_id + side
+
+def _create_receiving_socket():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_PASSCRED, 1)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def _receive_message(sock):
+    """
+    Returns next message sent by a process of this user, messages sent by other users are dropped.
+    Raises OSError, BlockingIOError when there are no more messages.
+    """
+    ucred_size = struct.calcsize(UCRED_FORMAT)
+    while True:
+        data, ancdata, flags, address = sock.recvmsg(MAX_MSG_SIZE, socket.CMSG_SPACE(ucred_size))
+        for cmsg_level, cmsg_type, cmsg_data in ancdata:
+            if cmsg_level == socket.SOL_SOCKET and cmsg_type == socket.SCM_CREDENTIALS:
+                pid, uid, gid = struct.unpack(UCRED_FORMAT, cmsg_data[:ucred_size])
+                if uid == os.getuid():
+                    return data
+        print("Dropped session channel message not sent by this user.")
+
+def _send_message(address, msg, sock=None):
+    close_sock = False
+    if sock == None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        close_sock = True
+    try:
+        sock.sendto(msg.encode("utf-8"), address)
+        return True
+    except OSError:
+        # No one listening or receive buffer full.
+        return False
+    finally:
+        if close_sock == True:
+            sock.close()
+
 def _get_session_folder(parent_folder, session_id):
     session_folder_path = parent_folder + session_id
     return session_folder_path
@@ -160,7 +302,8 @@ def get_render_folder_for_session_id(parent_folder, session_id):
 
 # ------------------------------------------------------ headless session folders and files, used by render processes
 def init_session_folders(parent_folder, session_id):
-    global _session_folder, _clip_frames_folder_internal, _rendered_frames_folder_internal
+    global _session_folder, _clip_frames_folder_internal, _rendered_frames_folder_internal, _session_id
+    _session_id = session_id
     _session_folder = _get_session_folder(parent_folder, session_id)
     _clip_frames_folder_internal = _session_folder + CLIP_FRAMES_DIR
     _rendered_frames_folder_internal = _session_folder + RENDERED_FRAMES_DIR
@@ -224,6 +367,9 @@ def preview_frames_folder():
         return _render_data.render_dir + appconsts.CC_PREVIEW_RENDER_DIR
         
 def write_status_message(msg):
+    if _send_to_app(STATUS_MSG + " " + msg) == True:
+        return
+
     try:
         status_msg_file = session_folder_saved_global() + "/" + STATUS_MSG_FILE
         with atomicfile.AtomicFileWriter(status_msg_file, "w") as afw:
@@ -233,6 +379,9 @@ def write_status_message(msg):
         pass # this failing because we can't get file access will show as progress hickup to user, we don't care
 
 def write_completed_message():
+    # Completed message is also written as file, this is sent only once and must not get lost.
+    _send_to_app(COMPLETED_MSG)
+
     completed_msg_file = session_folder_saved_global() + "/" + COMPLETED_MSG_FILE
     script_text = "##completed##" # let's put something in here
     with atomicfile.AtomicFileWriter(completed_msg_file, "w") as afw:
@@ -271,12 +420,59 @@ def delete_rendered_frames():
         os.remove(file_path)
 
 def abort_requested():
+    global _abort_received
+    worker_socket = _get_worker_socket()
+    if worker_socket == None:
+        return _abort_file_exists()
+
+    while _abort_received == False:
+        try:
+            data = _receive_message(worker_socket)
+        except OSError: # includes BlockingIOError when no more messages
+            break
+        if data.decode("utf-8") == ABORT_MSG:
+            _abort_received = True
+
+    return _abort_received
+
+def _abort_file_exists():
     abort_file = session_folder_saved_global() + "/" + ABORT_MSG_FILE
     if os.path.exists(abort_file):
         return True
     else:
         return False
 
+def _send_to_app(msg):
+    if _session_id == None:
+        return False
+    worker_socket = _get_worker_socket()
+    return _send_message(_get_channel_address(_session_id, APP_CHANNEL), msg, worker_socket)
+
+def _get_worker_socket():
+    # Render process end of session channel is opened on first use.
+    global _worker_socket, _worker_socket_opened, _abort_received
+    if _worker_socket_opened == True:
+        return _worker_socket
+    _worker_socket_opened = True
+
+    if _session_id == None:
+        return None
+
+    try:
+        worker_socket = _create_receiving_socket()
+        worker_socket.bind(_get_channel_address(_session_id, WORKER_CHANNEL))
+    except OSError as e:
+        print("Could not open session channel, using message files:", e)
+        return None
+
+    _worker_socket = worker_socket
+
+    # Abort may have been requested before we were listening.
+    if _abort_file_exists() == True:
+        _abort_received = True
+
+    return _worker_socket
+
 # ---- Debug helper
 def prints_to_log_file(log_file):
     so = se = open(log_file, 'w', buffering=1)
@@ -0,0 +1,116 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Headless process that renders one chunk of a chunked timeline render, see chunkrender.py.
+"""
+
+try:
+    import mlt7 as mlt
+except:
+    import mlt
+import threading
+import time
+
+import ccrutils
+import chunkrender
+import mltheadlessutils
+import mltprofiles
+import persistance
+import renderconsumer
+
+_render_thread = None
+
+
+# --------------------------------------------------- render thread launch
+def main(root_path, session_id, parent_folder, project_path, chunk_path, range_in, range_out, profile_desc):
+    
+    # Here we are not using render data item, returned by mlt_env_init()
+    mltheadlessutils.mlt_env_init(root_path, parent_folder, session_id)
+
+    args_vals_list = ccrutils.read_misc_session_data(parent_folder, session_id, chunkrender.RENDER_ARGS_FILE)
+
+    global _render_thread
+    _render_thread = ChunkRenderThread(project_path, chunk_path, range_in, range_out, profile_desc, args_vals_list)
+    _render_thread.start()
+
+
+class ChunkRenderThread(threading.Thread):
+
+    def __init__(self, project_path, chunk_path, range_in, range_out, profile_desc, args_vals_list):
+        threading.Thread.__init__(self)
+
+        self.project_path = project_path
+        self.chunk_path = chunk_path
+        self.range_in = int(range_in)
+        self.range_out = int(range_out)
+        self.profile_desc = profile_desc
+        self.args_vals_list = args_vals_list
+    
+        self.abort = False
+
+    def run(self):
+        self.start_time = time.monotonic()
+
+        persistance.show_messages = False
+        project = persistance.load_project(self.project_path, False, current_sequence_only=True)
+        project.c_seq.fix_v1_for_render()
+
+        # Chunk range is cut from sequence with a playlist, so the chunk producer ends 
+        # exactly at range out and the whole chunk gets written.
+        chunk_tractor = mlt.Tractor()
+        multitrack = chunk_tractor.multitrack()
+        track0 = mlt.Playlist(project.profile)
+        multitrack.connect(track0, 0)
+        track0.insert(project.c_seq.tractor, 0, self.range_in, self.range_out)
+        end_frame = self.range_out - self.range_in
+
+        profile = mltprofiles.get_profile(self.profile_desc)
+        consumer = renderconsumer.get_mlt_render_consumer(self.chunk_path, profile, self.args_vals_list)
+
+        self.render_player = renderconsumer.FileRenderPlayer(None, chunk_tractor, consumer, 0, end_frame)
+        self.render_player.wait_for_producer_end_stop = True
+        self.render_player.start()
+
+        while self.render_player.stopped == False:
+            
+            self.abort_requested()
+            
+            if self.abort == True:
+                self.render_player.shutdown()
+                return
+            
+            fraction = self.render_player.get_render_fraction()
+
+            self.render_update_callback(fraction)
+            
+            self.render_player.wait_for_stop(0.3)
+                
+        # Write out completed flag file.
+        ccrutils.write_completed_message()
+
+    def abort_requested(self):
+        self.abort = ccrutils.abort_requested()
+        return self.abort
+
+    def render_update_callback(self, fraction):
+        elapsed = time.monotonic() - self.start_time
+        msg = str(fraction) + " " + str(elapsed)
+        ccrutils.write_status_message(msg)
@@ -236,7 +236,7 @@ class FluxityHeadlessRunnerThread(threading.Thread):
                 fraction = self.render_player.get_render_fraction()
                 self.video_render_update_callback(fraction)
                 
-                time.sleep(0.3)
+                self.render_player.wait_for_stop(0.3)
 
             ccrutils.delete_rendered_frames()
 
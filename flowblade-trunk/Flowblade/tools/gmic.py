@@ -1261,7 +1261,7 @@ class GmicEffectRendererer(threading.Thread):
                 
                 GLib.idle_add(self._show_percentage_and_fraction, update_info, fraction)
                 
-                time.sleep(0.3)
+                self.render_player.wait_for_stop(0.3)
 
         GLib.idle_add(self._show_percentage_and_fraction, "<small>" + _("Render complete!") + "</small>", None)
         self.set_render_stopped_gui_state()
@@ -65,7 +65,7 @@ def get_session_status(parent_folder, session_id):
     return (fraction, elapsed)
     
 def abort_render(parent_folder, session_id):
-    ccrutils.abort_render(session_id)
+    ccrutils.abort_render(parent_folder, session_id)
 
 
 
@@ -145,7 +145,7 @@ class MLTXMLHeadlessRunnerThread(threading.Thread):
 
             self.render_update_callback(fraction)
             
-            time.sleep(0.3)
+            self.render_player.wait_for_stop(0.3)
                 
         # Write out completed flag file.
         ccrutils.write_completed_message()
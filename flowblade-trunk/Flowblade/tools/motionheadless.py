@@ -115,7 +115,7 @@ class MotionClipHeadlessRunnerThread(threading.Thread):
             fraction = self.render_player.get_render_fraction()
             self.render_update(fraction)
 
-            time.sleep(0.3)
+            self.render_player.wait_for_stop(0.3)
 
         # Write out completed flag file.
         ccrutils.write_completed_message()
@@ -0,0 +1,327 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module generates synthetic benchmark projects and measures project load and save times.
+
+Commands:
+    generate    Creates corpus projects into corpus folder. Preset sizes are
+                defined in CORPUS_PRESETS, a custom size can be given with args.
+    run         Loads and saves all corpus projects 'repeats' times and writes
+                median phase times into corpus folder 'results' subfolder.
+    compare     Prints phase times of all results files in corpus folder for comparison.
+
+Usage example:
+    flowbladeprojectbenchmark command:generate corpus_dir:/tmp/corpus
+    flowbladeprojectbenchmark command:run corpus_dir:/tmp/corpus repeats:5
+    flowbladeprojectbenchmark command:compare corpus_dir:/tmp/corpus
+"""
+
+try:
+    import pgi
+    pgi.install_as_gi()
+except ImportError:
+    pass
+
+import gi
+
+gi.require_version('Gtk', '3.0')
+
+try:
+    import mlt7 as mlt
+except:
+    import mlt
+import datetime
+import json
+import os
+import platform
+import statistics
+import time
+
+import appconsts
+import editorstate
+import editorpersistance
+import medialog
+import mltfilters
+import mltinit
+import mltprofiles
+import persistance
+import projectdata
+import respaths
+import sequence
+import userfolders
+
+
+RESULTS_DIR = "results"
+MEDIA_DIR = "media"
+SOURCE_MEDIA_LENGTH = 250
+
+# Corpus project sizes.
+CORPUS_PRESETS = {  "small":  { "media": 20, "sequences": 1, "clips": 20, "filters": 1, "keyframes": 5, "compositors": 5, "log_events": 20},
+                    "medium": { "media": 200, "sequences": 5, "clips": 100, "filters": 2, "keyframes": 10, "compositors": 30, "log_events": 200},
+                    "large":  { "media": 1000, "sequences": 20, "clips": 300, "filters": 3, "keyframes": 30, "compositors": 100, "log_events": 2000}}
+
+# Load phases in persistance.load_project(), icon decoding and save phases are timed here.
+LOAD_PHASES = ["unpickle", "media_paths", "sequence_mlt", "deferred_sequence_mlt", "icons_decode"]
+SAVE_PHASES = ["save_snapshot", "save_write"]
+
+
+# --------------------------------------------------- init
+def main(root_path, command, corpus_dir, args):
+    try:
+        editorstate.mlt_version = mlt.LIBMLT_VERSION
+    except:
+        editorstate.mlt_version = "0.0.99" # magic string for "not found"
+
+    respaths.set_paths(root_path)
+    userfolders.init()
+    editorpersistance.load()
+
+    global _repo
+    _repo = mltinit.init_with_translations()
+    appconsts.SAVEFILE_VERSION = projectdata.SAVEFILE_VERSION
+
+    persistance.show_messages = False
+
+    if command == "generate":
+        generate_corpus(corpus_dir, args)
+    elif command == "run":
+        run_benchmark(corpus_dir, int(args.get("repeats", 3)))
+    elif command == "compare":
+        print_comparison(corpus_dir)
+    else:
+        print("Unknown command:", command)
+
+# --------------------------------------------------- corpus generation
+def generate_corpus(corpus_dir, args):
+    os.makedirs(os.path.join(corpus_dir, MEDIA_DIR), exist_ok=True)
+
+    specs = {}
+    custom_keys = list(CORPUS_PRESETS["small"].keys())
+    if any(key in args for key in custom_keys):
+        spec = dict(CORPUS_PRESETS["small"])
+        for key in custom_keys:
+            if key in args:
+                spec[key] = int(args[key])
+        specs["custom"] = spec
+    elif "preset" in args:
+        specs[args["preset"]] = CORPUS_PRESETS[args["preset"]]
+    else:
+        specs = CORPUS_PRESETS
+
+    profile = mltprofiles.get_default_profile()
+    source_path = _create_source_media(corpus_dir, profile)
+
+    for name, spec in specs.items():
+        print("Generating corpus project " + name + "...")
+        project = _create_project(corpus_dir, profile, source_path, name, spec)
+        project_path = os.path.join(corpus_dir, name + appconsts.PROJECT_FILE_EXTENSION)
+        project.last_save_path = project_path
+        persistance.save_project(project, project_path)
+        print("Saved", project_path)
+
+def _create_source_media(corpus_dir, profile):
+    """
+    Renders one short video file that all corpus media items link to.
+    """
+    source_path = os.path.join(corpus_dir, MEDIA_DIR, "source.mp4")
+    if os.path.isfile(source_path):
+        return source_path
+
+    producer = mlt.Producer(profile, "noise")
+    producer = producer.cut(0, SOURCE_MEDIA_LENGTH - 1)
+    consumer = mlt.Consumer(profile, "avformat", str(source_path))
+    consumer.set("real_time", -1)
+    consumer.set("vcodec", "mpeg4")
+    consumer.set("acodec", "aac")
+    consumer.connect(producer)
+    consumer.run()
+
+    return source_path
+
+def _create_project(corpus_dir, profile, source_path, name, spec):
+    project = projectdata.Project(profile)
+    project.name = name + appconsts.PROJECT_FILE_EXTENSION
+    editorstate.project = project
+
+    # Media items, every item has its own path so that they are separate media for MLT and path resolving.
+    media_paths = []
+    for i in range(0, spec["media"]):
+        media_path = os.path.join(corpus_dir, MEDIA_DIR, name + "_" + str(i) + ".mp4")
+        if not os.path.lexists(media_path):
+            os.symlink(source_path, media_path)
+        project.add_media_file(media_path)
+        media_paths.append(media_path)
+
+    # Sequences
+    project.sequences = []
+    for i in range(0, spec["sequences"]):
+        seq = sequence.Sequence(profile, appconsts.COMPOSITING_MODE_TOP_DOWN_FREE_MOVE)
+        seq.create_default_tracks()
+        seq.name = "sequence_" + str(i + 1)
+        project.sequences.append(seq)
+        project.c_seq = seq
+        _fill_sequence(seq, media_paths, spec)
+    project.c_seq = project.sequences[0]
+
+    # Media log
+    for i in range(0, spec["log_events"]):
+        media_path = media_paths[i % len(media_paths)]
+        project.media_log.append(medialog.MediaLogEvent(appconsts.MEDIA_LOG_MARKS_SET, 10, 100, os.path.basename(media_path), media_path))
+
+    return project
+
+def _fill_sequence(seq, media_paths, spec):
+    clip_length = 50
+    filter_info = mltfilters.get_brightness_filter_info()
+
+    for track in seq.tracks[1:len(seq.tracks) - 1]:
+        for i in range(0, spec["clips"]):
+            media_path = media_paths[i % len(media_paths)]
+            clip = seq.create_file_producer_clip(media_path)
+            for j in range(0, spec["filters"]):
+                filter_object = _create_keyframed_filter(filter_info, seq.profile, spec["keyframes"], clip_length)
+                clip.attach(filter_object.mlt_filter)
+                clip.filters.append(filter_object)
+            persistance.append_clip(track, clip, 0, clip_length - 1)
+
+    compositor_type = "##affine"
+    video_tracks = range(seq.first_video_index + 1, len(seq.tracks) - 1)
+    for i in range(0, spec["compositors"]):
+        compositor = seq.create_compositor(compositor_type)
+        b_track = video_tracks[i % len(video_tracks)]
+        compositor.transition.set_tracks(seq.first_video_index, b_track)
+        compositor.set_in_and_out(i * clip_length, (i + 1) * clip_length - 1)
+        seq.compositors.append(compositor)
+    seq.restack_compositors()
+
+def _create_keyframed_filter(filter_info, profile, keyframes_count, clip_length):
+    filter_object = mltfilters.FilterObject(filter_info)
+    filter_object.create_mlt_filter(profile)
+
+    # Write keyframes into first keyframe property.
+    for i in range(0, len(filter_object.properties)):
+        prop_name, value, prop_type = filter_object.properties[i]
+        if "=" in value:
+            kf_step = max(1, clip_length // keyframes_count)
+            kf_str = ";".join(str(k * kf_step) + "=" + str(round(k / keyframes_count, 3)) for k in range(0, keyframes_count))
+            filter_object.properties[i] = (prop_name, kf_str, prop_type)
+            filter_object.mlt_filter.set(str(prop_name), kf_str)
+            break
+
+    return filter_object
+
+# --------------------------------------------------- benchmark run
+def run_benchmark(corpus_dir, repeats):
+    projects_results = {}
+    for file_name in sorted(os.listdir(corpus_dir)):
+        if not file_name.endswith(appconsts.PROJECT_FILE_EXTENSION):
+            continue
+
+        project_path = os.path.join(corpus_dir, file_name)
+        print("Benchmarking " + file_name + "...")
+        runs = []
+        for i in range(0, repeats):
+            runs.append(_run_project(project_path))
+
+        projects_results[file_name] = {phase: statistics.median(run[phase] for run in runs) for phase in LOAD_PHASES + SAVE_PHASES}
+        _print_times(file_name, projects_results[file_name])
+
+    results = { "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "flowblade_version": editorstate.appversion,
+                "mlt_version": editorstate.mlt_version,
+                "python_version": platform.python_version(),
+                "host": platform.node(),
+                "repeats": repeats,
+                "projects": projects_results}
+
+    results_dir = os.path.join(corpus_dir, RESULTS_DIR)
+    os.makedirs(results_dir, exist_ok=True)
+    results_path = os.path.join(results_dir, results["date"].replace(":", "") + "_" + editorstate.appversion + ".json")
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=4)
+    print("Results written to", results_path)
+
+def _run_project(project_path):
+    persistance.load_phase_times = {}
+
+    project = persistance.load_project(project_path)
+    for seq in project.sequences:
+        persistance.build_deferred_sequence(seq)
+
+    times = {phase: persistance.load_phase_times.get(phase, 0.0) for phase in LOAD_PHASES}
+    persistance.load_phase_times = None
+
+    times["icons_decode"] = _time_icons_decode(project)
+
+    save_path = userfolders.get_cache_dir() + "benchmark_save" + appconsts.PROJECT_FILE_EXTENSION
+    phase_start = time.monotonic()
+    s_proj = persistance.get_pickleable_project(project)
+    times["save_snapshot"] = time.monotonic() - phase_start
+
+    phase_start = time.monotonic()
+    persistance.write_pickleable_project(s_proj, save_path)
+    times["save_write"] = time.monotonic() - phase_start
+    os.remove(save_path)
+
+    return times
+
+def _time_icons_decode(project):
+    # Project load only marks icons to be decoded when first displayed, 
+    # decode all of them here like media panel does.
+    icon_paths = []
+    for media_file in project.media_files.values():
+        icon_path = getattr(media_file, "icon_path", None)
+        if icon_path == None:
+            continue
+        if not os.path.isfile(icon_path):
+            # Thumbnail was evicted from disk cache, it is recreated outside timing.
+            icon_path, length, info = projectdata.thumbnailer.write_image(media_file.path)
+        icon_paths.append(icon_path)
+
+    phase_start = time.monotonic()
+    for icon_path in icon_paths:
+        projectdata._create_icon_surface(icon_path)
+    return time.monotonic() - phase_start
+
+# --------------------------------------------------- comparison
+def print_comparison(corpus_dir):
+    results_dir = os.path.join(corpus_dir, RESULTS_DIR)
+    results_list = []
+    for file_name in sorted(os.listdir(results_dir)):
+        with open(os.path.join(results_dir, file_name)) as f:
+            results_list.append(json.load(f))
+
+    project_names = sorted(set(name for results in results_list for name in results["projects"]))
+    for project_name in project_names:
+        print("\n" + project_name)
+        print("    " + "run".ljust(30) + "".join(phase.rjust(23) for phase in LOAD_PHASES + SAVE_PHASES))
+        for results in results_list:
+            if not project_name in results["projects"]:
+                continue
+            times = results["projects"][project_name]
+            label = results["date"] + " " + results["flowblade_version"]
+            print("    " + label.ljust(30) + "".join(("%.3f" % times.get(phase, 0.0)).rjust(23) for phase in LOAD_PHASES + SAVE_PHASES))
+
+def _print_times(name, times):
+    total = sum(times.values())
+    print("    " + name + " total " + "%.3f" % total + "s")
+    for phase in LOAD_PHASES + SAVE_PHASES:
+        print("        " + phase.ljust(24) + "%.3f" % times[phase] + "s")
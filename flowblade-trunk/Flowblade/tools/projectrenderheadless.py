@@ -0,0 +1,249 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module renders sequences of saved projects from command line without GUI.
+
+Args:
+    project     Path to project file.
+    out         Path to rendered file.
+    sequence    Sequence index or name, default is the project's current sequence.
+    range_in    First rendered frame, default is 0.
+    range_out   Last rendered frame, default is sequence end.
+    encoding    Encoding index or name, see 'list:encodings'. Default is first encoding.
+    quality     Quality option index, default is encoding's default quality.
+    args_file   Saved render args file (.rargs) used instead of encoding and quality.
+    allow_proxy 'true' renders projects saved in proxy mode using proxy media, 
+                default is to fail because output would be in proxy resolution.
+    list        'encodings' lists available encodings with quality options and exits.
+
+Progress is written to stdout as JSON lines with "event" being one of
+"started", "progress", "warning", "completed" or "error". Other output of the app modules
+is redirected to stderr. Exit code is 0 when render completes.
+
+Usage example:
+    flowbladerender project:/home/user/dailies.flb out:/tmp/dailies.mp4 encoding:0 quality:2
+"""
+
+try:
+    import pgi
+    pgi.install_as_gi()
+except ImportError:
+    pass
+
+import gi
+
+gi.require_version('Gtk', '3.0')
+
+try:
+    import mlt7 as mlt
+except:
+    import mlt
+import json
+import os
+import sys
+import time
+
+import appconsts
+import editorpersistance
+import editorstate
+import mltinit
+import persistance
+import projectdata
+import renderconsumer
+import respaths
+import userfolders
+
+PROGRESS_INTERVAL = 1.0 # seconds
+
+_repo = None
+_events_out = None
+
+
+# --------------------------------------------------- init
+def main(root_path, args):
+    # Only JSON events are written to stdout.
+    global _events_out
+    _events_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    try:
+        editorstate.mlt_version = mlt.LIBMLT_VERSION
+    except:
+        editorstate.mlt_version = "0.0.99" # magic string for "not found"
+
+    respaths.set_paths(root_path)
+    userfolders.init()
+    editorpersistance.load()
+
+    global _repo
+    _repo = mltinit.init_with_translations()
+    appconsts.SAVEFILE_VERSION = projectdata.SAVEFILE_VERSION
+
+    persistance.show_messages = False
+
+    if args.get("list") == "encodings":
+        list_encodings()
+        return 0
+
+    try:
+        return render_project(args)
+    except RenderArgsError as e:
+        _write_event("error", message=str(e.value))
+        return 1
+    except Exception as e:
+        _write_event("error", message=str(e))
+        return 1
+
+def list_encodings():
+    for i in range(0, len(renderconsumer.encoding_options)):
+        encoding = renderconsumer.encoding_options[i]
+        qualities = []
+        if encoding.quality_options != None:
+            qualities = [quality_option.name for quality_option in encoding.quality_options]
+        _events_out.write(json.dumps({"index": i, "name": encoding.name, "extension": encoding.extension,
+                          "type": encoding.type, "qualities": qualities, "default_quality": encoding.quality_default_index}) + "\n")
+
+
+# --------------------------------------------------- render
+def render_project(args):
+    project_path = args.get("project")
+    render_path = args.get("out")
+    if project_path == None or render_path == None:
+        raise RenderArgsError("Args 'project' and 'out' are required.")
+    if not os.path.isfile(project_path):
+        raise RenderArgsError("Project file not found: " + project_path)
+
+    project = persistance.load_project(project_path, False)
+
+    # GUI asks for confirmation before rendering proxy media, here it needs to be asked for with arg.
+    if project.proxy_data.proxy_mode != appconsts.USE_ORIGINAL_MEDIA:
+        if args.get("allow_proxy") != "true":
+            raise RenderArgsError("Project is saved in proxy mode and would be rendered using proxy media. Convert project to use original media or give arg 'allow_proxy:true'.")
+        _write_event("warning", message="Project is rendered using proxy media.")
+
+    seq = _get_sequence(project, args.get("sequence"))
+    persistance.build_deferred_sequence(seq)
+    project.c_seq = seq
+    seq.fix_v1_for_render()
+
+    consumer, args_vals_list = _get_consumer(project.profile, render_path, args)
+
+    # Same range logic as batchrendering.get_render_range().
+    seq_length = seq.tractor.get_length()
+    start_frame = int(args.get("range_in", 0))
+    if "range_out" in args:
+        end_frame = min(int(args["range_out"]), seq_length - 2)
+        wait_for_stop_render = False
+    else:
+        end_frame = seq_length - 1
+        wait_for_stop_render = True
+    if start_frame < 0 or end_frame < start_frame:
+        raise RenderArgsError("Bad render range " + str(start_frame) + " - " + str(end_frame) + " for sequence length " + str(seq_length))
+
+    render_folder = os.path.dirname(os.path.abspath(render_path))
+    if not os.path.isdir(render_folder):
+        os.makedirs(render_folder, exist_ok=True)
+
+    render_player = renderconsumer.FileRenderPlayer(None, seq.tractor, consumer, start_frame, end_frame)
+    render_player.wait_for_producer_end_stop = wait_for_stop_render
+
+    start_time = time.monotonic()
+    _write_event("started", project=project_path, sequence=seq.name, out=render_path,
+                 range_in=start_frame, range_out=end_frame, args=dict(args_vals_list))
+    render_player.start()
+    render_player.wait_for_start()
+
+    while render_player.wait_for_stop(PROGRESS_INTERVAL) == False:
+        _write_progress(render_player, start_frame, start_time)
+
+    _write_event("completed", out=render_path, frames=end_frame - start_frame + 1,
+                 elapsed=round(time.monotonic() - start_time, 2))
+    return 0
+
+def _get_sequence(project, sequence_arg):
+    if sequence_arg == None:
+        return project.sequences[project.c_seq_index]
+
+    for seq in project.sequences:
+        if seq.name == sequence_arg:
+            return seq
+    try:
+        return project.sequences[int(sequence_arg)]
+    except (ValueError, IndexError):
+        raise RenderArgsError("Sequence not found: " + sequence_arg)
+
+def _get_consumer(profile, render_path, args):
+    if "args_file" in args:
+        try:
+            with open(args["args_file"]) as f:
+                args_vals_list, error = renderconsumer.get_ffmpeg_opts_args_vals_tuples_list_for_text(f.read())
+        except OSError as e:
+            raise RenderArgsError("Reading args file failed: " + str(e))
+        if error != None:
+            raise RenderArgsError(error)
+        return (renderconsumer.get_mlt_render_consumer(render_path, profile, args_vals_list), args_vals_list)
+
+    enc_index = _get_encoding_index(args.get("encoding", "0"))
+    encoding = renderconsumer.encoding_options[enc_index]
+    if encoding.quality_options == None or len(encoding.quality_options) == 0:
+        quality_index = -1
+    else:
+        default_quality_index = encoding.quality_default_index if encoding.quality_default_index != None else 0
+        quality_index = int(args.get("quality", default_quality_index))
+    if quality_index >= 0 and quality_index >= len(encoding.quality_options):
+        raise RenderArgsError("Quality index " + str(quality_index) + " not available for encoding " + encoding.name)
+
+    args_vals_list = renderconsumer.get_args_vals_tuples_list_for_encoding_and_quality(profile, enc_index, quality_index)
+    if encoding.type == "img_seq":
+        return (renderconsumer.get_img_seq_render_consumer(render_path, profile, encoding), args_vals_list)
+    return (renderconsumer.get_mlt_render_consumer(render_path, profile, args_vals_list), args_vals_list)
+
+def _get_encoding_index(encoding_arg):
+    for i in range(0, len(renderconsumer.encoding_options)):
+        if renderconsumer.encoding_options[i].name == encoding_arg:
+            return i
+    try:
+        enc_index = int(encoding_arg)
+    except ValueError:
+        raise RenderArgsError("Encoding not found: " + encoding_arg)
+    if enc_index < 0 or enc_index >= len(renderconsumer.encoding_options):
+        raise RenderArgsError("Encoding index out of range: " + encoding_arg)
+    return enc_index
+
+def _write_progress(render_player, start_frame, start_time):
+    elapsed = time.monotonic() - start_time
+    frame = render_player.producer.frame()
+    _write_event("progress", fraction=round(render_player.get_render_fraction(), 4), frame=frame,
+                 fps=round((frame - start_frame) / max(elapsed, 0.001), 2), elapsed=round(elapsed, 2))
+
+def _write_event(event, **data):
+    data["event"] = event
+    _events_out.write(json.dumps(data) + "\n")
+    _events_out.flush()
+
+
+class RenderArgsError(Exception):
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
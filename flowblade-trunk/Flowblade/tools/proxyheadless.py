@@ -58,14 +58,14 @@ def delete_session_folders(parent_folder, session_id):
 
 # --------------------------------------------------- render thread launch
 def main(root_path, parent_folder, session_id, media_file_id, proxy_w, proxy_h, enc_index, \
-            proxy_file_path, proxy_rate, media_file_path, profile_desc, lookup_path):
+            proxy_file_path, proxy_rate, media_file_path, profile_desc, lookup_path, range_in=None, range_out=None, streams=None):
     
     # Here we are not using render data item, returned by mlt_env_init()
     mltheadlessutils.mlt_env_init(root_path, parent_folder, session_id)
 
     global _render_thread
     _render_thread = ProxyClipRenderThread(media_file_id, proxy_w, proxy_h, enc_index, 
-            proxy_file_path, proxy_rate, media_file_path, profile_desc, lookup_path)
+            proxy_file_path, proxy_rate, media_file_path, profile_desc, lookup_path, range_in, range_out, streams)
     _render_thread.start()
 
        
@@ -73,7 +73,8 @@ def main(root_path, parent_folder, session_id, media_file_id, proxy_w, proxy_h,
 class ProxyClipRenderThread(threading.Thread):
 
     def __init__(self, media_file_id, proxy_w, proxy_h, enc_index, 
-                    proxy_file_path, proxy_rate, media_file_path, proxy_profile_desc, lookup_path):
+                    proxy_file_path, proxy_rate, media_file_path, proxy_profile_desc, lookup_path, 
+                    range_in=None, range_out=None, streams=None):
 
         threading.Thread.__init__(self)
 
@@ -87,6 +88,16 @@ class ProxyClipRenderThread(threading.Thread):
         self.proxy_profile_desc = proxy_profile_desc
         self.lookup_path = lookup_path # For img seqs only
         
+        # Segment of source to render, whole source is rendered if not set.
+        self.range_in = None
+        self.range_out = None
+        if range_in != None:
+            self.range_in = int(range_in)
+            self.range_out = int(range_out)
+
+        # Segment renders render video segments and whole source audio separately, see jobs.py.
+        self.streams = streams
+        
         self.abort = False
 
     def run(self):
@@ -110,12 +121,21 @@ class ProxyClipRenderThread(threading.Thread):
             
             consumer.set("vb", str(int(self.proxy_rate)) + "k")
             consumer.set("rescale", "nearest")
+            if self.streams == "video":
+                consumer.set("an", "1")
+            elif self.streams == "audio":
+                consumer.set("vn", "1")
             
             file_producer = mlt.Producer(proxy_profile, str(self.media_file_path))
 
             end_frame = file_producer.get_length() - 1
-            
-            tractor = renderconsumer.get_producer_as_tractor(file_producer, end_frame)
+            if self.range_in != None:
+                # Segment is made into tractor that starts from frame 0.
+                range_out = min(self.range_out, end_frame)
+                tractor = renderconsumer.get_producer_as_tractor(file_producer, range_out, self.range_in)
+                end_frame = range_out - self.range_in
+            else:
+                tractor = renderconsumer.get_producer_as_tractor(file_producer, end_frame)
             
             self.render_player = renderconsumer.FileRenderPlayer(None, tractor, consumer, 0, end_frame)
             self.render_player.wait_for_producer_end_stop = True
@@ -132,7 +152,7 @@ class ProxyClipRenderThread(threading.Thread):
                 fraction = self.render_player.get_render_fraction()
                 self.render_update(fraction)
             
-                time.sleep(0.3)
+                self.render_player.wait_for_stop(0.3)
                 
         else:
             # Image Sequences
@@ -0,0 +1,253 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <https://github.com/jliljebl/flowblade/>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module runs headless render worker that renders items from batch render queue.
+
+Any number of workers on this machine or on machines sharing batch render folder
+can drain the same queue, together with Batch Render Queue application. Items are
+claimed before rendering, see batchrendering.claim_item(), and item status and
+render statistics are written back into the batch render folder when render ends.
+
+Render paths and media paths of queued projects must be valid on all machines
+running workers, e.g. media and render folders are on same shared paths.
+
+Args:
+    spool           Batch render folder, default is batch render folder in user cache folder.
+    name            Worker name shown in claims, default is <hostname>-<pid>.
+    renders         Number of parallel renders, default is from batch render parallel renders preference.
+    exit_when_empty 'true' exits when queue has no items left to render, default is to wait for new items.
+
+Usage example:
+    flowbladerenderworker spool:/mnt/renderfarm/batchrender renders:2
+"""
+
+try:
+    import pgi
+    pgi.install_as_gi()
+except ImportError:
+    pass
+
+import gi
+
+gi.require_version('Gtk', '3.0')
+
+try:
+    import mlt7 as mlt
+except:
+    import mlt
+import datetime
+from os import listdir
+import signal
+import time
+
+import appconsts
+import batchrendering
+import editorpersistance
+import editorstate
+import mltinit
+import persistance
+import projectdata
+import respaths
+import userfolders
+import utils
+
+SPOOL_POLL_INTERVAL = 5.0 # seconds
+RENDER_POLL_INTERVAL = 0.33 # seconds
+
+_repo = None
+_worker = None
+
+
+# --------------------------------------------------- init
+def main(root_path, args):
+    try:
+        editorstate.mlt_version = mlt.LIBMLT_VERSION
+    except:
+        editorstate.mlt_version = "0.0.99" # magic string for "not found"
+
+    respaths.set_paths(root_path)
+    userfolders.init()
+    editorpersistance.load()
+
+    global _repo
+    _repo = mltinit.init_with_translations()
+    appconsts.SAVEFILE_VERSION = projectdata.SAVEFILE_VERSION
+
+    persistance.show_messages = False
+
+    if "spool" in args:
+        batchrendering.set_spool_dir(args["spool"])
+    batchrendering.init_dirs_if_needed()
+
+    worker_name = args.get("name", batchrendering.get_worker_name())
+    parallel_limit = int(args.get("renders", batchrendering.get_parallel_renders_limit()))
+    exit_when_empty = (args.get("exit_when_empty") == "true")
+
+    global _worker
+    _worker = RenderWorker(worker_name, max(1, parallel_limit), exit_when_empty)
+
+    signal.signal(signal.SIGTERM, _stop_signal_handler)
+    signal.signal(signal.SIGINT, _stop_signal_handler)
+
+    _worker.run()
+    return 0
+
+def _stop_signal_handler(signum, frame):
+    _worker.stop()
+
+
+# --------------------------------------------------- worker
+class RenderWorker:
+    """
+    Claims queued items from batch render folder and renders them, several at once
+    if parallel renders limit and available memory allow it.
+    """
+    def __init__(self, worker_name, parallel_limit, exit_when_empty):
+        self.worker_name = worker_name
+        self.parallel_limit = parallel_limit
+        self.exit_when_empty = exit_when_empty
+        self.active_renders = [] # (render_item, render_thread, stats_recorder) tuples
+        self.last_render_start = 0.0
+        self.running = True
+
+    def run(self):
+        self._log("started, spool " + batchrendering.get_spool_dir() + ", " + str(self.parallel_limit) + " parallel renders")
+
+        last_heartbeat = 0.0
+        last_spool_scan = -SPOOL_POLL_INTERVAL
+        while self.running == True:
+            # Spool folder may be on a network file system, so it is scanned only every SPOOL_POLL_INTERVAL.
+            if len(self.active_renders) < self.parallel_limit and time.monotonic() - last_spool_scan > SPOOL_POLL_INTERVAL:
+                last_spool_scan = time.monotonic()
+                queue_empty = self._start_renders()
+                if queue_empty == True and len(self.active_renders) == 0 and self.exit_when_empty == True:
+                    break
+
+            heartbeat = (time.monotonic() - last_heartbeat > batchrendering.CLAIM_HEARTBEAT_INTERVAL)
+            if heartbeat == True:
+                last_heartbeat = time.monotonic()
+
+            for active_render in list(self.active_renders):
+                render_item, render_thread, stats_recorder = active_render
+                stats_recorder.sample(render_thread.producer.frame() - render_thread.start_frame)
+                if render_thread.running == False: # Rendering has reached end
+                    render_thread.shutdown()
+                    self.active_renders.remove(active_render)
+                    stats_recorder.render_completed(render_thread.stop_frame - render_thread.start_frame + 1)
+                    self._render_completed(render_item)
+                elif heartbeat == True:
+                    identifier = render_item.generate_identifier()
+                    if batchrendering.update_claim(identifier, self.worker_name, render_thread.get_render_fraction()) == False:
+                        self._log(render_item.get_display_name() + " claim lost, render stopped")
+                        render_thread.shutdown()
+                        self.active_renders.remove(active_render)
+
+            if len(self.active_renders) > 0:
+                # Oldest render usually ends first, continue as soon as it does.
+                self.active_renders[0][1].wait_for_stop(RENDER_POLL_INTERVAL)
+            else:
+                time.sleep(RENDER_POLL_INTERVAL)
+
+        # Items of stopped renders are returned to queue for other workers.
+        for render_item, render_thread, stats_recorder in self.active_renders:
+            render_thread.shutdown()
+            render_item.status = batchrendering.IN_QUEUE
+            render_item.start_time = -1
+            render_item.save()
+            batchrendering.release_claim(render_item.generate_identifier(), self.worker_name)
+            self._log(render_item.get_display_name() + " returned to queue")
+        self.active_renders = []
+
+        self._log("stopped")
+
+    def stop(self):
+        self.running = False
+
+    def _start_renders(self):
+        """
+        Starts renders while there is capacity. Returns True if queue had no items left to claim.
+
+        Renders are admitted one at a time, with memory checked after the previous one has settled.
+        """
+        for render_item in self._get_queued_items():
+            if len(self.active_renders) >= self.parallel_limit or self.running == False:
+                return False
+            if len(self.active_renders) > 0 and (batchrendering.render_memory_settling(self.last_render_start)
+                                                 or not batchrendering.memory_available_for_render(render_item)):
+                return False
+
+            identifier = render_item.generate_identifier()
+            if batchrendering.claim_item(identifier, self.worker_name) == False:
+                continue
+
+            # Item may have been rendered and released by another renderer after it was read.
+            render_item = batchrendering.load_spool_render_item(identifier)
+            if render_item == None or self._is_renderable(render_item) == False:
+                batchrendering.release_claim(identifier, self.worker_name)
+                continue
+
+            try:
+                render_thread, stats_recorder = batchrendering.start_item_render(render_item)
+            except Exception as e:
+                self._log(render_item.get_display_name() + " failed to start: " + str(e))
+                render_item.render_failed(str(e))
+                batchrendering.release_claim(identifier, self.worker_name)
+                continue
+
+            self.active_renders.append((render_item, render_thread, stats_recorder))
+            self.last_render_start = time.monotonic()
+            self._log(render_item.get_display_name() + " render started, " + render_item.render_path)
+
+        return True
+
+    def _get_queued_items(self):
+        queued_items = []
+        datafiles_dir = batchrendering.get_datafiles_dir()
+        for data_file_name in listdir(datafiles_dir):
+            if not data_file_name.endswith(".renderitem"):
+                continue
+            try:
+                render_item = utils.unpickle(datafiles_dir + data_file_name)
+            except Exception:
+                continue # Broken items are reported and removed by Batch Render Queue application.
+            if self._is_renderable(render_item) == True:
+                queued_items.append(render_item)
+
+        # First queued is first rendered.
+        queued_items.sort(key=lambda item: item.timestamp)
+        return queued_items
+
+    def _is_renderable(self, render_item):
+        # Items with RENDERING status are rendered by another renderer or its renderer has died,
+        # claims decide which is the case.
+        return render_item.render_this_item == True and render_item.status in [batchrendering.IN_QUEUE, batchrendering.RENDERING]
+
+    def _render_completed(self, render_item):
+        identifier = render_item.generate_identifier()
+        # Item may have been deleted from queue while rendering.
+        if batchrendering.load_spool_render_item(identifier) != None:
+            render_item.render_completed()
+        batchrendering.release_claim(identifier, self.worker_name)
+        render_time = time.time() - render_item.start_time
+        self._log(render_item.get_display_name() + " render completed in " + utils.get_time_str_for_sec_float(render_time))
+
+    def _log(self, msg):
+        print(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") + " " + self.worker_name + ": " + msg, flush=True)
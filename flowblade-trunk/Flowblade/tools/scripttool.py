@@ -1510,7 +1510,7 @@ class FluxityPluginRenderer(threading.Thread):
 
                 GLib.idle_add(self.show_progress, "<small>" + update_info + "</small>", fraction, False)
                 
-                time.sleep(0.3)
+                self.render_player.wait_for_stop(0.3)
 
             GLib.idle_add(self.show_progress, "<small>" + _("Render complete!") + "</small>", 1.0, True)
 
@@ -139,6 +139,14 @@ def window_resized():
         return False
     """
     
+# --------------------------------- media icons
+def media_icons_decoded():
+    """
+    Repaints media panel and timeline when lazily decoded media icons become available.
+    """
+    gui.media_list_view.widget.queue_draw()
+    repaint_tline()
+
 # --------------------------------- timeline
 # --- REPAINT
 def repaint_tline():
@@ -192,3 +192,5 @@ def _maybe_create_xdg_dirs():
         os.mkdir(get_cache_dir() + appconsts.SCRIP_TOOL_DIR)
     if not os.path.exists(get_temp_render_dir()):
         os.mkdir(get_temp_render_dir())
+    if not os.path.exists(get_cache_dir() + appconsts.RENDER_SEGMENTS_DIR):
+        os.mkdir(get_cache_dir() + appconsts.RENDER_SEGMENTS_DIR)
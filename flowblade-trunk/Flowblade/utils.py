@@ -23,8 +23,10 @@ Helper functions and data
 """
 import time
 
+import cairo
 import math
 import hashlib
+import numpy as np
 import os
 import pickle
 import re
@@ -453,8 +455,8 @@ def program_is_installed(program):
 
     return False
     
-# File exntension lists
-_audio_file_extensions = [  "act",
+# File exntension sets
+_audio_file_extensions = {  "act",
                             "aif",
                             "aiff",
                             "alfc",
@@ -495,9 +497,9 @@ _audio_file_extensions = [  "act",
                             "vox",
                             "wav",
                             "wma",
-                            "wavpack"]
+                            "wavpack"}
 
-_graphics_file_extensions = [   "bmp",
+_graphics_file_extensions = {   "bmp",
                                 "tiff",
                                 "tif",
                                 "gif",
@@ -506,9 +508,9 @@ _graphics_file_extensions = [   "bmp",
                                 "pgm",
                                 "jpeg",
                                 "jpg",
-                                "svg"]
+                                "svg"}
 
-_video_file_extensions = [  "avi",
+_video_file_extensions = {  "avi",
                             "dv",
                             "flv",
                             "mkv",
@@ -563,7 +565,7 @@ _video_file_extensions = [  "avi",
                             "xvid",
                             "y4m",
                             "yuv",
-                            "xml"]
+                            "xml"}
 
 
 def start_timing(msg="start timing"):
@@ -625,6 +627,14 @@ def get_folder_size_recursively(folder):
             size += os.path.getsize(folder +"/" + f)
     return size
 
+def touch_cache_file(path):
+    # Cache files modification times are used as last access times 
+    # for LRU eviction, see diskcachemanagement.py.
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
 def get_disk_size_str(size):
     if size > 1000000:
         return str(int((size + 500000) / 1000000)) + " MB"
@@ -632,4 +642,24 @@ def get_disk_size_str(size):
         return str(int((size + 500) / 1000)) + " kB"
     else:
         return str(int(size)) + " B"
+
+def get_cairo_buf_from_mlt_rgba(mlt_rgba, img_w, img_h):
+    # MLT provides images in which R <-> B are switched from what Cairo wants them,
+    # so use numpy to switch them and to create a modifiable buffer for Cairo.
+    buf = np.frombuffer(mlt_rgba, dtype=np.uint8)
+    buf.shape = (img_h, img_w, 4)
+    out = np.copy(buf)
+    r = np.index_exp[:, :, 0]
+    b = np.index_exp[:, :, 2]
+    out[r] = buf[b]
+    out[b] = buf[r]
+    return out
+
+def get_cairo_surface_from_cairo_buf(cairo_buf, img_w, img_h):
+    stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_RGB24, img_w)
+    return cairo.ImageSurface.create_for_data(cairo_buf, cairo.FORMAT_RGB24, img_w, img_h, stride)
+
+def get_cairo_surface_from_mlt_rgba(mlt_rgba, img_w, img_h):
+    cairo_buf = get_cairo_buf_from_mlt_rgba(mlt_rgba, img_w, img_h)
+    return get_cairo_surface_from_cairo_buf(cairo_buf, img_w, img_h)
             
\ No newline at end of file
@@ -18,14 +18,12 @@
     along with Flowblade Movie Editor. If not, see <http://www.gnu.org/licenses/>.
 """
 
-import numpy as np
-#print("numpy version:", np.version.version)
-
 from gi.repository import Gtk, GObject
 
 import cairoarea
 import cairo
 import respaths
+import utils
 
 MIN_PAD = 20
 GUIDES_COLOR = (0.5, 0.5, 0.5, 1.0)
@@ -244,16 +242,7 @@ class ViewEditor(Gtk.Frame):
     
     # --------------------------------------------------- drawing
     def set_screen_rgb_data(self, screen_rgb_data):
-        # MLT Provides images in which R <-> B are switched from what Cairo wants them,
-        # so use numpy to switch them and to create a modifiable buffer for Cairo
-        buf = np.frombuffer(screen_rgb_data, dtype=np.uint8)
-        buf.shape = (self.profile_h, self.profile_w, 4)
-        out = np.copy(buf)
-        r = np.index_exp[:, :, 0]
-        b = np.index_exp[:, :, 2]
-        out[r] = buf[b]
-        out[b] = buf[r]
-        self.bg_buf = out
+        self.bg_buf = utils.get_cairo_buf_from_mlt_rgba(screen_rgb_data, self.profile_w, self.profile_h)
 
     def update_layers_for_frame(self, tline_frame):
         for editorlayer in self.edit_layers:
@@ -272,8 +261,7 @@ class ViewEditor(Gtk.Frame):
         if (self.bg_buf is not None) and self.write_out_layers == False:
 
             # Create cairo surface
-            stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_RGB24, self.profile_w)
-            surface = cairo.ImageSurface.create_for_data(self.bg_buf, cairo.FORMAT_RGB24, self.profile_w, self.profile_h, stride)
+            surface = utils.get_cairo_surface_from_cairo_buf(self.bg_buf, self.profile_w, self.profile_h)
         
             # Display it
             ox, oy = self.origo